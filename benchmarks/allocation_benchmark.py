@@ -0,0 +1,62 @@
+import cv2 as cv
+import numpy as np
+import argparse
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.module_manager import ModuleManager
+
+FRAMES = 60
+
+CHAINS = [
+    ("ColorChaos", ["channel_swap", "hue_shift", "rgb_split", "kaleidoscope", "lcd_sine_shift"]),
+    ("VHS", ["vhs_barrel_distortion", "vhs_color_bleeding", "vhs_gritty"]),
+    ("Grunge", ["burnify", "grunge_bleach_bypass", "emo_bloom_effect"]),
+]
+
+def textured_frame(height, width, seed=0):
+    rng = np.random.default_rng(seed)
+    return cv.resize(rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8), (width, height),
+                     interpolation=cv.INTER_LINEAR)
+
+def run(module, effects, frame, pooled, count_allocations):
+    moduleManager = ModuleManager()
+    moduleManager.set_module(module)
+    args = argparse.Namespace(effects=effects, frame_pool=pooled)
+    analysis = moduleManager.analyze_frame(frame)
+    moduleManager.add_frame(frame, analysis)
+
+    # first frame builds tables, maps and pool buffers
+    moduleManager.process_frame(frame.copy(), analysis, args)
+
+    allocations = moduleManager.count_allocations() if count_allocations else None
+    start = time.perf_counter()
+
+    for _ in range(FRAMES):
+        moduleManager.process_frame(frame.copy(), analysis, args)
+
+    elapsed = (time.perf_counter() - start) / FRAMES * 1000
+
+    if allocations is not None:
+        allocations.stop()
+        return allocations.per_frame() / frame.nbytes
+
+    return elapsed
+
+if __name__ == "__main__":
+    frame = textured_frame(1080, 1920)
+
+    print(f"1080p, {FRAMES} frames, allocations in frame sizes ({frame.nbytes / 1e6:.1f} MB)\n")
+    print(f"{'chain':<12} {'allocating':>22} {'pooled':>22}")
+
+    for module, effects in CHAINS:
+        row = []
+        for pooled in (False, True):
+            milliseconds = run(module, effects, frame, pooled, False)
+            frames_allocated = run(module, effects, frame, pooled, True)
+            row.append(f"{milliseconds:6.1f} ms {frames_allocated:5.2f} frames")
+
+        print(f"{module:<12} {row[0]:>22} {row[1]:>22}")
@@ -0,0 +1,33 @@
+import numpy as np
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.vhs import VHS
+from tests.vhs_tests import reference_color_bleeding
+
+RESOLUTIONS = [("720p", 720, 1280), ("1080p", 1080, 1920), ("4K", 2160, 3840)]
+
+def time_call(function, frame, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function(frame)
+    return (time.perf_counter() - start) / repeats * 1000
+
+if __name__ == "__main__":
+    vhs = VHS()
+    rng = np.random.default_rng(0)
+
+    print(f"{'resolution':<12}{'loop ms':>10}{'table ms':>10}{'speedup':>10}{'identical':>11}")
+    for label, h, w in RESOLUTIONS:
+        frame = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+        # first call builds and caches the maps for this resolution
+        identical = np.array_equal(vhs.vhs_color_bleeding(frame), reference_color_bleeding(frame))
+
+        loop_ms = time_call(reference_color_bleeding, frame, 3)
+        table_ms = time_call(vhs.vhs_color_bleeding, frame, 20)
+
+        print(f"{label:<12}{loop_ms:>10.2f}{table_ms:>10.2f}{loop_ms / table_ms:>9.1f}x{str(identical):>11}")
@@ -0,0 +1,43 @@
+import numpy as np
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.color_chaos import ColorChaos
+from tests.color_chaos_tests import reference_channel_shifting, reference_lcd_shift
+
+RESOLUTIONS = [("720p", 720, 1280), ("1080p", 1080, 1920), ("4K", 2160, 3840)]
+
+def time_call(function, frame, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function(frame)
+    return (time.perf_counter() - start) / repeats * 1000
+
+if __name__ == "__main__":
+    color_chaos = ColorChaos()
+    rng = np.random.default_rng(0)
+
+    effects = [
+        ("channel_shifting", reference_channel_shifting, color_chaos.channel_shifting),
+        ("lcd_sine_shift", lambda frame: reference_lcd_shift(frame, 7.3), color_chaos.lcd_sine_shift),
+        ("lcd_tan_shift", lambda frame: reference_lcd_shift(frame, 7.3), color_chaos.lcd_tan_shift),
+        ("psychedelic_master", None, lambda frame: color_chaos.psychedelic_master(frame, 1.0)),
+    ]
+
+    print(f"{'effect':<20}{'resolution':<12}{'before ms':>11}{'after ms':>10}{'speedup':>10}")
+    for label, h, w in RESOLUTIONS:
+        frame = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+        for name, reference, current in effects:
+            current(frame)
+            after = time_call(current, frame, 10)
+
+            if reference is None:
+                print(f"{name:<20}{label:<12}{'-':>11}{after:>10.2f}{'-':>10}")
+                continue
+
+            before = time_call(reference, frame, 3)
+            print(f"{name:<20}{label:<12}{before:>11.2f}{after:>10.2f}{before / after:>9.1f}x")
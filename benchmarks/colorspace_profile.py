@@ -0,0 +1,78 @@
+import numpy as np
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.color_chaos import ColorChaos
+from modules.grunge import Grunge
+from modules.vhs import VHS
+from modules.night_vision import NightVision
+from utils.colorspace import conversionProfile, run_chain
+
+REPEATS = 10
+
+def isolated(frame, effects):
+    """
+    Every effect converts back to BGR before the next one, the way the chains ran before.
+    """
+
+    for effect in effects:
+        frame = run_chain(frame, [effect])
+    return frame
+
+def pipelined(frame, effects):
+    return run_chain(frame, effects)
+
+def float_pipelined(frame, effects):
+    return run_chain(frame, effects, keep_float=True)
+
+def profile(runner, frame, effects):
+    conversionProfile.reset()
+    runner(frame, effects)
+    conversions = conversionProfile.conversions
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        runner(frame, effects)
+    elapsed = (time.perf_counter() - start) / REPEATS * 1000
+
+    return conversions, elapsed
+
+if __name__ == "__main__":
+    color_chaos, grunge, vhs, night_vision = ColorChaos(), Grunge(), VHS(), NightVision()
+
+    # the module masters come first, they have no consecutive stages sharing a colorspace and save nothing
+    chains = [
+        ("Grunge master", [grunge.grunge_bleach_bypass, grunge.washed_emo_layers, grunge.emo_bloom_effect, grunge.dreamify]),
+        ("VHS complex", [vhs.vhs_gritty, vhs.vhs_scan_lines, vhs.vhs_color_bleeding, vhs.vhs_barrel_distortion]),
+        ("--effects hue_shift x2", [color_chaos.hue_shift, color_chaos.hue_shift]),
+        ("--effects emo_bloom > hue_shift", [grunge.emo_bloom_effect, color_chaos.hue_shift]),
+        ("--effects hue_shift > vhs_gritty", [color_chaos.hue_shift, vhs.vhs_gritty]),
+        ("--effects bloom > gritty > bleach", [grunge.emo_bloom_effect, vhs.vhs_gritty, grunge.grunge_bleach_bypass]),
+    ]
+
+    frame = np.random.default_rng(0).integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+
+    # vhs_gritty used to convert HSV -> BGR twice, a third conversion per call on top of these counts
+    print(f"{'chain':<36}{'isolated':>10}{'pipelined':>11}{'saved':>7}{'isolated ms':>13}{'pipelined ms':>14}")
+    for name, effects in chains:
+        isolated_count, isolated_ms = profile(isolated, frame, effects)
+        pipelined_count, pipelined_ms = profile(pipelined, frame, effects)
+
+        print(f"{name:<36}{isolated_count:>10}{pipelined_count:>11}{isolated_count - pipelined_count:>7}"
+              f"{isolated_ms:>13.1f}{pipelined_ms:>14.1f}")
+
+    float_chains = [
+        ("scan lines > noise", [vhs.vhs_scan_lines, vhs.vhs_noise]),
+        ("noise > night vision", [vhs.vhs_noise, night_vision.night_vision_overlay, night_vision.night_vision_scan_lines]),
+    ]
+
+    # dtype conversions, every floating effect of the uint8 chain converts inside on its own when it needs floats
+    print(f"\n{'chain':<26}{'float32 conversions':>20}{'uint8 ms':>10}{'float32 ms':>12}")
+    for name, effects in float_chains:
+        _, uint8_ms = profile(pipelined, frame, effects)
+        float_count, float_ms = profile(float_pipelined, frame, effects)
+
+        print(f"{name:<26}{float_count:>20}{uint8_ms:>10.1f}{float_ms:>12.1f}")
@@ -0,0 +1,87 @@
+import cv2 as cv
+import numpy as np
+import argparse
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.calibrator import Calibrator
+from processors.frame_analyzer import FrameAnalyzer
+
+CONFIGURATIONS = [
+    ("reference canny 1/1", {}),
+    ("canny 1/4", {"scale": 4}),
+    ("canny 1/8", {"scale": 8}),
+    ("sobel 1/4", {"scale": 4, "edge_metric": "sobel"}),
+    ("sobel 1/8 + histogram", {"scale": 8, "edge_metric": "sobel", "variance_metric": "histogram"}),
+    ("laplacian 1/4", {"scale": 4, "edge_metric": "laplacian"}),
+    ("laplacian 1/8 + histogram", {"scale": 8, "edge_metric": "laplacian", "variance_metric": "histogram"}),
+]
+
+def synthetic_frames(count, width, height, seed=0):
+    """
+    Alternates flat gradient shots with textured ones so both branches get exercised.
+    """
+
+    rng = np.random.default_rng(seed)
+    gradient = np.tile(np.linspace(0, 255, width, dtype=np.float32), (height, 1))
+    texture = cv.resize(rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8), (width, height),
+                        interpolation=cv.INTER_NEAREST)
+
+    for i in range(count):
+        detail = 0.5 + 0.5 * np.sin(i * 0.07)
+        base = cv.cvtColor(gradient.astype(np.uint8), cv.COLOR_GRAY2BGR)
+        frame = cv.addWeighted(base, 1 - detail, np.roll(texture, i * 3, axis=1), detail, 0)
+        noise = rng.integers(0, 12, frame.shape, dtype=np.uint8)
+
+        yield cv.add(frame, noise)
+
+def video_frames(path, count):
+    capture = cv.VideoCapture(path)
+
+    for _ in range(count):
+        ret, frame = capture.read()
+        if not ret:
+            break
+        yield frame
+
+    capture.release()
+
+def run(frames):
+    analyzers = [(label, FrameAnalyzer(**options), Calibrator()) for label, options in CONFIGURATIONS]
+    timings = {label: 0.0 for label, _, _ in analyzers}
+    decisions = {label: [] for label, _, _ in analyzers}
+
+    for frame in frames:
+        for label, analyzer, calibrator in analyzers:
+            start = time.perf_counter()
+            complexity = analyzer.analyze(frame).complexity
+            timings[label] += time.perf_counter() - start
+
+            calibrator.add(complexity)
+            decisions[label].append(complexity > calibrator.threshold)
+
+    reference = np.array(decisions[CONFIGURATIONS[0][0]])
+    frame_total = len(reference)
+
+    print(f"{'configuration':<30}{'ms/frame':>10}{'speedup':>10}{'agreement':>12}")
+    for label, _, _ in analyzers:
+        ms = timings[label] / frame_total * 1000
+        speedup = timings[CONFIGURATIONS[0][0]] / timings[label]
+        agreement = np.mean(np.array(decisions[label]) == reference) * 100
+        print(f"{label:<30}{ms:>10.2f}{speedup:>9.1f}x{agreement:>11.1f}%")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark complexity metrics against the reference Canny metric")
+    parser.add_argument("--video", type=str, help="Video to analyze, synthetic frames are used when omitted")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    if args.video:
+        run(video_frames(args.video, args.frames))
+    else:
+        run(synthetic_frames(args.frames, args.width, args.height))
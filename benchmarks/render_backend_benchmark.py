@@ -0,0 +1,74 @@
+import numpy as np
+import tempfile
+import shutil
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.render_processor import RenderProcessor
+
+RESOLUTIONS = [("720p", 720, 1280), ("1080p", 1080, 1920)]
+FRAMES = 120
+
+BACKENDS = [
+    ("VideoWriter mp4v", dict(backend='opencv', fourcc='mp4v')),
+    ("VideoWriter avc1", dict(backend='opencv', fourcc='avc1')),
+    ("ffmpeg ultrafast", dict(backend='ffmpeg', preset='ultrafast')),
+    ("ffmpeg veryfast", dict(backend='ffmpeg', preset='veryfast')),
+    ("ffmpeg medium", dict(backend='ffmpeg', preset='medium')),
+]
+
+def render(options, frames, fps, output_path):
+    renderProcessor = RenderProcessor(**options)
+    height, width = frames[0].shape[:2]
+
+    start = time.perf_counter()
+    if not renderProcessor.open(output_path, fps, (width, height)):
+        return None
+
+    for frame in frames:
+        renderProcessor.write(frame)
+
+    written = renderProcessor.close()
+    elapsed = time.perf_counter() - start
+
+    return written / elapsed, os.path.getsize(output_path) / 1e6
+
+def moving_frames(height, width, count):
+    """
+    Gradient with a moving square, so inter frame compression has something to do.
+    """
+
+    base = np.zeros((height, width, 3), dtype=np.uint8)
+    base[..., 0] = np.linspace(0, 255, width, dtype=np.uint8)
+    base[..., 1] = np.linspace(0, 255, height, dtype=np.uint8)[:, None]
+
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        x = (i * 9) % (width - 100)
+        frame[100:200, x:x+100] = (255, 255, 255)
+        frames.append(frame)
+
+    return frames
+
+if __name__ == "__main__":
+    output_dir = tempfile.mkdtemp(prefix="render_benchmark_")
+
+    print(f"{'backend':<20}{'resolution':<12}{'fps':>8}{'size MB':>10}")
+    for label, h, w in RESOLUTIONS:
+        frames = moving_frames(h, w, FRAMES)
+
+        for name, options in BACKENDS:
+            result = render(options, frames, 30, os.path.join(output_dir, "out.mp4"))
+
+            if result is None:
+                print(f"{name:<20}{label:<12}{'n/a':>8}{'-':>10}")
+                continue
+
+            fps, size = result
+            print(f"{name:<20}{label:<12}{fps:>8.1f}{size:>10.2f}")
+
+    shutil.rmtree(output_dir, ignore_errors=True)
@@ -0,0 +1,41 @@
+import subprocess
+import statistics
+import time
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# cold start budget of a CLI command that doesn't touch any frames
+TARGET = 0.5
+RUNS = 5
+
+COMMANDS = [
+    ("cli.py --help", ["cli.py", "--help"]),
+    ("cli.py --list modules", ["cli.py", "--list", "modules"]),
+    ("cli.py --list effects", ["cli.py", "--list", "effects"]),
+    ("import ModuleManager", ["-c", "from modules.module_manager import ModuleManager; ModuleManager()"]),
+    ("set_module VHS", ["-c", "from modules.module_manager import ModuleManager; ModuleManager().set_module('VHS')"]),
+    ("set_module FacialArtifacts", ["-c", "from modules.module_manager import ModuleManager; ModuleManager().set_module('FacialArtifacts')"]),
+]
+
+def cold_start(arguments):
+    """
+    Wall clock of a fresh interpreter running the command from the repository root.
+    """
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + arguments, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    baseline = statistics.median(cold_start(["-c", "pass"]) for _ in range(RUNS))
+    print(f"Bare interpreter : {baseline * 1000:.0f} ms\n")
+
+    print(f"{'command':<28} {'median ms':>10} {'min ms':>8}  target {TARGET * 1000:.0f} ms")
+    for name, arguments in COMMANDS:
+        timings = [cold_start(arguments) for _ in range(RUNS)]
+        median = statistics.median(timings)
+
+        status = "ok" if median <= TARGET else "SLOW"
+        print(f"{name:<28} {median * 1000:>10.0f} {min(timings) * 1000:>8.0f}  {status}")
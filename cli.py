@@ -1,4 +1,3 @@
-import cv2 as cv
 import argparse
 import time
 import os
@@ -7,14 +6,11 @@ from datetime import datetime
 
 from utils.console_logger import ConsoleLogger
 
-from scripts.video_renderer import videoRenderer
-from scripts.realtime_filter import realtimeFilter
-from scripts.webcam_filter import webcamFilter
-from scripts.module_lister import listModules
-from scripts.effect_lister import listEffects
-
 from scripts.configure import Configure
 
+# the mode scripts pull in OpenCV pipelines, modules and detectors,
+# they are imported in the branch that runs them so --help and --list stay quick
+
 logger = ConsoleLogger()
 configure = Configure()
 
@@ -81,17 +77,64 @@ def main():
         help="Enable debug mode for RTM"
     )
 
+    parser.add_argument(
+        "--float-pipeline",
+        action = "store_true",
+        help="Keep frames float32 between consecutive float effects of --effects, quantizing to uint8 once at the end"
+    )
+
+    parser.add_argument(
+        "--frame-pool",
+        action = "store_true",
+        help="Reuse preallocated buffers for the intermediate frames of --effects instead of allocating them"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes for render mode, more than 1 renders the video in parallel segments"
+    )
+
+    parser.add_argument(
+        "--segment-size",
+        type=int,
+        default=300,
+        help="Frames per segment when rendering with several workers"
+    )
+
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=60,
+        help="Frames each render worker feeds to calibration before its segment starts"
+    )
+
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed for the random effect choices of parallel renders"
+    )
+
     args = parser.parse_args()
 
     if hasattr(args, "mode") and args.mode == "live":
+        from scripts.realtime_filter import realtimeFilter
         realtimeFilter(args)
+    elif hasattr(args, "mode") and args.mode == "render" and args.workers > 1:
+        from scripts.parallel_renderer import parallelRenderer
+        parallelRenderer(args)
     elif hasattr(args, "mode") and args.mode == "render":
+        from scripts.video_renderer import videoRenderer
         videoRenderer(args)
     elif hasattr(args, "mode") and args.mode == "webcam":
+        from scripts.webcam_filter import webcamFilter
         webcamFilter(args)
     elif hasattr(args, "list") and args.list == "modules":
+        from scripts.module_lister import listModules
         listModules(args)
     elif hasattr(args, "list") and args.list == "effects":
+        from scripts.effect_lister import listEffects
         listEffects(args)
     elif args.init:
         configure.init()
@@ -1,11 +1,23 @@
-from .chromatic_aberration import ChromaticAberration
-from .color_chaos import ColorChaos
-from .facial_artifacts import FacialArtifacts
-from .grunge import Grunge
-from .night_vision import NightVision
-from .none import NoneModule
-from .tracker import Tracker
-from .vhs import VHS
+import importlib
+
+# submodules load their dependencies (cascades, lookup tables) on import,
+# so the classes are only imported when they are first accessed
+_EXPORTS = {
+    'ChromaticAberration' : '.chromatic_aberration',
+    'ColorChaos' : '.color_chaos',
+    'FacialArtifacts' : '.facial_artifacts',
+    'Grunge' : '.grunge',
+    'NightVision' : '.night_vision',
+    'NoneModule' : '.none',
+    'Tracker' : '.tracker',
+    'VHS' : '.vhs',
+}
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
 
 __all__ = [
     'ChromaticAberration',
@@ -9,38 +9,39 @@ from colorama import Fore, Back, Style, init
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from processors.calibrator import Calibrator
+from processors.frame_analyzer import FrameAnalyzer
+from utils.warp_maps import warpMaps, chromatic_aberration_maps
+from modules.registry import register_module
+
+frameAnalyzer = FrameAnalyzer()
+
+@register_module("ChromaticAberration")
 class ChromaticAberration:
     def __init__(self):
         self.name = "ChromeAberration Effect"
 
-        self.frames = []
-        self.processed_frames = []
+        self.frame_count = 0
+        self.last_processed_frame = None
 
-        self.complexities = []
+        self.calibrator = Calibrator()
         self.threshold = None
+        self.analysis = None
 
         self.start_time = time.time()
 
-    def add_frame(self, frame):
-        self.frames.append(frame)
-        complexity = self.calculate_complexity(frame)
-        self.complexities.append(complexity)
+    def add_frame(self, frame, analysis=None):
+        if analysis is None:
+            analysis = frameAnalyzer.analyze(frame)
 
-        if len(self.complexities) > 10 and len(self.complexities) % 10 == 0 or self.threshold == None:
-            self.threshold = np.mean(self.complexities)
+        self.analysis = analysis
+        self.frame_count += 1
 
-    def calculate_complexity(self, frame):
-        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        variance = np.var(gray)
-
-        edges = cv.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
-    
-        brightness_std = np.std(gray) / 255.0
+        if self.calibrator.add(analysis.complexity):
+            self.threshold = self.calibrator.threshold
 
-        complexity = np.log1p(variance) * 0.5 + edge_density * 0.3 + brightness_std * 0.2
-
-        return complexity
+    def calculate_complexity(self, frame):
+        return frameAnalyzer.analyze(frame).complexity
 
     def process_current_frame(self, frame, complexity):
         if self.threshold is None:  
@@ -52,86 +53,15 @@ class ChromaticAberration:
 
     def _complex_frame_effect(self, frame, complexity, intensity):
         h, w = frame.shape[:2]
-    
-        j, i = np.meshgrid(np.arange(w), np.arange(h))
-        x = (j - w/2) / (w/2)
-        y = (i - h/2) / (h/2)
-        
-        r = np.sqrt(x**2 + y**2)
+        b_maps, g_maps, r_maps = warpMaps.get(chromatic_aberration_maps, h, w, intensity)
 
-        safe_r = np.maximum(r, 0.001)
-        radial_x = x / safe_r 
-        radial_y = y / safe_r 
-        
-        b_shift = intensity * 2.0 * r**2
-        g_shift = intensity * 0.3 * r**2 
-        r_shift = intensity * -1.5 * r**2 
-        
-        x_b = x + b_shift * radial_x
-        y_b = y + b_shift * radial_y
-        
-        x_g = x + g_shift * radial_x
-        y_g = y + g_shift * radial_y
-        
-        x_r = x + r_shift * radial_x  
-        y_r = y + r_shift * radial_y
-        
-        map_x_b = (x_b * (w/2)) + w/2
-        map_y_b = (y_b * (h/2)) + h/2
-        
-        map_x_g = (x_g * (w/2)) + w/2
-        map_y_g = (y_g * (h/2)) + h/2
-        
-        map_x_r = (x_r * (w/2)) + w/2
-        map_y_r = (y_r * (h/2)) + h/2
-        
         b, g, r = cv.split(frame)
-        
-        b_shifted = cv.remap(b, map_x_b.astype(np.float32), map_y_b.astype(np.float32), cv.INTER_LINEAR)
-        g_shifted = cv.remap(g, map_x_g.astype(np.float32), map_y_g.astype(np.float32), cv.INTER_LINEAR)  
-        r_shifted = cv.remap(r, map_x_r.astype(np.float32), map_y_r.astype(np.float32), cv.INTER_LINEAR)
-        
+
+        b_shifted = cv.remap(b, *b_maps, cv.INTER_LINEAR)
+        g_shifted = cv.remap(g, *g_maps, cv.INTER_LINEAR)
+        r_shifted = cv.remap(r, *r_maps, cv.INTER_LINEAR)
+
         return cv.merge([b_shifted, g_shifted, r_shifted])
     
     def _simple_frame_effect(self, frame, complexity, intensity):
-        h, w = frame.shape[:2]
-    
-        j, i = np.meshgrid(np.arange(w), np.arange(h))
-        x = (j - w/2) / (w/2)
-        y = (i - h/2) / (h/2)
-        
-        r = np.sqrt(x**2 + y**2)
-        
-        safe_r = np.maximum(r, 0.001)
-        radial_x = x / safe_r 
-        radial_y = y / safe_r 
-        
-        b_shift = intensity * 2.0 * r**2
-        g_shift = intensity * 0.3 * r**2 
-        r_shift = intensity * -1.5 * r**2 
-        
-        x_b = x + b_shift * radial_x
-        y_b = y + b_shift * radial_y
-        
-        x_g = x + g_shift * radial_x
-        y_g = y + g_shift * radial_y
-        
-        x_r = x + r_shift * radial_x  
-        y_r = y + r_shift * radial_y
-        
-        map_x_b = (x_b * (w/2)) + w/2
-        map_y_b = (y_b * (h/2)) + h/2
-        
-        map_x_g = (x_g * (w/2)) + w/2
-        map_y_g = (y_g * (h/2)) + h/2
-        
-        map_x_r = (x_r * (w/2)) + w/2
-        map_y_r = (y_r * (h/2)) + h/2
-        
-        b, g, r = cv.split(frame)
-        
-        b_shifted = cv.remap(b, map_x_b.astype(np.float32), map_y_b.astype(np.float32), cv.INTER_LINEAR)
-        g_shifted = cv.remap(g, map_x_g.astype(np.float32), map_y_g.astype(np.float32), cv.INTER_LINEAR)  
-        r_shifted = cv.remap(r, map_x_r.astype(np.float32), map_y_r.astype(np.float32), cv.INTER_LINEAR)
-        
-        return cv.merge([b_shifted, g_shifted, r_shifted])
\ No newline at end of file
+        return self._complex_frame_effect(frame, complexity, intensity)
@@ -6,26 +6,41 @@ import time
 from colorama import Fore, Back, Style, init
 
 from utils.normalizers import Normalizer
+from utils.warp_maps import warpMaps, kaleidoscope_maps, channel_shifting_shifts, roll_rows
+from utils.color_transforms import colorTables, lut_from, permutation_matrix, hue_shift_lut
+from utils.colorspace import colorspace, staged, lookup
+from utils.frame_buffers import accepts_dst
+from processors.calibrator import Calibrator
+from processors.frame_analyzer import FrameAnalyzer
+from modules.registry import register_module, effect
 
 normalizer = Normalizer()
+frameAnalyzer = FrameAnalyzer()
 init(autoreset=True)
 
+@register_module("ColorChaos")
 class ColorChaos:
     def __init__(self):
         self.name = "ColorChaos Effect"
 
-        self.frames = []
-        self.processed_frames = []
+        self.frame_count = 0
+        self.last_processed_frame = None
 
-        self.complexities = []
+        self.calibrator = Calibrator()
         self.threshold = None
+        self.analysis = None
 
         self.color_palettes = {}
         self.effect_history = []
 
         self.start_time = time.time()
+        self.clock = None
         self.current_effect = None
         self.effect_duration = 0
+
+        # INTER_CUBIC keeps renders smooth, live feeds can trade it for INTER_LINEAR
+        self.sine_interpolation = cv.INTER_CUBIC
+        self.sine_maps = {}
         
         self._generate_color_palettes()
 
@@ -39,25 +54,24 @@ class ColorChaos:
         }
 
     def calculate_complexity(self, frame):
-        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        variance = np.var(gray)
-
-        edges = cv.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
+        return frameAnalyzer.analyze(frame).complexity
     
-        brightness_std = np.std(gray) / 255.0
+    def effect_time(self):
+        """
+        Seconds the animations run on, the frame clock's when one is set, the wall clock's otherwise.
+        """
 
-        complexity = np.log1p(variance) * 0.5 + edge_density * 0.3 + brightness_std * 0.2
+        return self.clock() if self.clock is not None else time.time() - self.start_time
 
-        return complexity
-    
-    def add_frame(self, frame):
-        self.frames.append(frame)
-        complexity = self.calculate_complexity(frame)
-        self.complexities.append(complexity)
+    def add_frame(self, frame, analysis=None):
+        if analysis is None:
+            analysis = frameAnalyzer.analyze(frame)
 
-        if len(self.complexities) > 10 and len(self.complexities) % 10 == 0 or self.threshold == None:
-            self.threshold = np.mean(self.complexities)
+        self.analysis = analysis
+        self.frame_count += 1
+
+        if self.calibrator.add(analysis.complexity):
+            self.threshold = self.calibrator.threshold
 
     def process_current_frame(self, frame, complexity):
         if self.threshold is None:  
@@ -89,17 +103,20 @@ class ColorChaos:
         match self.current_effect:
             case "channel_swap":
                 return self.channel_swap(frame)
+            case "color_blast":
+                # left over from a simple frame whose effect is still running
+                return self.color_blast(frame, complexity)
             case "psychedelic_master":
-                time_counter = time.time() - self.start_time
+                time_counter = self.effect_time()
                 return self.psychedelic_master(frame, time_counter)
             case "hue_shift":
                 return self.hue_shift(frame)
             case "sine_distortion":
-                time_counter = time.time() - self.start_time
+                time_counter = self.effect_time()
                 wave_strength = 5 + 3 * math.sin(time_counter * 0.03) 
                 return self.sine_distortion(frame, time_counter * 0.5, wave_strength)
             case "rgb_split":
-                time_counter = time.time() - self.start_time
+                time_counter = self.effect_time()
                 split_amount = int(2 + math.sin(time_counter * 0.2) * 3) 
                 return self.rgb_split(frame, split_amount)
             case "channel_shifting":
@@ -109,7 +126,7 @@ class ColorChaos:
             case "lcd_tan_shift":
                 return self.lcd_tan_shift(frame)
             case "kaleidoscope":
-                time_counter = time.time() - self.start_time
+                time_counter = self.effect_time()
                 if int(time_counter) % 120 == 0: 
                     segments = random.choice([4, 6, 8])
                     return self.kaleidoscope(frame, segments)
@@ -139,16 +156,16 @@ class ColorChaos:
             case "color_blast":
                 return self.color_blast(frame, complexity)
             case "psychedelic_master":
-                time_counter = time.time() - self.start_time
+                time_counter = self.effect_time()
                 return self.psychedelic_master(frame, time_counter)
             case "hue_shift":
                 return self.hue_shift(frame)
             case "sine_distortion":
-                time_counter = time.time() - self.start_time
+                time_counter = self.effect_time()
                 wave_strength = 5 + 3 * math.sin(time_counter * 0.03) 
                 return self.sine_distortion(frame, time_counter * 0.5, wave_strength)
             case "rgb_split":
-                time_counter = time.time() - self.start_time
+                time_counter = self.effect_time()
                 split_amount = int(2 + math.sin(time_counter * 0.2) * 3) 
                 return self.rgb_split(frame, split_amount)
             case "channel_shifting":
@@ -158,54 +175,60 @@ class ColorChaos:
             case "lcd_tan_shift":
                  return self.lcd_tan_shift(frame)
             case "kaleidoscope":
-                time_counter = time.time() - self.start_time
+                time_counter = self.effect_time()
                 if int(time_counter) % 120 == 0: 
                     segments = random.choice([4, 6, 8])
                     return self.kaleidoscope(frame, segments)
                 else :
                     return frame
     
-    def channel_swap(self, frame):
-        result_frame = frame.copy()
-        b, g, r = cv.split(result_frame)
-        channels = [b, g, r]
-        random.shuffle(channels)
-        return cv.merge(channels) 
+    @effect(cost='low', kind='pixel')
+    @accepts_dst
+    def channel_swap(self, frame, dst=None):
+        order = [0, 1, 2]
+        random.shuffle(order)
+        return cv.transform(frame, colorTables.get(permutation_matrix, tuple(order)), dst=dst)
     
-    def color_blast(self, frame, complexity=None):
+    @effect(cost='low', kind='pixel', stateful=True)
+    @lookup
+    def color_blast(self, complexity=None):
         if complexity is None or self.threshold == 0:
-            complexity = self.complexities[-1]
+            complexity = self.calibrator.latest
             self.threshold = 1
         
-        result_frame = frame.copy()
         intensity = min(0.3, complexity / (self.threshold * 8))
     
         color = np.array([random.randint(0, 255) for _ in range(3)], dtype=np.uint8)
         
-        result = result_frame.astype(np.float32) * (1 - intensity) + color * intensity
-        return result.astype(np.uint8)
+        # random color every frame, the 256 entry table is rebuilt instead of cached
+        return lut_from(lambda levels: levels.astype(np.float32) * (1 - intensity) + color * intensity)
     
     # ------------------- Defining Psychedelic concepts from here ------------------- 
 
+    @effect(cost='low', kind='pixel', stateful=True)
+    @staged('_hue_scale')
     def hue_shift(self, frame):
-        result_frame = frame.copy()
-        time_elapsed = time.time() - self.start_time
+        """
+        Scales the hue around the HSV circle, amount swinging with time.
+        """
+
+    @colorspace('HSV')
+    @lookup
+    def _hue_scale(self):
+        time_elapsed = self.effect_time()
         shift_amount = int(np.sin(time_elapsed * 0.5) * 30)
 
-        hsv = cv.cvtColor(result_frame, cv.COLOR_BGR2HSV)
-
-        hue_channel = hsv[:, :, 0]
-        
-        hue_channel_int = hue_channel.astype(np.int32)
-        new_hue = (hue_channel_int * shift_amount) % 180
-        
-        hsv[:, :, 0] = new_hue.astype(np.uint8)
-
-        return cv.cvtColor(hsv, cv.COLOR_HSV2BGR)
+        return colorTables.get(hue_shift_lut, shift_amount)
     
-    def sine_distortion(self, frame, time=time.time(), wave_strength = 5 + 3 * math.sin(time.time() * 0.03) , smooth_factor=0.1, speed_factor=2.0):
-        result_frame = frame.copy()
-        h, w = result_frame.shape[:2]
+    @effect(cost='medium', kind='geometric', stateful=True)
+    @accepts_dst
+    def sine_distortion(self, frame, time=None, wave_strength=None, smooth_factor=0.1, speed_factor=2.0, interpolation=None, dst=None):
+        h, w = frame.shape[:2]
+
+        if time is None:
+            time = self.effect_time() * 0.5
+        if wave_strength is None:
+            wave_strength = 5 + 3 * math.sin(time * 0.06)
 
         if not hasattr(self, 'prev_time'):
             self.prev_time = time
@@ -214,120 +237,115 @@ class ColorChaos:
 
         smoothed_time = self.prev_time * (1 - smooth_factor) + sped_up_time * smooth_factor
         self.prev_time = smoothed_time
-        
-        y_coords, x_coords = np.indices((h, w))
-        
-        wave_x = np.sin(y_coords * 0.05 + smoothed_time) * wave_strength
-        wave_y = np.cos(x_coords * 0.05 + smoothed_time) * wave_strength
-        
-        map_x = np.clip(x_coords + wave_x, 0, w-1).astype(np.float32)
-        map_y = np.clip(y_coords + wave_y, 0, h-1).astype(np.float32)
-        
-        distorted = cv.remap(result_frame, map_x, map_y, 
-                            interpolation=cv.INTER_CUBIC,
+
+        rows, columns, map_x, map_y = self._sine_map_buffers(h, w)
+
+        # wave_x only varies with the row and wave_y only with the column, so both maps are a broadcast of two 1-D vectors
+        wave_x = (np.sin(rows * 0.05 + smoothed_time) * wave_strength).astype(np.float32)
+        wave_y = (np.cos(columns * 0.05 + smoothed_time) * wave_strength).astype(np.float32)
+
+        np.add(columns, wave_x[:, np.newaxis], out=map_x)
+        np.clip(map_x, 0, w-1, out=map_x)
+
+        np.add(rows[:, np.newaxis], wave_y, out=map_y)
+        np.clip(map_y, 0, h-1, out=map_y)
+
+        distorted = cv.remap(frame, map_x, map_y, dst=dst,
+                            interpolation=interpolation if interpolation is not None else self.sine_interpolation,
                             borderMode=cv.BORDER_REFLECT)
         
         return distorted
-    
-    def rgb_split(self, frame, offset=1):
-        result_frame = frame.copy()
-        offset = int(2 + math.sin(time.time() - self.start_time * 0.2) * 3) 
-        b, g, r = cv.split(result_frame)
 
-        b_shifted = np.roll(b, offset, axis=1)
-        g_shifted = np.roll(g, 0, axis=1)
-        r_shifted = np.roll(r, -offset, axis=1)
+    def _sine_map_buffers(self, h, w):
+        if (h, w) not in self.sine_maps:
+            rows = np.arange(h, dtype=np.float32)
+            columns = np.arange(w, dtype=np.float32)
 
-        return cv.merge([b_shifted, g_shifted, r_shifted])
-    
-    def channel_shifting(self, frame):
-        result_frame = frame.copy()
-        b, g, r = cv.split(result_frame)
-        h, w = r.shape
-
-        for i in range(h):
-            shift = 1024 + int(np.sin(i * 0.03) * 2)
-            r[i] = np.roll(r[i], shift)
-        
-            if i % 3 == 0:
-                b[i] = np.roll(b[i], -3)
-    
-        return cv.merge([b, g, r])
+            self.sine_maps[(h, w)] = (rows, columns, np.empty((h, w), np.float32), np.empty((h, w), np.float32))
+
+        return self.sine_maps[(h, w)]
     
-    def lcd_sine_shift(self, frame):
-        result_frame = frame.copy()
-        h, w, _ = result_frame.shape
+    @effect(cost='medium', kind='geometric', stateful=True)
+    @accepts_dst
+    def rgb_split(self, frame, offset=1, dst=None):
+        offset = int(2 + math.sin(self.effect_time()) * 3) 
 
-        x = 0
-        y = 0
+        # blue and red rolled in opposite directions, straight into the output
+        result = np.empty_like(frame) if dst is None else dst
+        roll_rows(result, frame, slice(None), 0, offset)
+        roll_rows(result, frame, slice(None), 1, 0)
+        roll_rows(result, frame, slice(None), 2, -offset)
 
-        shift_amount = 3 + 8 * np.sin(time.time() - self.start_time * 0.01)
+        return result
+    
+    @effect(cost='medium', kind='geometric')
+    @accepts_dst
+    def channel_shifting(self, frame, dst=None):
+        h, w = frame.shape[:2]
+        r_runs, b_runs = warpMaps.get(channel_shifting_shifts, h, w)
+
+        if dst is None:
+            result = frame.copy()
+        else:
+            result = dst
+            np.copyto(result, frame)
 
-        if shift_amount < 0:
-            shift_amount = 5 + 12 * np.sin(time.time() - self.start_time * 0.01)
-            result_frame[y:y+h, x:x+w] = result_frame[y:y+h, x:x+w] * shift_amount
-        else :
-            result_frame[y:y+h, x:x+w] = result_frame[y:y+h, x:x+w] * shift_amount
+        for start, end, shift in r_runs:
+            roll_rows(result, frame, slice(start, end), 2, shift)
 
-        result_frame[y:y+h, x:x+w] = np.roll(result_frame[y:y+h, x:x+w], shift_amount, axis = 1)
+        for start, end, shift in b_runs:
+            roll_rows(result, frame, slice(start, end, 3), 0, shift)
 
-        return result_frame
+        return result
     
-    def lcd_tan_shift(self, frame):
-        result_frame = frame.copy()
-        h, w, _ = result_frame.shape
+    @effect(cost='low', kind='geometric', stateful=True)
+    @accepts_dst
+    def lcd_sine_shift(self, frame, dst=None):
+        shift_amount = 3 + 8 * np.sin(self.effect_time())
 
-        x = 0
-        y = 0
+        if shift_amount < 0:
+            shift_amount = 5 + 12 * np.sin(self.effect_time())
 
-        shift_amount = 3 + 8 * np.tan(time.time() - self.start_time * 0.01)
+        return self._lcd_shift(frame, shift_amount, dst)
+    
+    @effect(cost='low', kind='geometric', stateful=True)
+    @accepts_dst
+    def lcd_tan_shift(self, frame, dst=None):
+        shift_amount = 3 + 8 * np.tan(self.effect_time())
 
         if shift_amount < 0:
-            shift_amount = 5 + 12 * np.tan(time.time() - self.start_time * 0.01)
-            result_frame[y:y+h, x:x+w] = result_frame[y:y+h, x:x+w] * shift_amount
-        else :
-            result_frame[y:y+h, x:x+w] = result_frame[y:y+h, x:x+w] * shift_amount
+            shift_amount = 5 + 12 * np.tan(self.effect_time())
+
+        return self._lcd_shift(frame, shift_amount, dst)
+
+    def _lcd_shift(self, frame, shift_amount, dst=None):
+        w = frame.shape[1]
+        offset = int(shift_amount) % w
+
+        result = np.empty_like(frame) if dst is None else dst
+        result[:, offset:] = frame[:, :w-offset]
+        result[:, :offset] = frame[:, w-offset:]
+
+        return cv.LUT(result, self._wrapping_scale_lut(shift_amount), dst=result)
 
-        result_frame[y:y+h, x:x+w] = np.roll(result_frame[y:y+h, x:x+w], shift_amount, axis = 1)
+    def _wrapping_scale_lut(self, scale):
+        """
+        Scaling a uint8 frame by a float and storing it back wraps around at 256,
+        which is what gives the LCD shifts their banding. A 256 entry table keeps
+        that look without ever building a float64 frame.
+        """
 
-        return result_frame
+        levels = np.arange(256, dtype=np.float64)
+        return (np.fmod(np.trunc(levels * scale), 256) % 256).astype(np.uint8)
     
-    def kaleidoscope(self, frame, num_segments=6):
-        result_frame = frame.copy()
-        h, w = result_frame.shape[:2]
-        center_x, center_y = w // 2, h // 2
-        radius = min(center_x, center_y)
-        
-        y, x = np.ogrid[:h, :w]
-        
-        dx = x - center_x
-        dy = y - center_y
-        r = np.sqrt(dx**2 + dy**2)
-        theta = np.arctan2(dy, dx) * 180 / np.pi  
-        theta = (theta + 360) % 360 
-        
-        circle_mask = r <= radius
-        
-        angle_step = 360.0 / num_segments
-        normalized_theta = theta % angle_step
-        
-        source_theta = np.where(normalized_theta <= angle_step / 2, 
-                            normalized_theta, 
-                            angle_step - normalized_theta)
-        
-        source_theta = source_theta + (theta // angle_step) * angle_step
-        
-        source_theta_rad = source_theta * np.pi / 180
-        source_x = (r * np.cos(source_theta_rad) + center_x).astype(int)
-        source_y = (r * np.sin(source_theta_rad) + center_y).astype(int)
-        
-        source_x = np.clip(source_x, 0, w-1)
-        source_y = np.clip(source_y, 0, h-1)
-        
-        result = np.zeros_like(result_frame)
-        result[circle_mask] = result_frame[source_y[circle_mask], source_x[circle_mask]]
-        
-        return result
+    @effect(cost='medium', kind='geometric')
+    @accepts_dst
+    def kaleidoscope(self, frame, num_segments=6, dst=None):
+        h, w = frame.shape[:2]
+        map1, map2 = warpMaps.get(kaleidoscope_maps, h, w, num_segments)
+
+        return cv.remap(frame, map1, map2, cv.INTER_NEAREST, dst=dst,
+                        borderMode=cv.BORDER_CONSTANT, borderValue=0)
     
     def psychedelic_master(self, frame, time_counter):
         result = frame.copy()
@@ -349,4 +367,4 @@ class ColorChaos:
             segments = random.choice([4, 6, 8])
             result = self.kaleidoscope(result, segments)
         
-        return result
\ No newline at end of file
+        return result
@@ -5,77 +5,110 @@ import math
 import random
 from colorama import Fore, Back, Style, init
 
-from processors.face_detection import FaceDetector
+from processors.face_detection import faceDetector
+from processors.face_tracker import FaceTracker, AsyncFaceTracker
+from processors.calibrator import Calibrator
+from processors.frame_analyzer import FrameAnalyzer
 from scripts.configure import Configure
-from modules.color_chaos import ColorChaos
 from utils.console_logger import ConsoleLogger
+from utils.frame_buffers import accepts_dst
+from modules.registry import register_module, effect
 
-faceDetector = FaceDetector()
-color_chaos = ColorChaos()
+frameAnalyzer = FrameAnalyzer()
 logger = ConsoleLogger()
 configure = Configure()
 
-config = configure.load_config()
-
+@register_module("FacialArtifacts")
 class FacialArtifacts:
 
     def __init__(self):
         self.name = None
 
-        self.frames = []
-        self.processed_frames = []
+        self.frame_count = 0
+        self.last_processed_frame = None
 
-        self.complexities = []
+        self.calibrator = Calibrator()
         self.threshold = None
+        self.analysis = None
 
         self.start_time = time.time()
+        self.clock = None
 
         self.stored_image_path = None
+        self.config = None
+
+        # one cascade pass every 10 frames, boxes are tracked in between and shared by all effects of a frame
+        self.tracker = FaceTracker(faceDetector, detect_interval=10)
+
+    def effect_time(self):
+        """
+        Seconds the animations run on, the frame clock's when one is set, the wall clock's otherwise.
+        """
+
+        return self.clock() if self.clock is not None else time.time() - self.start_time
 
-    def add_frame(self, frame):
-        self.frames.append(frame)
-        complexity = self.calculate_complexity(frame)
-        self.complexities.append(complexity)
+    def add_frame(self, frame, analysis=None):
+        if analysis is None:
+            analysis = frameAnalyzer.analyze(frame)
 
-        if len(self.complexities) > 10 and len(self.complexities) % 10 == 0 or self.threshold == None:
-            self.threshold = np.mean(self.complexities)
+        self.analysis = analysis
+        self.frame_count += 1
+
+        if self.calibrator.add(analysis.complexity):
+            self.threshold = self.calibrator.threshold
 
     def calculate_complexity(self, frame):
-        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        variance = np.var(gray)
+        return frameAnalyzer.analyze(frame).complexity
 
-        edges = cv.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
+    def use_async_detection(self, motion_compensation=True):
+        """
+        Live modes, the cascades move to a background thread and effects use the latest boxes without waiting.
+        The thread gets its own detector, the smile search keeps running on the shared one in this thread.
+        """
 
-        brightness_std = np.std(gray) / 255.0
+        self.tracker = AsyncFaceTracker(faceDetector.copy(), motion_compensation=motion_compensation)
 
-        complexity = np.log1p(variance) * 0.5 + edge_density * 0.3 + brightness_std * 0.2
+    def stop_detection(self):
+        if isinstance(self.tracker, AsyncFaceTracker):
+            self.tracker.stop()
 
-        return complexity
+    def _detections(self, frame):
+        return self.tracker.update(frame, self.frame_count)
 
-    def blur_face(self, frame):
+    @effect(cost='high', kind='filter', stateful=True)
+    @accepts_dst
+    def blur_face(self, frame, dst=None):
         self.name = "Face blurring effect"
-        faces = faceDetector.detect_face(frame)
-        result_frame = frame.copy()
+        faces = self._detections(frame).faces
 
-        for (x,y,h,w) in faces:
-            result_frame[y:y+h, x:x+w] = cv.blur(result_frame[y:y+h, x:x+w], ((20, 80)))
+        return self._blur_boxes(frame, faces, dst)
 
-        return result_frame
-
-    def blur_eye(self, frame):
+    @effect(cost='high', kind='filter', stateful=True)
+    @accepts_dst
+    def blur_eye(self, frame, dst=None):
         self.name = "Eye blurring effect"
-        eyes = faceDetector.detect_eyes(frame)
-        result_frame = frame.copy()
+        eyes = self._detections(frame).eyes
 
-        for (x,y,h,w) in eyes:
-            result_frame[y:y+h, x:x+w] = cv.blur(result_frame[y:y+h, x:x+w], ((20, 80)))
+        return self._blur_boxes(frame, eyes, dst)
+
+    def _blur_boxes(self, frame, boxes, dst=None):
+        if dst is None:
+            result_frame = frame.copy()
+        else:
+            result_frame = dst
+            np.copyto(result_frame, frame)
+
+        # blurred in place, box filters don't need a separate output
+        for (x,y,h,w) in boxes:
+            region = result_frame[y:y+h, x:x+w]
+            cv.blur(region, ((20, 80)), dst=region)
 
         return result_frame
 
+    @effect(cost='medium', kind='geometric', stateful=True)
     def rgb_split(self, frame):
         b, g, r = cv.split(frame)
-        g_shift = math.floor(5 * np.sin((self.start_time - time.time()) * 0.01 ))
+        g_shift = math.floor(5 * np.sin(-self.effect_time() * 0.01))
 
         shift = 10
         b_shifted = np.roll(b, shift, axis=1)
@@ -85,8 +118,9 @@ class FacialArtifacts:
         frame = cv.merge([b_shifted, g_shifted, r_shifted])
         return frame
 
+    @effect(cost='high', kind='geometric', stateful=True)
     def scan_face(self, frame):
-        faces = faceDetector.detect_face(frame)
+        faces = self._detections(frame).faces
         result_frame = frame.copy()
 
         for (x, y, h, w) in faces:
@@ -98,34 +132,37 @@ class FacialArtifacts:
 
         return result_frame
 
+    @effect(cost='high', kind='geometric', stateful=True)
     def psychedelic_face_shift(self, frame):
         self.name = "Psychedelic face shift effect"
-        faces = faceDetector.detect_face(frame)
+        faces = self._detections(frame).faces
         result_frame = frame.copy()
 
         for (x, y, h, w) in faces:
-            shift_amount = 3 + 5 * np.tan(time.time() - self.start_time * 0.01)
+            shift_amount = 3 + 5 * np.tan(self.effect_time())
             result_frame[y:y+h, x:x+w] = result_frame[y:y+h, x:x+w] * shift_amount
 
             result_frame[y:y+h, x:x+w] = np.roll(result_frame[y:y+h, x:x+w], shift_amount, axis = 1)
 
         return result_frame
 
+    @effect(cost='high', kind='geometric', stateful=True)
     def psychedelic_eye_shift(self, frame):
         self.name = "Psychedelic eye shift effect"
-        eyes = faceDetector.detect_eyes(frame)
+        eyes = self._detections(frame).eyes
         result_frame = frame.copy()
 
         for (x, y, h, w) in eyes:
-            shift_amount = 3 + 5 * np.sin(time.time() - self.start_time * 0.01)
+            shift_amount = 3 + 5 * np.sin(self.effect_time())
             result_frame[y:y+h, x:x+w] = result_frame[y:y+h, x:x+w] * shift_amount
 
             result_frame[y:y+h, x:x+w] = np.roll(result_frame[y:y+h, x:x+w], shift_amount, axis = 1)
 
         return result_frame
 
+    @effect(cost='high', kind='filter', stateful=True)
     def mark_face(self, frame):
-        faces = faceDetector.detect_face(frame)
+        faces = self._detections(frame).faces
         result_frame = frame.copy()
 
         for (x,y,h,w) in faces:
@@ -138,10 +175,14 @@ class FacialArtifacts:
 
         return result_frame
 
+    @effect(cost='high', kind='filter', stateful=True)
     def face_filter(self, frame):
-        faces = faceDetector.detect_face(frame)
+        faces = self._detections(frame).faces
         result_frame = frame.copy()
 
+        if self.config is None:
+            self.config = configure.load_config()
+
         if self.stored_image_path is None:
             self.stored_image_path = input("Enter image name to combine with: ")
 
@@ -150,7 +191,7 @@ class FacialArtifacts:
                 extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.webp']
 
                 for ext in extensions:
-                    img_path = f"{config["assets"]["assets_images"]}{self.stored_image_path}{ext}"
+                    img_path = f"{self.config['assets']['assets_images']}{self.stored_image_path}{ext}"
                     img = cv.imread(img_path)
                     if img is not None:
                         break
@@ -172,8 +213,9 @@ class FacialArtifacts:
 
         return result_frame
 
+    @effect(cost='high', kind='filter', stateful=True)
     def detect_smile(self, frame):
-        smile = faceDetector.detect_smile(frame)
+        smile = faceDetector.detect_smile(frame, self._detections(frame).faces)
         result_frame = frame.copy()
 
         for (x, y, h, w) in smile:
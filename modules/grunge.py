@@ -10,41 +10,53 @@ from colorama import Fore, Back, Style, init
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.normalizers import Normalizer
+from utils.color_transforms import (colorTables, channel_table, bleach_washout_lut, saturation_boost_lut,
+                                    warm_tint_lut, washed_emo_lut, burn_threshold_lut, equalize_lut)
+from utils.colorspace import colorspace, staged, lookup, run_chain
+from utils.warp_maps import warpMaps
+from utils.filters import pyramid_blur, vignette_mask, grain_field, film_grain
+from utils.frame_buffers import accepts_dst
+from processors.calibrator import Calibrator
+from processors.frame_analyzer import FrameAnalyzer
+from modules.registry import register_module, effect
 
 normalizer = Normalizer()
+frameAnalyzer = FrameAnalyzer()
 
+@register_module("Grunge")
 class Grunge:
     def __init__(self):
         self.name = "Grunge Effect"
 
-        self.frames = []
-        self.processed_frames = []
+        self.frame_count = 0
+        self.last_processed_frame = None
 
-        self.complexities = []
+        self.calibrator = Calibrator()
         self.threshold = None
+        self.analysis = None
 
         self.start_time = time.time()
+        self.clock = None
 
-    def add_frame(self, frame):
-        self.frames.append(frame)
-        complexity = self.calculate_complexity(frame)
-        self.complexities.append(complexity)
+    def effect_time(self):
+        """
+        Seconds the animations run on, the frame clock's when one is set, the wall clock's otherwise.
+        """
 
-        if len(self.complexities) > 10 and len(self.complexities) % 10 == 0 or self.threshold == None:
-            self.threshold = np.mean(self.complexities)
+        return self.clock() if self.clock is not None else time.time() - self.start_time
 
-    def calculate_complexity(self, frame):
-        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        variance = np.var(gray)
+    def add_frame(self, frame, analysis=None):
+        if analysis is None:
+            analysis = frameAnalyzer.analyze(frame)
 
-        edges = cv.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
-    
-        brightness_std = np.std(gray) / 255.0
+        self.analysis = analysis
+        self.frame_count += 1
 
-        complexity = np.log1p(variance) * 0.5 + edge_density * 0.3 + brightness_std * 0.2
+        if self.calibrator.add(analysis.complexity):
+            self.threshold = self.calibrator.threshold
 
-        return complexity
+    def calculate_complexity(self, frame):
+        return frameAnalyzer.analyze(frame).complexity
 
     def process_current_frame(self, frame, complexity):
         if self.threshold is None:  
@@ -57,101 +69,93 @@ class Grunge:
         else:   
             return self.grunge_master_simple(frame, complexity)
 
+    @effect(cost='medium', kind='pixel')
+    @staged('_bleach_contrast', '_bleach_washout')
     def grunge_bleach_bypass(self, frame):
-        # High contrast + reduced saturation
-        lab = cv.cvtColor(frame, cv.COLOR_BGR2LAB)
-        lab[:, :, 0] = cv.equalizeHist(lab[:, :, 0])
-        frame = cv.cvtColor(lab, cv.COLOR_LAB2BGR)
-    
+        """
+        High contrast + reduced saturation.
+        """
+
+    @colorspace('LAB')
+    def _bleach_contrast(self, lab):
+        # equalizeHist of L as a table, no copy of the channel out and back
+        return cv.LUT(lab, equalize_lut(lab, 0), dst=lab)
+
+    @lookup
+    def _bleach_washout(self):
         # Wash out colors
-        frame = cv.addWeighted(frame, 0.8, 
-                          np.full_like(frame, 25), 0.2, 0) 
-    
-        return frame
+        return colorTables.get(bleach_washout_lut)
     
+    @effect(cost='medium', kind='filter')
+    @staged('_emo_bloom', '_emo_saturation')
     def emo_bloom_effect(self, frame):
-        bright_mask = cv.inRange(frame, (150, 150, 150), (255, 255, 255))
-        
-        bloom = cv.GaussianBlur(frame, (35, 35), 0)
-        
-        result = cv.addWeighted(frame, 0.7, bloom, 0.4, 0)
-        
-        hsv = cv.cvtColor(result, cv.COLOR_BGR2HSV)
-        hsv[:, :, 1] = np.clip(hsv[:, :, 1] * 1.3, 0, 255)
-        result = cv.cvtColor(hsv, cv.COLOR_HSV2BGR)
+        """
+        Soft glow over the frame, then a saturation push.
+        """
+
+    @accepts_dst
+    def _emo_bloom(self, frame, dst=None):
+        bloom = pyramid_blur(frame, 35, dst=dst)
         
-        return result
+        return cv.addWeighted(frame, 0.7, bloom, 0.4, 0, dst=dst)
+
+    @colorspace('HSV')
+    @lookup
+    def _emo_saturation(self):
+        return colorTables.get(saturation_boost_lut, 1.3)
     
-    def washed_emo_layers(self, frame):
+    @effect(cost='medium', kind='filter')
+    def washed_emo_layers(self, frame, pre_lut=None):
+        """
+        pre_lut is the table builder of a color stage still pending from the previous
+        effect, it's folded into the green and red tables instead of costing its own pass.
+        """
+
         b, g, r = cv.split(frame)
-        
-        r = np.clip(r.astype(np.float32) * 0.7, 0, 255)
+
+        if pre_lut is not None:
+            b = cv.LUT(b, channel_table(colorTables.get(pre_lut), 0))
         
         b = cv.GaussianBlur(b, (5, 5), 0)
-        b_noise = np.random.normal(0, 15, b.shape).astype(np.float32)
-        b = np.clip(b.astype(np.float32) * 0.9 + b_noise, 0, 255)
-        
-        g = np.clip(g.astype(np.float32) * 0.7, 0, 255)
-        
-        frame = cv.merge([b.astype(np.uint8), g.astype(np.uint8), r.astype(np.uint8)])
-        
-        frame = cv.convertScaleAbs(frame, alpha=1.1, beta=10)
+        h, w = b.shape
+        b = film_grain(b, warpMaps.get(grain_field, h, w, 1), 15, gain=0.9)
         
-        return frame
+        frame = cv.merge([b, g, r])
+
+        return cv.LUT(frame, colorTables.get(washed_emo_lut, pre_lut), dst=frame)
     
-    def burnify(self, frame):
-        b, g, r = cv.split(frame)
+    @effect(cost='low', kind='pixel', stateful=True)
+    @lookup
+    def burnify(self):
+        time_elapsed = self.effect_time()
 
-        b_manipulated = np.where(b < 128, np.clip(5 * np.sin((time.time() - self.start_time) * 0.05), 0, 100), np.clip(5 * np.cos((time.time() - self.start_time) * 0.05), 155, 255))
-        g_manipulated = np.where(g < 128, np.clip(5 * np.sin((time.time() - self.start_time) * 0.05), 0, 100), np.clip(5 * np.cos((time.time() - self.start_time) * 0.05), 155, 255))
-        r_manipulated = np.where(r < 128, np.clip(5 * np.sin((time.time() - self.start_time) * 0.05), 0, 100), np.clip(5 * np.cos((time.time() - self.start_time) * 0.05), 155, 255))
+        # the uint8 cast only leaves a few distinct tables, cached by their values
+        low = int(np.clip(5 * np.sin(time_elapsed * 0.05), 0, 100))
+        high = int(np.clip(5 * np.cos(time_elapsed * 0.05), 155, 255))
 
-        return cv.merge([b_manipulated.astype(np.uint8), g_manipulated.astype(np.uint8), r_manipulated.astype(np.uint8)])
+        return colorTables.get(burn_threshold_lut, low, high)
     
+    @effect(cost='medium', kind='filter')
     def dreamify(self, frame, intensity=5):
-        result = frame.copy()
-        h, w = result.shape[:2]
+        h, w = frame.shape[:2]
         
-        warm_tint = np.array([0.6, 0.8, 1.0])
-        result = result.astype(np.float32)
-        result[:,:,0] *= warm_tint[0]  # Less blue
-        result[:,:,1] *= warm_tint[1]  # Moderate green
-        result[:,:,2] *= warm_tint[2]  # More red
-        result = np.clip(result, 0, 255).astype(np.uint8)
+        result = cv.LUT(frame, colorTables.get(warm_tint_lut))
         
         result = cv.GaussianBlur(result, (intensity, intensity), 3)
         
-        vignette = np.ones((h, w), dtype=np.float32)
-        X, Y = np.ogrid[:h, :w]
-        center_x, center_y = h/2, w/2
-        radius = np.sqrt(center_x**2 + center_y**2)
-        dist = np.sqrt((X - center_x)**2 + (Y - center_y)**2)
-        vignette = 0.6 + 0.4 * (1 - (dist / radius)**2)
-        vignette = np.clip(vignette, 0.4, 1)
-        
-        for i in range(3):
-            result[:,:,i] = (result[:,:,i] * vignette).astype(np.uint8)
+        cv.multiply(result, warpMaps.get(vignette_mask, h, w), dst=result, scale=1/255)
         
-        noise = np.random.randn(h, w, 3) * intensity
-        result = result.astype(np.float32) + noise
-        result = np.clip(result, 0, 255).astype(np.uint8)
-        
-        return result
+        return film_grain(result, warpMaps.get(grain_field, h, w, 3), intensity)
 
     def grunge_master_complex(self, frame, complexity):
-        normalized_complexity = normalizer.perceptual_sigmoid(complexity, len(self.frames) // 2, 'texture', complexity)
+        normalized_complexity = normalizer.perceptual_sigmoid(complexity, self.frame_count // 2, 'texture', complexity)
         raw_intensity = int(random.randint(1, 3) * normalized_complexity * 5)
         intensity = max(1, min(10, raw_intensity))
 
         if intensity % 2 == 0:
             intensity += 1
 
-        frame = self.grunge_bleach_bypass(frame)
-        frame = self.washed_emo_layers(frame)
-        frame = self.emo_bloom_effect(frame)
-        frame = self.dreamify(frame, intensity)
-
-        return frame
+        return self._grunge_chain(frame, intensity)
     
     def grunge_master_simple(self, frame, complexity):
         normalized_complexity = normalizer.sigmoid_normalize(complexity)
@@ -161,9 +165,13 @@ class Grunge:
         if intensity % 2 == 0:
             intensity += 1
         
-        frame = self.grunge_bleach_bypass(frame)
-        frame = self.washed_emo_layers(frame)
-        frame = self.emo_bloom_effect(frame)
-        frame = self.dreamify(frame, intensity)
+        return self._grunge_chain(frame, intensity)
 
-        return frame
\ No newline at end of file
+    def _grunge_chain(self, frame, intensity):
+        # the bleach washout is left to washed_emo_layers, which folds it into its own table
+        return run_chain(frame, [
+            self._bleach_contrast,
+            lambda pixels: self.washed_emo_layers(pixels, pre_lut=bleach_washout_lut),
+            self.emo_bloom_effect,
+            lambda pixels: self.dreamify(pixels, intensity),
+        ])
@@ -1,94 +1,266 @@
 import cv2 as cv
 import numpy as np
-import inspect
+import time
 import sys
 import os
 from colorama import Fore, Back, Style, init
 
-# ------------------- Import modules from here -------------------
+# ------------------- Register modules from here -------------------
 
-from modules.color_chaos import ColorChaos
-from modules.tracker import Tracker
-from modules.vhs import VHS
-from modules.night_vision import NightVision
-from modules.facial_artifacts import FacialArtifacts
-from modules.chromatic_aberration import ChromaticAberration
-from modules.none import NoneModule
-from modules.grunge import Grunge
+# modules register their class and effects in moduleRegistry when imported,
+# they are imported and instantiated on first use
+from modules.registry import moduleRegistry
+
+from processors.frame_analyzer import FrameAnalyzer
+
+from utils.colorspace import ColorFrame, expand_stages, fuse_lookups
+from utils.frame_buffers import FramePool, AllocationCounter
+from utils.console_logger import ConsoleLogger
+
+logger = ConsoleLogger()
+
+class FrameClock:
+
+    """
+    Effect time of a render, frame_index / fps. A frame gets the same time no
+    matter how fast it renders or which worker renders it.
+    """
+
+    def __init__(self, fps):
+        # containers that don't report a frame rate count as 30 fps
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.frame_index = 0
+
+    def __call__(self):
+        return self.frame_index / self.fps
 
 class ModuleManager:
 
-    def __init__(self):
-        self.modules = {
-            "Tracker" : Tracker(),
-            "ColorChaos" : ColorChaos(),
-            "VHS" : VHS(),
-            "NightVision" : NightVision(),
-            "FacialArtifacts" : FacialArtifacts(),
-            "ChromaticAberration" : ChromaticAberration(),
-            "Grunge" : Grunge(),
-            "None" : NoneModule()
-        }
-
-        self.modules_functions = {}
+    def __init__(self, analysis_options=None):
+        # instances of the modules used so far, see get_module
+        self.modules = {}
+
+        self.frame_analyzer = FrameAnalyzer(**(analysis_options or {}))
+
         self.active_module = None
+        self.active_module_name = None
         self.active_module_effect = None
         self.module_history = []
         self.module_effects_history = []
         self.toggled = True
 
-        for module_name, module_instance in self.modules.items():
-            methods = inspect.getmembers(module_instance, predicate=inspect.ismethod)
+        # names of the modules run in order on every frame, active_module is the first one
+        self.module_chain = []
+
+        # (module chain, effect names) -> named stages, effect chains are resolved once
+        self.chains = {}
 
-            method_names = [
-                method[0] for method in methods
-                if not method[0].startswith('_') and not method[0].endswith('__') and not method[0].startswith("add") and not method[0].startswith("process") and not method[0].startswith("calculate") and not method[0].startswith("apply")
-            ]
+        # stage name -> [seconds, frames]
+        self.stage_times = {}
 
-            self.modules_functions[module_name] = method_names
+        # with --frame-pool intermediate frames of effect chains ping-pong between the buffers of the pool
+        self.frame_pool = FramePool()
+        self.allocations = None
 
+        # animations follow the wall clock unless a render sets a frame clock
+        self.clock = None
 
     def set_module(self, module_name):
-        if module_name in self.modules:
-            self.active_module = self.modules[module_name]
-            self.module_history.append(self.modules[module_name])
+        return self.set_modules([module_name])
 
-            return True
-        else:
-            print(f"Couldn't find module matching: {module_name}!")
-            print(f"Available modules are: {list(self.modules.keys())}")
-            return False
+    def set_modules(self, module_names):
+        """
+        Runs the modules one after the other on every frame, in a single decode / encode pass.
+        """
+
+        for module_name in module_names:
+            if module_name not in moduleRegistry.names():
+                print(f"Couldn't find module matching: {module_name}!")
+                print(f"Available modules are: {moduleRegistry.names()}")
+                return False
+
+        self.module_chain = list(module_names)
+        self.active_module_name = self.module_chain[0]
+        self.active_module = self.get_module(self.active_module_name)
+
+        for module_name in self.module_chain:
+            self.module_history.append(self.get_module(module_name))
+
+        return True
+
+    def chain_modules(self):
+        """
+        Modules of the chain, each once even if it's listed several times.
+        """
+
+        return [self.get_module(module_name) for module_name in dict.fromkeys(self.module_chain)]
+
+    def use_frame_clock(self, fps):
+        """
+        Animates the modules from the index of the frame given to add_frame instead of the wall clock.
+        """
+
+        self.clock = FrameClock(fps)
+
+        for module in self.modules.values():
+            module.clock = self.clock
+
+        return self.clock
+
+    def add_frame(self, frame, analysis, frame_index=None):
+        if self.clock is not None and frame_index is not None:
+            self.clock.frame_index = frame_index
+
+        # one analysis of the frame is shared by every module of the chain
+        for module in self.chain_modules():
+            module.add_frame(frame, analysis)
+
+    def resolve_chain(self, effect_names, module_names=None):
+        """
+        (name, bound stage) pairs of an effect chain, staged effects expanded and
+        consecutive lookup stages fused, even across effects and modules.
+        Every effect comes from the first module of the chain registering it,
+        names no module registers are reported once and left out.
+        """
+
+        module_names = tuple(module_names or self.module_chain)
+        key = (module_names, tuple(effect_names))
+
+        if key not in self.chains:
+            stages = []
+            names = {}
+            for effect_name in effect_names:
+                owner = next((module_name for module_name in module_names
+                              if effect_name in moduleRegistry.get(module_name).effects), None)
+
+                if owner is None:
+                    print(f"{effect_name}() not found in {', '.join(module_names)}")
+                    continue
+
+                if effect_name not in self.module_effects_history:
+                    self.module_effects_history.append(effect_name)
+
+                for stage in expand_stages([getattr(self.get_module(owner), effect_name)]):
+                    names[stage] = f"{owner}.{stage.__name__}"
+                    stages.append(stage)
+
+            self.chains[key] = [('+'.join(names[member] for member in getattr(stage, 'stages', [stage])), stage)
+                                for stage in fuse_lookups(stages)]
+
+        return self.chains[key]
+
+    def analyze_frame(self, frame):
+        return self.frame_analyzer.analyze(frame)
+
+    def process_frame(self, frame, analysis, args):
+        """
+        Runs the chain on the frame. The frame is handed from stage to stage
+        without copies, so it's the caller's to give away and may be drawn on.
+        """
 
-    def process_frame(self, frame, complexity, args):
         if not self.active_module or self.toggled == False:
             return frame
 
-        result = frame.copy()
+        complexity = analysis.complexity
+
+        result = frame
 
         if args.effects:
-            for effect_name in args.effects:
+            # the frame stays in the colorspace of the last stage until an effect needs another one
+            colorFrame = ColorFrame(result, keep_float=getattr(args, 'float_pipeline', False))
+            stages = self.resolve_chain(args.effects)
+
+            # off by default, it saves allocations but no measurable time
+            pool = self.frame_pool if getattr(args, 'frame_pool', False) else None
+
+            for index, (stage_name, stage) in enumerate(stages):
+                start = self._begin_stage()
+
                 try:
-                    if effect_name not in self.module_effects_history:
-                        self.module_effects_history.append(effect_name)
-                    method = getattr(self.active_module, effect_name)
-                    result = method(result)
-                except AttributeError:
-                    print(f"{effect_name}() not found in {self.active_module.__class__.__name__}")
+                    # the last stage allocates the output, the pool buffers get reused by the next frame
+                    colorFrame.apply(stage, pool, allocate_output=index == len(stages) - 1)
                 except Exception as e:
                     exc_type, exc_value, exc_traceback = sys.exc_info()
                     line_number = exc_traceback.tb_lineno
                     filename = exc_traceback.tb_frame.f_code.co_filename
 
                     print(f"Error => {exc_type} : {e} in file {os.path.basename(filename)} : line number {line_number}")
+
+                self._end_stage(stage_name, start)
+
+            result = colorFrame.to('BGR')
+
+            if pool is not None and pool.owns(result):
+                result = result.copy()
         else:
-            if hasattr(self.active_module, 'process_current_frame'):
-                result = self.active_module.process_current_frame(result, complexity)
+            for module_name in self.module_chain:
+                module = self.get_module(module_name)
+
+                if hasattr(module, 'process_current_frame'):
+                    start = self._begin_stage()
+                    result = module.process_current_frame(result, complexity)
+                    self._end_stage(module_name, start)
+
+        if self.allocations is not None:
+            self.allocations.end_frame()
+
+        for module in self.chain_modules():
+            module.last_processed_frame = result
 
         return result
 
+    def count_allocations(self):
+        """
+        Starts tracing the bytes every stage allocates, see AllocationCounter.
+        """
+
+        self.allocations = AllocationCounter().start()
+        return self.allocations
+
+    def _begin_stage(self):
+        baseline = self.allocations.begin_stage() if self.allocations is not None else None
+        return time.perf_counter(), baseline
+
+    def _end_stage(self, stage_name, start):
+        started, baseline = start
+
+        timing = self.stage_times.setdefault(stage_name, [0.0, 0])
+        timing[0] += time.perf_counter() - started
+        timing[1] += 1
+
+        if self.allocations is not None:
+            self.allocations.end_stage(stage_name, baseline)
+
+    def stage_stats(self):
+        """
+        Milliseconds per frame of every stage, in chain order.
+        """
+
+        return {stage_name: seconds / frames * 1000 for stage_name, (seconds, frames) in self.stage_times.items() if frames}
+
+    def logStageTimes(self):
+        stats = self.stage_stats()
+        if not stats:
+            return
+
+        total = sum(stats.values()) or 1.0
+        for stage_name, milliseconds in stats.items():
+            logger.info(f"⏱️ {stage_name} : {milliseconds:.1f} ms/frame ({milliseconds / total * 100:.0f}%)")
+
+        if self.allocations is not None:
+            for stage_name, allocated in self.allocations.stats().items():
+                logger.info(f"🧮 {stage_name} : {allocated / 1e6:.2f} MB allocated/frame")
+
+            logger.info(f"🧮 Allocated {self.allocations.per_frame() / 1e6:.2f} MB/frame, at most {self.allocations.max_frame_bytes / 1e6:.2f} MB")
+
     def get_active_module(self):
         return self.active_module
 
     def get_module(self, module_name):
-        module = self.modules[module_name]
-        return module
+        if module_name not in self.modules:
+            self.modules[module_name] = moduleRegistry.get(module_name).module_class()
+
+            if self.clock is not None:
+                self.modules[module_name].clock = self.clock
+
+        return self.modules[module_name]
\ No newline at end of file
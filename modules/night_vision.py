@@ -4,38 +4,43 @@ import random
 import time
 from colorama import Fore, Back, Style, init
 
+from processors.calibrator import Calibrator
+from processors.frame_analyzer import FrameAnalyzer
+from utils.warp_maps import warpMaps, barrel_maps
+from utils.color_transforms import colorTables, night_vision_lut, scan_line_lut
+from utils.colorspace import staged, floating, quantize
+from utils.filters import gaussian_falloff
+from utils.frame_buffers import accepts_dst
+from modules.registry import register_module, effect
+
+frameAnalyzer = FrameAnalyzer()
+
+@register_module("NightVision")
 class NightVision:
     def __init__(self):
         self.name = "NightVision Effect"
 
-        self.frames = []
-        self.processed_frames = []
+        self.frame_count = 0
+        self.last_processed_frame = None
         
-        self.complexities = []
+        self.calibrator = Calibrator()
         self.threshold = None
+        self.analysis = None
 
         self.start_time = time.time()
 
-    def add_frame(self, frame):
-        self.frames.append(frame)
-        complexity = self.calculate_complexity(frame)
-        self.complexities.append(complexity)
+    def add_frame(self, frame, analysis=None):
+        if analysis is None:
+            analysis = frameAnalyzer.analyze(frame)
 
-        if len(self.complexities) > 10 and len(self.complexities) % 10 == 0 or self.threshold == None:
-            self.threshold = np.mean(self.complexities)
+        self.analysis = analysis
+        self.frame_count += 1
 
-    def calculate_complexity(self, frame):
-        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        variance = np.var(gray)
-
-        edges = cv.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
-    
-        brightness_std = np.std(gray) / 255.0
-
-        complexity = np.log1p(variance) * 0.5 + edge_density * 0.3 + brightness_std * 0.2
+        if self.calibrator.add(analysis.complexity):
+            self.threshold = self.calibrator.threshold
 
-        return complexity
+    def calculate_complexity(self, frame):
+        return frameAnalyzer.analyze(frame).complexity
     
     def process_current_frame(self, frame, complexity):
         if self.threshold is None:  
@@ -48,55 +53,53 @@ class NightVision:
         else:
             return self.apply_night_vision(frame)
 
+    @effect(cost='medium', kind='filter')
+    @staged('_night_vision_tone', '_night_vision_vignette')
     def night_vision_overlay(self, frame):
+        """
+        Equalized green phosphor image, darkening towards the edges.
+        """
+
+    def _night_vision_tone(self, frame):
         gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
         gray = cv.GaussianBlur(gray, (3, 3), 0)
         gray = cv.equalizeHist(gray)
 
         night_vision = cv.cvtColor(gray, cv.COLOR_GRAY2BGR)
-    
-        night_vision[:, :, 0] = (night_vision[:, :, 0] * 0.2).astype(np.uint8)
-        night_vision[:, :, 1] = (night_vision[:, :, 1] * 0.8    ).astype(np.uint8)
-        night_vision[:, :, 2] = 0
+        cv.LUT(night_vision, colorTables.get(night_vision_lut), dst=night_vision)
 
-        h, w = night_vision.shape[:2]
-        kernel_x = cv.getGaussianKernel(w, w/3)
-        kernel_y = cv.getGaussianKernel(h, h/3)
-        kernel = kernel_y * kernel_x.T
-        mask = kernel / kernel.max()
+        return night_vision
 
-        night_vision = night_vision.astype(np.float32)
-        night_vision *= mask[..., np.newaxis]
-        night_vision = np.clip(night_vision, 0, 255).astype(np.uint8)
+    @floating
+    def _night_vision_vignette(self, frame):
+        if frame.dtype != np.float32:
+            return quantize(self._night_vision_vignette(frame.astype(np.float32)))
 
-        return night_vision
+        h, w = frame.shape[:2]
+        frame *= warpMaps.get(gaussian_falloff, h, w)[..., np.newaxis]
+
+        return frame
     
+    @effect(cost='low', kind='pixel')
+    @floating
     def night_vision_scan_lines(self, frame):
-        result_frame = frame.copy().astype(np.float32)
+        if frame.dtype != np.float32:
+            frame[::3] = cv.LUT(frame[::3], colorTables.get(scan_line_lut, 0.7, 1.5))
+            return frame
 
-        result_frame[::3, :, 0] *= 1.5
-        result_frame[::3, :] *= 0.7
-        
-        return np.clip(result_frame.astype(np.uint8), 0, 255)
+        lines = frame[::3]
+        lines *= 0.7
+        lines[:, :, 0] *= 1.5
+
+        return frame
     
-    def night_vision_barrel_distortion(self, frame, intensity):
+    @effect(cost='medium', kind='geometric')
+    @accepts_dst
+    def night_vision_barrel_distortion(self, frame, intensity=0.1, dst=None):
         h, w = frame.shape[:2]
+        map1, map2 = warpMaps.get(barrel_maps, h, w, intensity)
 
-        j, i = np.meshgrid(np.arange(w), np.arange(h))
-
-        x = ( j - w/2 ) / (w/2)
-        y = ( i - h/2 ) / (h/2)
-
-        r = np.sqrt(x*x + y*y)
-        distortion = 1.0 + intensity * r**2
-
-        x_distorted = x * distortion
-        y_distorted = y * distortion
-
-        map_x = (x_distorted * (w/2)) + w/2
-        map_y = (y_distorted * (h/2)) + h/2
-
-        return cv.remap(frame, map_x.astype(np.float32), map_y.astype(np.float32), cv.INTER_LINEAR)
+        return cv.remap(frame, map1, map2, cv.INTER_LINEAR, dst=dst)
     
     def apply_night_vision(self, frame):
         frame = self.night_vision_overlay(frame)
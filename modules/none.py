@@ -9,38 +9,38 @@ from colorama import Fore, Back, Style, init
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from processors.calibrator import Calibrator
+from processors.frame_analyzer import FrameAnalyzer
+from modules.registry import register_module
+
+frameAnalyzer = FrameAnalyzer()
+
+@register_module("None")
 class NoneModule:
     def __init__(self):
         self.name = "None Effect"
 
-        self.frames = []
-        self.processed_frames = []
+        self.frame_count = 0
+        self.last_processed_frame = None
 
-        self.complexities = []
+        self.calibrator = Calibrator()
         self.threshold = None
+        self.analysis = None
 
         self.start_time = time.time()
 
-    def add_frame(self, frame):
-        self.frames.append(frame)
-        complexity = self.calculate_complexity(frame)
-        self.complexities.append(complexity)
-
-        if len(self.complexities) > 10 and len(self.complexities) % 10 == 0 or self.threshold == None:
-            self.threshold = np.mean(self.complexities)
+    def add_frame(self, frame, analysis=None):
+        if analysis is None:
+            analysis = frameAnalyzer.analyze(frame)
 
-    def calculate_complexity(self, frame):
-        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        variance = np.var(gray)
-
-        edges = cv.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
-    
-        brightness_std = np.std(gray) / 255.0
+        self.analysis = analysis
+        self.frame_count += 1
 
-        complexity = np.log1p(variance) * 0.5 + edge_density * 0.3 + brightness_std * 0.2
+        if self.calibrator.add(analysis.complexity):
+            self.threshold = self.calibrator.threshold
 
-        return complexity
+    def calculate_complexity(self, frame):
+        return frameAnalyzer.analyze(frame).complexity
 
     def process_current_frame(self, frame, complexity):
         if self.threshold is None:  
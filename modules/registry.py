@@ -0,0 +1,116 @@
+import importlib
+
+COST_CLASSES = ('low', 'medium', 'high')
+KINDS = ('pixel', 'geometric', 'filter')
+
+class EffectInfo:
+
+    """
+    Static description of an effect, readable without building its module.
+
+    cost        - 'low'    : a lookup table or a single cheap pass
+                  'medium' : a remap or a few full frame passes
+                  'high'   : detection, python loops over the frame
+    stateful    - depends on state kept between frames (clock, previous frames, calibration, trackers),
+                  so it can't be reordered or run on frames out of order
+    kind        - 'pixel'     : every output pixel only depends on the input pixel at the same place
+                  'geometric' : moves pixels around without mixing them
+                  'filter'    : mixes neighbourhoods or draws on the frame
+    colorspaces - colorspace of every stage, ('BGR',) for a plain effect
+    """
+
+    def __init__(self, name, cost, stateful, kind, colorspaces=('BGR',)):
+        if cost not in COST_CLASSES:
+            raise ValueError(f"Unknown cost class '{cost}', expected one of {COST_CLASSES}")
+
+        if kind not in KINDS:
+            raise ValueError(f"Unknown effect kind '{kind}', expected one of {KINDS}")
+
+        self.name = name
+        self.cost = cost
+        self.stateful = stateful
+        self.kind = kind
+        self.colorspaces = colorspaces
+
+    def __repr__(self):
+        return f"EffectInfo({self.name}, cost={self.cost}, stateful={self.stateful}, kind={self.kind}, colorspaces={self.colorspaces})"
+
+def effect(cost='low', kind='pixel', stateful=False):
+    """
+    Marks a module method as an effect taking and returning a BGR frame.
+    Goes above @staged, the stage colorspaces are filled in when the module registers.
+    """
+
+    def mark(function):
+        function.effect_info = EffectInfo(function.__name__, cost, stateful, kind)
+        return function
+
+    return mark
+
+class ModuleInfo:
+
+    def __init__(self, name, module_class, effects):
+        self.name = name
+        self.module_class = module_class
+        self.effects = effects
+
+class ModuleRegistry:
+
+    """
+    Modules and their effects.
+
+    locations maps every module name to the python module defining it, so the
+    names are known without importing anything. A module registers itself with
+    @register_module when that python module is imported, which gives its effects
+    and their metadata without creating an instance.
+    """
+
+    def __init__(self, locations):
+        self.locations = locations
+        self.modules = {}
+
+    def names(self):
+        return list(self.locations)
+
+    def register(self, name, module_class):
+        effects = {}
+
+        for attribute, value in vars(module_class).items():
+            info = getattr(value, 'effect_info', None)
+            if info is None:
+                continue
+
+            stage_names = getattr(value, 'stage_names', None)
+            if stage_names:
+                info.colorspaces = tuple(getattr(getattr(module_class, stage), 'colorspace', 'BGR') for stage in stage_names)
+
+            effects[attribute] = info
+
+        self.modules[name] = ModuleInfo(name, module_class, effects)
+
+    def get(self, name):
+        if name not in self.modules:
+            importlib.import_module(self.locations[name])
+
+        return self.modules[name]
+
+    def effect_info(self, module_name, effect_name):
+        return self.get(module_name).effects.get(effect_name)
+
+moduleRegistry = ModuleRegistry({
+    "Tracker" : "modules.tracker",
+    "ColorChaos" : "modules.color_chaos",
+    "VHS" : "modules.vhs",
+    "NightVision" : "modules.night_vision",
+    "FacialArtifacts" : "modules.facial_artifacts",
+    "ChromaticAberration" : "modules.chromatic_aberration",
+    "Grunge" : "modules.grunge",
+    "None" : "modules.none"
+})
+
+def register_module(name):
+    def register(module_class):
+        moduleRegistry.register(name, module_class)
+        return module_class
+
+    return register
@@ -9,42 +9,41 @@ from colorama import Fore, Back, Style, init
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from processors.face_detection import FaceDetector
+from processors.face_detection import faceDetector
+from processors.calibrator import Calibrator
+from processors.frame_analyzer import FrameAnalyzer
+from modules.registry import register_module
 
-faceDetector = FaceDetector()
+frameAnalyzer = FrameAnalyzer()
 
+@register_module("Tracker")
 class Tracker:
     def __init__(self):
         self.name = "Tracker Effect"
 
-        self.frames = []
-        self.processed_frames = []
+        self.frame_count = 0
+        self.last_processed_frame = None
 
-        self.complexities = []
+        self.calibrator = Calibrator()
         self.threshold = None
+        self.analysis = None
+        self.analyzed_frame = None
 
         self.start_time = time.time()
 
-    def add_frame(self, frame):
-        self.frames.append(frame)
-        complexity = self.calculate_complexity(frame)
-        self.complexities.append(complexity)
+    def add_frame(self, frame, analysis=None):
+        if analysis is None:
+            analysis = frameAnalyzer.analyze(frame)
 
-        if len(self.complexities) > 10 and len(self.complexities) % 10 == 0 or self.threshold == None:
-            self.threshold = np.mean(self.complexities)
+        self.analysis = analysis
+        self.analyzed_frame = frame
+        self.frame_count += 1
 
-    def calculate_complexity(self, frame):
-        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        variance = np.var(gray)
-
-        edges = cv.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
-    
-        brightness_std = np.std(gray) / 255.0
+        if self.calibrator.add(analysis.complexity):
+            self.threshold = self.calibrator.threshold
 
-        complexity = np.log1p(variance) * 0.5 + edge_density * 0.3 + brightness_std * 0.2
-
-        return complexity
+    def calculate_complexity(self, frame):
+        return frameAnalyzer.analyze(frame).complexity
 
     def process_current_frame(self, frame, complexity):
         if self.threshold is None:  
@@ -58,7 +57,11 @@ class Tracker:
             return self._simple_frame_effect(frame, complexity)
 
     def _complex_frame_effect(self, frame, complexity):
-        edges = cv.Canny(frame, 50, 150)
+        # the analysis describes the source frame, after another module of the chain its edges are out of place
+        if self.analysis is not None and frame is self.analyzed_frame:
+            edges = self.analysis.edges
+        else:
+            edges = cv.Canny(frame, 50, 150)
 
         edges_rgb = cv.cvtColor(edges, cv.COLOR_GRAY2RGB)
         
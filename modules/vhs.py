@@ -7,42 +7,44 @@ import numpy as np
 from colorama import Fore, Back, Style, init
 
 from utils.normalizers import Normalizer
+from utils.warp_maps import warpMaps, barrel_maps, color_bleeding_shifts, roll_rows
+from utils.colorspace import colorspace, staged, floating, lookup, quantize
+from utils.color_transforms import colorTables, gritty_grade_lut, gritty_tint_lut, scan_line_lut
+from utils.frame_buffers import accepts_dst
+from processors.calibrator import Calibrator
+from processors.frame_analyzer import FrameAnalyzer
+from modules.registry import register_module, effect
 
 normalizer = Normalizer()
+frameAnalyzer = FrameAnalyzer()
 
+@register_module("VHS")
 class VHS:
 
     def __init__(self):
         self.name = "VHS Effect"
 
-        self.frames = []
-        self.processed_frames = []
+        self.frame_count = 0
+        self.last_processed_frame = None
 
-        self.complexities = []
+        self.calibrator = Calibrator()
         self.threshold = None
+        self.analysis = None
 
         self.start_time = time.time()
 
     def calculate_complexity(self, frame):
-        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-        variance = np.var(gray)
+        return frameAnalyzer.analyze(frame).complexity
 
-        edges = cv.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
+    def add_frame(self, frame, analysis=None):
+        if analysis is None:
+            analysis = frameAnalyzer.analyze(frame)
 
-        brightness_std = np.std(gray) / 255.0
+        self.analysis = analysis
+        self.frame_count += 1
 
-        complexity = np.log1p(variance) * 0.5 + edge_density * 0.3 + brightness_std * 0.2
-
-        return complexity
-
-    def add_frame(self, frame):
-        self.frames.append(frame)
-        complexity = self.calculate_complexity(frame)
-        self.complexities.append(complexity)
-
-        if len(self.complexities) > 10 and len(self.complexities) % 10 == 0 or self.threshold == None:
-            self.threshold = np.mean(self.complexities)
+        if self.calibrator.add(analysis.complexity):
+            self.threshold = self.calibrator.threshold
 
     def process_current_frame(self, frame, complexity):
         if self.threshold is None:
@@ -57,56 +59,69 @@ class VHS:
 
     # <-------------------- VHS Scan Lines -------------------->
 
+    @effect(cost='low', kind='pixel')
+    @floating
     def vhs_scan_lines(self, frame):
-        dark_lines = frame[::3, :] * 0.2
-        dark_lines[:, :, 0] = dark_lines[:, :, 0] * 1.5
-        frame[::3, :] = dark_lines
+        if frame.dtype != np.float32:
+            frame[::3] = cv.LUT(frame[::3], colorTables.get(scan_line_lut, 0.2, 1.5))
+            return frame
+
+        lines = frame[::3]
+        lines *= 0.2
+        lines[:, :, 0] *= 1.5
+
         return frame
 
     # <-------------------- VHS Color Bleeding -------------------->
 
-    def vhs_color_bleeding(self, frame):
-        b, g, r = cv.split(frame)
-        h, w = r.shape
+    @effect(cost='medium', kind='geometric')
+    @accepts_dst
+    def vhs_color_bleeding(self, frame, dst=None):
+        h, w = frame.shape[:2]
+        r_runs, b_runs, g_runs = warpMaps.get(color_bleeding_shifts, h, w)
 
-        for i in range(h):
-            shift = 8 + int(np.sin(i * 0.01) * 4)
-            r[i] = np.roll(r[i], shift)
+        if dst is None:
+            result = frame.copy()
+        else:
+            result = dst
+            np.copyto(result, frame)
 
-            if shift > 0:
-                r[i, :shift] = r[i, shift]
+        # red smears right, the uncovered left edge repeats the first column
+        for start, end, shift in r_runs:
+            result[start:end, shift:, 2] = frame[start:end, :w-shift, 2]
+            result[start:end, :shift, 2] = frame[start:end, 0:1, 2]
 
-            if i % 3 == 0:
-                shift_b = -6 + int(np.cos(i * 0.02) * 3)
-                b[i] = np.roll(b[i], shift_b)
+        for start, end, shift in b_runs:
+            roll_rows(result, frame, slice(start, end, 3), 0, shift)
 
-            if i % 4 == 0:
-                shift_g = 2 + int(np.sin(i * 0.01) * 2)
-                g[i] = np.roll(g[i], shift_g)
+        for start, end, shift in g_runs:
+            roll_rows(result, frame, slice(start, end, 4), 1, shift)
 
-        return cv.merge([b, g, r])
+        return result
 
     # <-------------------- VHS Noise -------------------->
 
+    @effect(cost='medium', kind='pixel')
+    @floating
     def vhs_noise(self, frame, noise_level=5):
-        h, w, c = frame.shape
-
-        frame_float = frame.astype(np.float32)
+        if frame.dtype != np.float32:
+            return quantize(self.vhs_noise(frame.astype(np.float32), noise_level))
 
-        noise = np.random.uniform(-noise_level, noise_level, (h, w, c)).astype(np.float32)
+        # drawn straight into float32 with OpenCV's RNG, single channel view so every channel gets the range
+        noise = np.empty(frame.shape, np.float32)
+        cv.randu(noise.reshape(frame.shape[0], -1), -noise_level, noise_level)
 
-        noisy_frame = frame_float + noise
-
-        return np.clip(noisy_frame, 0, 255, None).astype(np.uint8)
+        frame += noise
+        return frame
 
     # <-------------------- VHS Head Clog -------------------->
 
+    @effect(cost='low', kind='pixel', stateful=True)
     def vhs_head_clog(self, frame):
-        current_index = len(self.processed_frames)
-        clog_threshold = self.complexities[-1] // self.threshold
+        clog_threshold = self.calibrator.latest // self.threshold
 
-        if current_index > 0 and random.random() < clog_threshold:
-            previous_frame = self.processed_frames[current_index - 1]
+        if self.last_processed_frame is not None and random.random() < clog_threshold:
+            previous_frame = self.last_processed_frame
 
             mix_ratio = random.uniform(0.2, 0.8)
             frame = cv.addWeighted(frame, 1-mix_ratio, previous_frame, mix_ratio, 0)
@@ -115,6 +130,7 @@ class VHS:
 
     # <-------------------- VHS Tape Damage -------------------->
 
+    @effect(cost='low', kind='geometric')
     def vhs_tape_damage(self, frame):
         h, w = frame.shape[:2]
 
@@ -131,6 +147,7 @@ class VHS:
 
     # <-------------------- VHS Tape Glitch -------------------->
 
+    @effect(cost='low', kind='filter')
     def vhs_tape_glitch(self, frame):
         h, w = frame.shape[:2]
 
@@ -149,49 +166,35 @@ class VHS:
 
     # <-------------------- VHS Barrel Distortion -------------------->
 
-    def vhs_barrel_distortion(self, frame, intensity=0.1):
+    @effect(cost='medium', kind='geometric')
+    @accepts_dst
+    def vhs_barrel_distortion(self, frame, intensity=0.1, dst=None):
         h, w = frame.shape[:2]
+        map1, map2 = warpMaps.get(barrel_maps, h, w, intensity)
 
-        j, i = np.meshgrid(np.arange(w), np.arange(h))
-
-        x = ( j - w/2 ) / (w/2)
-        y = ( i - h/2 ) / (h/2)
-
-        r = np.sqrt(x*x + y*y)
-
-        distortion = 1.0 + intensity * r**2
-
-        x_distorted = x * distortion
-        y_distorted = y * distortion
-
-        map_x = (x_distorted * (w/2)) + w/2
-        map_y = (y_distorted * (h/2)) + h/2
-
-        return cv.remap(frame, map_x.astype(np.float32), map_y.astype(np.float32), cv.INTER_LINEAR)
+        return cv.remap(frame, map1, map2, cv.INTER_LINEAR, dst=dst)
 
 
+    @effect(cost='medium', kind='filter')
+    @staged('_gritty_grade', '_gritty_tint')
     def vhs_gritty(self, frame):
-        hsv = cv.cvtColor(frame, cv.COLOR_BGR2HSV)
-        h, s, v = cv.split(hsv)
+        """
+        Washed out, crushed tape look, then a red/green tint and a soft blur.
+        """
 
-        s = cv.multiply(s, 0.7)
+    @colorspace('HSV')
+    @lookup
+    def _gritty_grade(self):
+        # saturation * 0.7 and |1.9 * value - 70| are per channel, one table pass
+        return colorTables.get(gritty_grade_lut)
 
-        alpha = 1.9
-        beta = -70
+    @accepts_dst
+    def _gritty_tint(self, frame, dst=None):
+        tinted = cv.LUT(frame, colorTables.get(gritty_tint_lut), dst=dst)
 
-        v = cv.convertScaleAbs(v, alpha=alpha, beta=beta)
-
-        final_hsv = cv.merge([h, s, v])
-        frame = cv.cvtColor(final_hsv, cv.COLOR_HSV2BGR)
-
-        b, g, r = cv.split(cv.cvtColor(cv.merge([h, s, v]), cv.COLOR_HSV2BGR))
-        r = cv.multiply(r, 0.9)
-        g = cv.multiply(g, 1.1)
-
-        frame = cv.GaussianBlur(cv.merge([b, g, r]), (5, 5), 0)
-
-        return frame
+        return cv.GaussianBlur(tinted, (5, 5), 0, dst=tinted)
 
+    @effect(cost='medium', kind='filter')
     def vhs_custom_kernel_processor(self, frame):
         ddepth = cv.CV_8S
         ind = 0
@@ -1,9 +1,26 @@
-from .audio_processor import AudioProcessor
-from .face_detection import FaceDetector
-from .render_processor import RenderProcessor
+import importlib
+
+# imported on first access, so importing one processor doesn't load the others' dependencies
+_EXPORTS = {
+    'AudioProcessor' : '.audio_processor',
+    'Calibrator' : '.calibrator',
+    'FaceDetector' : '.face_detection',
+    'FrameAnalysis' : '.frame_analyzer',
+    'FrameAnalyzer' : '.frame_analyzer',
+    'RenderProcessor' : '.render_processor',
+}
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
 
 __all__ = [
     'AudioProcessor',
+    'Calibrator',
     'FaceDetector',
+    'FrameAnalysis',
+    'FrameAnalyzer',
     'RenderProcessor',
 ]
\ No newline at end of file
@@ -1,14 +1,10 @@
 import cv2 as cv
 import numpy as np
-from scipy.io import wavfile
-from scipy.fftpack import fft, ifft, fftfreq
-from scipy import signal
 import subprocess
 import tempfile
+import hashlib
 import os
 import time
-import winsound as player
-import librosa
 
 from utils.normalizers import Normalizer
 from utils.console_logger import ConsoleLogger
@@ -16,6 +12,138 @@ from utils.console_logger import ConsoleLogger
 normalizer = Normalizer()
 logger = ConsoleLogger()
 
+# (low, high) edges in Hz, high None runs up to the Nyquist frequency
+BANDS = {
+    "bass" : (20, 250),
+    "mid" : (250, 4000),
+    "high" : (4000, None)
+}
+
+def band_slices(fft_size, sample_rate):
+    """
+    rfft bin range of every band, the bins of a band are contiguous so a slice is enough.
+    """
+
+    bin_width = sample_rate / fft_size
+    last = fft_size // 2 + 1
+
+    return {band: slice(min(last, int(np.ceil(low / bin_width))), last if high is None else min(last, int(np.ceil(high / bin_width))))
+            for band, (low, high) in BANDS.items()}
+
+def spectrum_features(power, frequencies, slices):
+    """
+    Mean power of every band and the spectral centroid in Hz, over the last axis
+    of an rfft power spectrum, so it works on one spectrum or a stack of them.
+    """
+
+    energies = np.stack([power[..., bins].mean(axis=-1) for bins in slices.values()], axis=-1)
+
+    total = power.sum(axis=-1)
+    centroid = (power @ frequencies) / np.maximum(total, 1e-12)
+
+    return energies, centroid
+
+# columns of a feature track, bumping TRACK_VERSION invalidates every cached sidecar
+TRACK_FEATURES = ("bass", "mid", "high", "centroid", "onset")
+TRACK_VERSION = 1
+
+def moving_average(values, size):
+    """
+    Centered moving average along the first axis, windows shrink at the edges.
+    """
+
+    padded = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0, dtype=np.float64)])
+    index = np.arange(len(values))
+
+    low = np.maximum(index - size // 2, 0)
+    high = np.minimum(index + size // 2 + 1, len(values))
+
+    return (padded[high] - padded[low]) / (high - low).reshape((-1,) + (1,) * (values.ndim - 1))
+
+def feature_track(audio, sample_rate, fps, fft_size=2048, average_seconds=2.0, chunk_frames=512):
+    """
+    One row of TRACK_FEATURES per video frame, from a Hann windowed spectrum
+    centered on the frame's time.
+
+    bass, mid, high - band power over its centered average_seconds average, around 1.0
+    centroid        - spectral centroid in Hz
+    onset           - spectral flux of the log magnitudes from the previous frame, 0-1 over the track
+
+    Frames are analyzed chunk_frames at a time as one batched rfft.
+    """
+
+    frame_count = int(np.ceil(len(audio) * fps / sample_rate))
+
+    padded = np.pad(np.asarray(audio, dtype=np.float32), (fft_size // 2, fft_size // 2))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, fft_size)
+    centers = np.minimum(np.round(np.arange(frame_count) * sample_rate / fps).astype(np.int64), len(audio) - 1)
+
+    hann = np.hanning(fft_size).astype(np.float32)
+    frequencies = np.fft.rfftfreq(fft_size, 1 / sample_rate).astype(np.float32)
+    slices = band_slices(fft_size, sample_rate)
+
+    track = np.zeros((frame_count, len(TRACK_FEATURES)), dtype=np.float32)
+    previous = None
+
+    for start in range(0, frame_count, chunk_frames):
+        spectra = np.fft.rfft(windows[centers[start:start + chunk_frames]] * hann, axis=-1)
+        magnitudes = np.abs(spectra).astype(np.float32)
+        power = magnitudes * magnitudes
+
+        energies, centroid = spectrum_features(power, frequencies, slices)
+        track[start:start + chunk_frames, :3] = energies
+        track[start:start + chunk_frames, 3] = centroid
+
+        compressed = np.log1p(magnitudes)
+        before = np.concatenate([compressed[:1] if previous is None else previous, compressed[:-1]])
+        track[start:start + chunk_frames, 4] = np.maximum(compressed - before, 0).mean(axis=-1)
+
+        previous = compressed[-1:]
+
+    average = moving_average(track[:, :3], max(1, int(round(average_seconds * fps))))
+    track[:, :3] /= np.maximum(average, 1e-12)
+
+    if frame_count and track[:, 4].max() > 0:
+        track[:, 4] /= track[:, 4].max()
+
+    return track
+
+class SampleRing:
+
+    """
+    Fixed size ring of the most recent mono samples.
+
+    Every sample is stored twice, capacity apart, so any window of the last
+    capacity samples is a contiguous view and reading never copies.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros(2 * capacity, dtype=np.float32)
+        self.position = 0
+        self.written = 0
+
+    def write(self, samples):
+        samples = samples[-self.capacity:]
+
+        first = min(len(samples), self.capacity - self.position)
+        rest = len(samples) - first
+
+        for offset in (0, self.capacity):
+            self.data[offset + self.position:offset + self.position + first] = samples[:first]
+            self.data[offset:offset + rest] = samples[first:]
+
+        self.position = (self.position + len(samples)) % self.capacity
+        self.written += len(samples)
+
+    def window(self, size, end_offset=0):
+        """
+        size samples ending end_offset samples before the newest one.
+        """
+
+        end = self.position + self.capacity - end_offset
+        return self.data[end - size:end]
+
 class AudioProcessor:
     def __init__(self, audio_path=None, sample_rate=44100, buffer_size=1024):
         self.audio_path = audio_path
@@ -32,6 +160,9 @@ class AudioProcessor:
             "high" : 1.0
         }
         self.spectral_centroid = 0
+        self.onset_strength = 0
+
+        self.feature_track = None
 
         self.effect_multipliers = {
             'color_blast': 3.0,
@@ -39,35 +170,46 @@ class AudioProcessor:
             'sine_distortion': 1.0
         }
 
+        self.ring = None
+
         if audio_path != None:   
-            self.sample_rate, audio_raw = wavfile.read(audio_path)
-
-            logger.success(f"Loaded audio: {audio_path}")
-            logger.info(f"Sample rate: {self.sample_rate} Hz")
-            logger.info(f"Shape of loaded data: {audio_raw.shape if hasattr(audio_raw, 'shape') else 'No shape (not array)'}")
-            logger.info(f"Original dtype: {audio_raw.dtype}")
-
-            self.audio_data = audio_raw
-
-            if hasattr(self.audio_data, 'shape'):
-                if len(self.audio_data.shape) > 1 and self.audio_data.shape[1] > 1:
-                    logger.info(f"Initializing stereo audio: shape {self.audio_data.shape}")
-                    if self.audio_data.shape[1] == 2:
-                        self.audio_data = np.mean(self.audio_data, axis=1)
-                    else:
-                        self.audio_data = self.audio_data[:, 0]
+            self.load_audio(audio_path)
+        else :
+            self.sample_rate=sample_rate
+            logger.info("Initializing with video audio.")
+
+    def load_audio(self, audio_path):
+        # scipy is imported where it's used, it costs most of the CLI startup otherwise
+        from scipy.io import wavfile
+
+        self.audio_path = audio_path
+        self.sample_rate, audio_raw = wavfile.read(audio_path)
+
+        logger.success(f"Loaded audio: {audio_path}")
+        logger.info(f"Sample rate: {self.sample_rate} Hz")
+        logger.info(f"Shape of loaded data: {audio_raw.shape if hasattr(audio_raw, 'shape') else 'No shape (not array)'}")
+        logger.info(f"Original dtype: {audio_raw.dtype}")
+
+        self.audio_data = audio_raw
+
+        if hasattr(self.audio_data, 'shape'):
+            if len(self.audio_data.shape) > 1 and self.audio_data.shape[1] > 1:
+                logger.info(f"Initializing stereo audio: shape {self.audio_data.shape}")
+                if self.audio_data.shape[1] == 2:
+                    self.audio_data = np.mean(self.audio_data, axis=1)
                 else:
-                    logger.info(f"Audio is mono: shape {self.audio_data.shape}")
+                    self.audio_data = self.audio_data[:, 0]
             else:
-                logger.warn("Audio data doesn't have shape attribute")
+                logger.info(f"Audio is mono: shape {self.audio_data.shape}")
+        else:
+            logger.warn("Audio data doesn't have shape attribute")
 
-            # normalizing value between -1 and 1 for safe processing to prevent numerical overflow
-            max_val = np.max(np.abs(self.audio_data))
-            if max_val > 0:
-                self.audio_data = self.audio_data.astype(np.float32) / max_val
-        else :
-            self.sample_rate=44100
-            logger.info("Initializing with video audio.")
+        # normalizing value between -1 and 1 for safe processing to prevent numerical overflow
+        self.audio_data = np.asarray(self.audio_data, dtype=np.float32)
+
+        max_val = np.max(np.abs(self.audio_data))
+        if max_val > 0:
+            self.audio_data /= max_val
 
     def dump_tempfile(self, video_path):
         temp_dir = tempfile.gettempdir()
@@ -97,6 +239,8 @@ class AudioProcessor:
 
     def play_audio(self, audio_file_path):
         try:
+            import winsound as player
+
             player.PlaySound(
                 audio_file_path, 
                 player.SND_FILENAME | player.SND_ASYNC | player.SND_NODEFAULT
@@ -121,6 +265,9 @@ class AudioProcessor:
                 return np.clip(frame * self.frequency_bands["bass"], 0, 255, None)
 
     def analyze_freq_content(self):
+        from scipy.fftpack import fft, fftfreq
+        from scipy import signal
+
         n = len(self.audio_data)
 
         window = signal.windows.hann(n)
@@ -137,7 +284,205 @@ class AudioProcessor:
         return frequencies, magnitudes_db
 
     def bass_energy(self, frame):
-        frequencies, decibels = self.analyze_freq_content()
+        # reads the streamed bands, the whole track FFT is far too slow to run per frame
         intensity = normalizer.sigmoid_normalize(frame)
 
-        return self.band_multiplication(frame, frequencies, intensity)
+        return self.band_multiplication(frame, "bass", intensity)
+
+    # <-------------------- Streaming analysis -------------------->
+
+    def start_stream(self, fft_size=None, max_hops=8, smoothing=0.2, average_rate=0.01):
+        """
+        Streaming STFT, every hop of buffer_size samples fed in updates
+        frequency_bands and spectral_centroid from the last fft_size samples.
+
+        Bands are the band's mean power relative to its slow moving average, so
+        they sit around 1.0 and peak on hits, ready to scale an effect.
+        smoothing is the weight of a new hop, average_rate the one of the
+        long term average. When more than max_hops hops are pending at once only
+        the most recent ones are analyzed, so a stall never costs more than
+        max_hops FFTs.
+        """
+
+        self.fft_size = fft_size or 2 * self.buffer_size
+        self.max_hops = max_hops
+        self.smoothing = smoothing
+        self.average_rate = average_rate
+
+        self.ring = SampleRing(self.fft_size + self.buffer_size * max_hops)
+        self.hann = np.hanning(self.fft_size).astype(np.float32)
+        self.frequencies = np.fft.rfftfreq(self.fft_size, 1 / self.sample_rate).astype(np.float32)
+        self.band_bins = band_slices(self.fft_size, self.sample_rate)
+
+        self.band_energy = None
+        self.band_average = None
+
+        self.pending = 0
+        self.stream_position = 0
+        self.hops = 0
+        self.skipped_hops = 0
+
+        return self
+
+    def feed(self, samples):
+        """
+        Appends samples, stereo gets averaged to mono, and analyzes every
+        complete hop. Returns the number of hops analyzed.
+        """
+
+        if self.ring is None:
+            self.start_stream()
+
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+
+        self.ring.write(samples)
+        self.pending += len(samples)
+
+        hops = self.pending // self.buffer_size
+        self.pending -= hops * self.buffer_size
+
+        analyzed = min(hops, self.max_hops)
+        self.skipped_hops += hops - analyzed
+
+        for hop in range(analyzed - 1, -1, -1):
+            self._analyze_hop(self.pending + hop * self.buffer_size)
+
+        return analyzed
+
+    def advance_to(self, seconds):
+        """
+        Feeds the loaded audio up to the given playback time, once per video
+        frame in live mode. Returns the number of hops analyzed.
+        """
+
+        if self.ring is None:
+            self.start_stream()
+
+        end = min(len(self.audio_data), int(seconds * self.sample_rate))
+        if end <= self.stream_position:
+            return 0
+
+        # only the tail can still be analyzed, the rest would be written over right away
+        start = max(self.stream_position, end - self.ring.capacity)
+        self.stream_position = end
+
+        return self.feed(self.audio_data[start:end])
+
+    def _analyze_hop(self, end_offset):
+        if self.ring.written - end_offset < self.fft_size:
+            return
+
+        window = self.ring.window(self.fft_size, end_offset) * self.hann
+        spectrum = np.fft.rfft(window)
+        power = spectrum.real * spectrum.real + spectrum.imag * spectrum.imag
+
+        energies, centroid = spectrum_features(power, self.frequencies, self.band_bins)
+
+        if self.band_energy is None:
+            self.band_energy = energies
+            self.band_average = energies
+            self.spectral_centroid = float(centroid)
+        else:
+            self.band_energy = self.band_energy + self.smoothing * (energies - self.band_energy)
+            self.band_average = self.band_average + self.average_rate * (energies - self.band_average)
+            self.spectral_centroid += self.smoothing * (float(centroid) - self.spectral_centroid)
+
+        relative = self.band_energy / np.maximum(self.band_average, 1e-12)
+        for band, value in zip(BANDS, relative):
+            self.frequency_bands[band] = float(value)
+
+        self.hops += 1
+
+    # <-------------------- Precomputed feature tracks -------------------->
+
+    def audio_hash(self, video_path):
+        """
+        sha256 of the encoded audio packets, ffmpeg copies the stream without decoding it.
+        None when the file has no audio or ffmpeg fails.
+        """
+
+        cmd = ['ffmpeg', '-v', 'error', '-i', video_path, '-map', '0:a:0', '-c', 'copy', '-f', 'hash', '-hash', 'sha256', '-']
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+
+        digest = result.stdout.strip()
+        return digest.split('=', 1)[1] if digest.startswith('SHA256=') else None
+
+    def feature_track_path(self, video_path, fps, cache_dir=None, fft_size=2048, average_seconds=2.0):
+        """
+        Sidecar .npy of the video's feature track, named after the audio hash and
+        every analysis parameter so any change gets its own file.
+        """
+
+        audio_hash = self.audio_hash(video_path)
+        if audio_hash is None:
+            return None
+
+        parameters = f"{audio_hash}:{self.sample_rate}:{fps:.3f}:{fft_size}:{average_seconds}:{TRACK_VERSION}"
+        key = hashlib.sha256(parameters.encode()).hexdigest()[:16]
+
+        name = os.path.splitext(os.path.basename(video_path))[0]
+        return os.path.join(cache_dir or os.path.dirname(video_path), f"{name}.{key}.audio.npy")
+
+    def load_feature_track(self, video_path, fps, cache_dir=None, fft_size=2048, average_seconds=2.0):
+        """
+        Memory maps the video's feature track, extracting and analyzing the audio
+        only when no sidecar exists yet. Returns the sidecar path, None without audio.
+        """
+
+        track_path = self.feature_track_path(video_path, fps, cache_dir, fft_size, average_seconds)
+        if track_path is None:
+            logger.warn(f"No audio stream to analyze in {video_path}")
+            return None
+
+        if not os.path.exists(track_path):
+            audio_dump = self.dump_tempfile(video_path)
+            if audio_dump is None:
+                return None
+
+            try:
+                self.load_audio(audio_dump)
+                track = feature_track(self.audio_data, self.sample_rate, fps, fft_size, average_seconds)
+            finally:
+                self.delete_temp_audio(audio_dump)
+
+            # written aside and renamed, parallel renders never see half a file
+            temp_path = f"{track_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as file:
+                np.save(file, track)
+            os.replace(temp_path, track_path)
+
+            logger.success(f"Audio features of {len(track)} frames saved to {track_path}")
+        else:
+            logger.info(f"Audio features loaded from {track_path}")
+
+        self.open_feature_track(track_path)
+        return track_path
+
+    def open_feature_track(self, track_path):
+        self.feature_track = np.load(track_path, mmap_mode='r')
+        return self.feature_track
+
+    def seek_frame(self, frame_index):
+        """
+        Fills frequency_bands, spectral_centroid and onset_strength with the
+        track row of a video frame, frames past the audio keep the last row.
+        """
+
+        if self.feature_track is None or len(self.feature_track) == 0:
+            return False
+
+        bass, mid, high, centroid, onset = self.feature_track[min(frame_index, len(self.feature_track) - 1)]
+
+        self.frequency_bands["bass"] = float(bass)
+        self.frequency_bands["mid"] = float(mid)
+        self.frequency_bands["high"] = float(high)
+        self.spectral_centroid = float(centroid)
+        self.onset_strength = float(onset)
+
+        return True
@@ -0,0 +1,101 @@
+import numpy as np
+
+class Calibrator:
+
+    """
+    Dynamic threshold of a module, kept in constant memory and constant
+    time per frame no matter how long the session runs.
+
+    mode - 'running' : mean of every complexity seen so far, the same value
+                       np.mean over the full history used to give
+           'window'  : mean of the last window_size complexities
+           'ema'     : exponential moving average weighted by ema_alpha
+
+    The threshold is refreshed on the first frame and then every
+    update_interval frames, like the modules always did.
+    """
+
+    MODES = ('running', 'window', 'ema')
+
+    def __init__(self, mode='running', window_size=300, ema_alpha=0.05, update_interval=10):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown calibration mode '{mode}', expected one of {self.MODES}")
+
+        self.mode = mode
+        self.window_size = window_size
+        self.ema_alpha = ema_alpha
+        self.update_interval = update_interval
+
+        self.history = np.zeros(window_size, dtype=np.float64)
+        self.count = 0
+
+        self.total = 0.0
+        self.window_total = 0.0
+        self.ema = None
+
+        self.threshold = None
+
+    def add(self, complexity):
+        """
+        Records a complexity score, returns True when the threshold was refreshed.
+        """
+
+        index = self.count % self.window_size
+
+        self.window_total += complexity - self.history[index]
+        self.history[index] = complexity
+
+        # re-sum once per lap so floating point drift of the running window never builds up
+        if index == self.window_size - 1:
+            self.window_total = float(np.sum(self.history))
+
+        self.count += 1
+        self.total += complexity
+
+        if self.ema is None:
+            self.ema = complexity
+        else:
+            self.ema += self.ema_alpha * (complexity - self.ema)
+
+        if self.count > self.update_interval and self.count % self.update_interval == 0 or self.threshold is None:
+            self.threshold = self.mean()
+            return True
+
+        return False
+
+    @property
+    def latest(self):
+        if self.count == 0:
+            return None
+
+        return self.history[(self.count - 1) % self.window_size]
+
+    def recent(self):
+        """
+        Complexities still held by the ring buffer, oldest first.
+        """
+
+        if self.count < self.window_size:
+            return self.history[:self.count].copy()
+
+        index = self.count % self.window_size
+        return np.concatenate((self.history[index:], self.history[:index]))
+
+    def mean(self):
+        if self.count == 0:
+            return None
+
+        if self.mode == 'window':
+            return self.window_total / min(self.count, self.window_size)
+        if self.mode == 'ema':
+            return self.ema
+
+        return self.total / self.count
+
+    def reset(self):
+        self.history.fill(0)
+        self.count = 0
+        self.total = 0.0
+        self.window_total = 0.0
+        self.ema = None
+        self.threshold = None
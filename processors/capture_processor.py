@@ -0,0 +1,143 @@
+import cv2 as cv
+import threading
+import queue
+import time
+
+from utils.console_logger import ConsoleLogger
+
+logger = ConsoleLogger()
+
+class FrameGrabber:
+
+    """
+    Decodes frames on a background thread so capture.read() latency overlaps
+    with the effect stage.
+
+    mode - 'queue'  : bounded FIFO, the decoder waits when the effect stage falls behind (video files)
+           'latest' : single slot mailbox, a newer frame replaces the one still waiting
+                      so effects always run on the freshest frame (webcams)
+
+    Frames replaced in the mailbox before anyone read them are counted in dropped_frames.
+    """
+
+    def __init__(self, capture, mode='queue', queue_size=4, loop=False):
+        if mode not in ('queue', 'latest'):
+            raise ValueError(f"Unknown grabber mode '{mode}', expected 'queue' or 'latest'")
+
+        self.capture = capture
+        self.mode = mode
+        self.loop = loop
+
+        self.frames = queue.Queue(maxsize=queue_size if mode == 'queue' else 1)
+        self.thread = None
+        self.running = False
+        self.finished = False
+
+        self.frames_read = 0
+        self.dropped_frames = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._grab, name="FrameGrabber", daemon=True)
+        self.thread.start()
+        return self
+
+    def _grab(self):
+        while self.running:
+            ret, frame = self.capture.read()
+
+            if not ret:
+                if self.loop and self.capture.get(cv.CAP_PROP_POS_FRAMES) > 0:
+                    logger.info("Stream ended, looping back to the first frame.")
+                    self.capture.set(cv.CAP_PROP_POS_FRAMES, 0)
+                    continue
+                break
+
+            self.frames_read += 1
+            packet = (frame, time.perf_counter())
+
+            if self.mode == 'latest':
+                self._replace(packet)
+            else:
+                self._put(packet)
+
+        self.finished = True
+
+    def _put(self, packet):
+        while self.running:
+            try:
+                self.frames.put(packet, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _replace(self, packet):
+        try:
+            self.frames.get_nowait()
+            self.dropped_frames += 1
+        except queue.Empty:
+            pass
+
+        self.frames.put_nowait(packet)
+
+    def read(self, timeout=0.1):
+        """
+        Returns (ret, frame, capture_timestamp), ret is False once the stream has ended.
+        """
+
+        while True:
+            try:
+                frame, timestamp = self.frames.get(timeout=timeout)
+                return True, frame, timestamp
+            except queue.Empty:
+                if self.finished or not self.running:
+                    return False, None, None
+
+    def stop(self):
+        self.running = False
+
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+class FrameDisplay:
+
+    """
+    Display stage of the live modes. cv.imshow and cv.waitKey stay on the main
+    thread because HighGUI isn't thread safe, but instead of a fixed 10 ms wait
+    every frame only waits for what is left of its slot at the source fps.
+
+    Frames that miss their slot are counted in late_frames.
+    """
+
+    def __init__(self, window_name, fps=None):
+        self.window_name = window_name
+        self.frame_interval = 1.0 / fps if fps else None
+
+        self.next_due = None
+        self.frames_shown = 0
+        self.late_frames = 0
+
+    def show(self, frame):
+        cv.imshow(self.window_name, frame)
+        self.frames_shown += 1
+
+    def wait_key(self):
+        if self.frame_interval is None:
+            return cv.waitKey(1) & 0xFF
+
+        now = time.perf_counter()
+
+        if self.next_due is None:
+            self.next_due = now
+
+        self.next_due += self.frame_interval
+        remaining = self.next_due - now
+
+        if remaining <= 0:
+            self.late_frames += 1
+            # resync, one slow frame shouldn't make every following one late
+            self.next_due = now
+            return cv.waitKey(1) & 0xFF
+
+        return cv.waitKey(max(1, int(remaining * 1000))) & 0xFF
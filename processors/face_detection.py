@@ -1,27 +1,129 @@
 import cv2 as cv
+import numpy as np
 import time
 
+NO_BOXES = np.empty((0, 4), dtype=np.int32)
+
+CASCADES = {
+    'face_cascade' : 'haarcascade_frontalface_alt2.xml',
+    'eye_cascade' : 'haarcascade_eye.xml',
+    'smile_cascade' : 'haarcascade_smile.xml',
+}
+
 class FaceDetector:
 
-    def __init__(self):
+    """
+    Haar cascade face, eye and smile detection.
+
+    Faces are searched on a gray copy of the frame downscaled by scale and
+    histogram equalized, eyes and smiles only inside the faces found. Minimum
+    sizes are fractions of the frame's shorter side (faces) or of the face
+    width (eyes, smiles), so they follow the resolution. Boxes come back as
+    (x, y, w, h) rows in full resolution frame coordinates.
+
+    Cascades are loaded from disk the first time they are used.
+    """
+
+    def __init__(self, scale=0.5, equalize=True, min_face=0.12, min_eye=0.15, min_smile=0.25, roi_width=160):
         self.frames = []
         self.start_time = time.time()
         self.cv_haar_path = cv.data.haarcascades
-        self.face_cascade = cv.CascadeClassifier(self.cv_haar_path + 'haarcascade_frontalface_alt2.xml')
-        self.eye_cascade = cv.CascadeClassifier(self.cv_haar_path + 'haarcascade_eye.xml')
-        self.smile_cascade = cv.CascadeClassifier(self.cv_haar_path + 'haarcascade_smile.xml')
 
-    def detect_face(self, frame):
-        faces = self.face_cascade.detectMultiScale(frame, 1.1, 10, minSize=(60, 60))
+        self.scale = scale
+        self.equalize = equalize
+        self.min_face = min_face
+        self.min_eye = min_eye
+        self.min_smile = min_smile
+
+        # face ROIs wider than this are downscaled before the eye and smile search
+        self.roi_width = roi_width
+
+    def __getattr__(self, name):
+        if name not in CASCADES:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        cascade = cv.CascadeClassifier(self.cv_haar_path + CASCADES[name])
+        setattr(self, name, cascade)
+
+        return cascade
+
+    def copy(self):
+        """
+        Same settings, cascades of its own. A CascadeClassifier isn't safe to share
+        between threads, a detection thread gets its own copy.
+        """
+
+        return FaceDetector(self.scale, self.equalize, self.min_face, self.min_eye, self.min_smile, self.roi_width)
+
+    def gray(self, frame):
+        return cv.cvtColor(frame, cv.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+    def detect(self, frame):
+        """
+        Faces and the eyes inside them, sharing one gray conversion.
+        """
+
+        gray = self.gray(frame)
+        faces = self.detect_face(frame, gray)
+
+        return faces, self.detect_eyes(frame, faces, gray)
+
+    def detect_face(self, frame, gray=None):
+        gray = self.gray(frame) if gray is None else gray
+        h, w = gray.shape[:2]
+
+        small = gray
+        if self.scale != 1:
+            small = cv.resize(gray, (max(1, round(w * self.scale)), max(1, round(h * self.scale))), interpolation=cv.INTER_AREA)
+
+        if self.equalize:
+            small = cv.equalizeHist(small)
+
+        min_size = max(1, round(min(h, w) * self.min_face * self.scale))
+        faces = self.face_cascade.detectMultiScale(small, 1.1, 10, minSize=(min_size, min_size))
+
+        if len(faces) == 0:
+            return NO_BOXES
+
+        return np.round(np.asarray(faces) / self.scale).astype(np.int32)
+
+    def detect_eyes(self, frame, faces=None, gray=None):
+        # eyes sit in the upper part of the face
+        return self._detect_in_faces(frame, faces, gray, self.eye_cascade, 1.1, 10, self.min_eye, 0.0, 0.6)
+
+    def detect_smile(self, frame, faces=None, gray=None):
+        return self._detect_in_faces(frame, faces, gray, self.smile_cascade, 1.7, 22, self.min_smile, 0.5, 1.0)
+
+    def _detect_in_faces(self, frame, faces, gray, cascade, scale_factor, min_neighbors, min_relative, top, bottom):
+        gray = self.gray(frame) if gray is None else gray
+        faces = self.detect_face(frame, gray) if faces is None else faces
+
+        found = []
+        for (x, y, w, h) in faces:
+            y0, y1 = y + int(h * top), y + int(h * bottom)
+            roi = gray[max(0, y0):max(0, y1), max(0, x):max(0, x + w)]
+            if roi.size == 0:
+                continue
+
+            roi_scale = min(1.0, self.roi_width / roi.shape[1])
+            if roi_scale < 1.0:
+                roi = cv.resize(roi, (max(1, round(roi.shape[1] * roi_scale)), max(1, round(roi.shape[0] * roi_scale))),
+                                interpolation=cv.INTER_AREA)
+
+            if self.equalize:
+                roi = cv.equalizeHist(roi)
 
-        return faces
+            min_size = max(1, round(w * roi_scale * min_relative))
+            boxes = cascade.detectMultiScale(roi, scale_factor, min_neighbors, minSize=(min_size, min_size))
 
-    def detect_eyes(self, frame):
-        eyes = self.eye_cascade.detectMultiScale(frame, 1.1, 10, minSize=(20, 20))
+            for box in boxes:
+                box = np.round(np.asarray(box) / roi_scale).astype(np.int32)
+                found.append(box + (max(0, x), max(0, y0), 0, 0))
 
-        return eyes
+        if not found:
+            return NO_BOXES
 
-    def detect_smile(self, frame):
-        smile = self.smile_cascade.detectMultiScale(frame, 1.7, 22, minSize=(25, 25))
+        return np.array(found, dtype=np.int32)
 
-        return smile
+# shared by every module doing face work, so each cascade is loaded once per process
+faceDetector = FaceDetector()
@@ -0,0 +1,249 @@
+import cv2 as cv
+import numpy as np
+import threading
+import queue
+import time
+
+from processors.face_detection import NO_BOXES
+
+class FaceDetections:
+
+    """
+    Face and eye boxes of one frame, shared by every facial effect applied to it.
+    """
+
+    def __init__(self, faces, eyes, frame_index, detected, timestamp=None):
+        self.faces = faces
+        self.eyes = eyes
+        self.frame_index = frame_index
+        self.detected = detected
+
+        # perf_counter time of the frame the cascades last ran on
+        self.timestamp = timestamp
+
+class FaceTracker:
+
+    """
+    Runs the Haar cascades of a FaceDetector every detect_interval frames, or
+    right away on a scene change, and follows the boxes with sparse optical
+    flow in between.
+
+    update(frame, frame_index) returns the same FaceDetections for every call
+    with the same frame_index, so chained effects share one set of boxes.
+    """
+
+    def __init__(self, detector, detect_interval=10, scene_threshold=25.0, max_points=20, min_points=4):
+        self.detector = detector
+        self.detect_interval = detect_interval
+        self.scene_threshold = scene_threshold
+        self.max_points = max_points
+        self.min_points = min_points
+
+        self.prev_gray = None
+        self.thumbnail = None
+        self.frames_since_detection = None
+
+        self.faces = NO_BOXES
+        self.eyes = NO_BOXES
+        self.detections = None
+        self.detection_time = None
+
+        self.detection_count = 0
+
+    def update(self, frame, frame_index=None):
+        if self.detections is not None and frame_index is not None and frame_index == self.detections.frame_index:
+            return self.detections
+
+        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumbnail = cv.resize(gray, (64, 36), interpolation=cv.INTER_AREA)
+
+        if self._needs_detection(gray, thumbnail):
+            faces, eyes = self.detector.detect(gray)
+            self.faces = self._boxes(faces)
+            self.eyes = self._boxes(eyes)
+
+            self.detection_time = time.perf_counter()
+            self.frames_since_detection = 0
+            self.detection_count += 1
+            detected = True
+        else:
+            self.faces = self._track(self.prev_gray, gray, self.faces)
+            self.eyes = self._track(self.prev_gray, gray, self.eyes)
+
+            self.frames_since_detection += 1
+            detected = False
+
+        self.prev_gray = gray
+        self.thumbnail = thumbnail
+
+        self.detections = FaceDetections(self.faces, self.eyes, frame_index, detected, self.detection_time)
+        return self.detections
+
+    def _needs_detection(self, gray, thumbnail):
+        if self.frames_since_detection is None or self.prev_gray.shape != gray.shape:
+            return True
+
+        if self.frames_since_detection + 1 >= self.detect_interval:
+            return True
+
+        # mean absolute difference of the thumbnails, a cut or a big camera move
+        return cv.norm(thumbnail, self.thumbnail, cv.NORM_L1) / thumbnail.size > self.scene_threshold
+
+    def _boxes(self, boxes):
+        if len(boxes) == 0:
+            return NO_BOXES
+
+        return np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+
+    def _track(self, prev_gray, gray, boxes):
+        """
+        Moves every box by the median flow of the corners found inside it.
+        A box that loses its corners keeps its place and forces a detection on the next frame.
+        """
+
+        if len(boxes) == 0:
+            return boxes
+
+        h, w = gray.shape[:2]
+        points, owners = [], []
+
+        for index, (x, y, bw, bh) in enumerate(boxes):
+            roi = prev_gray[max(0, y):max(0, y+bh), max(0, x):max(0, x+bw)]
+            if roi.size == 0:
+                continue
+
+            corners = cv.goodFeaturesToTrack(roi, self.max_points, 0.01, 3)
+            if corners is None:
+                continue
+
+            points.append(corners.reshape(-1, 2) + (max(0, x), max(0, y)))
+            owners.extend([index] * len(corners))
+
+        if not points:
+            self.frames_since_detection = self.detect_interval
+            return boxes
+
+        points = np.concatenate(points).astype(np.float32).reshape(-1, 1, 2)
+        owners = np.array(owners)
+
+        moved, status, _ = cv.calcOpticalFlowPyrLK(prev_gray, gray, points, None, winSize=(15, 15), maxLevel=2)
+        status = status.reshape(-1).astype(bool)
+        flow = (moved - points).reshape(-1, 2)
+
+        tracked = boxes.copy()
+        for index in range(len(boxes)):
+            good = status & (owners == index)
+
+            if np.count_nonzero(good) < self.min_points:
+                self.frames_since_detection = self.detect_interval
+                continue
+
+            dx, dy = np.median(flow[good], axis=0)
+            x, y, bw, bh = boxes[index]
+
+            tracked[index, 0] = int(np.clip(round(x + dx), 0, max(0, w - bw)))
+            tracked[index, 1] = int(np.clip(round(y + dy), 0, max(0, h - bh)))
+
+        return tracked
+
+class AsyncFaceTracker(FaceTracker):
+
+    """
+    FaceTracker for the live modes, the cascades run on a background thread so
+    the effect stage never waits for them.
+
+    Every update() hands the gray frame to the worker through a single slot
+    mailbox, the worker always detects on the most recent one and publishes
+    its boxes with the timestamp of that frame. update() applies the newest
+    published boxes right away. With motion_compensation they are moved by
+    optical flow from the frame they were found on to the current one, and
+    followed frame to frame until the next result comes in.
+
+    The worker thread starts with the first update(), so an idle module costs nothing.
+    """
+
+    def __init__(self, detector, motion_compensation=True, max_points=20, min_points=4):
+        super().__init__(detector, max_points=max_points, min_points=min_points)
+
+        self.motion_compensation = motion_compensation
+
+        self.requests = queue.Queue(maxsize=1)
+        self.result = None
+        self.result_lock = threading.Lock()
+        self.applied_result = None
+
+        self.thread = None
+        self.running = False
+
+        self.skipped_frames = 0
+        self.latency = 0.0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._detect_loop, name="FaceDetection", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def _detect_loop(self):
+        while self.running:
+            try:
+                gray, frame_index, timestamp = self.requests.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            faces, eyes = self.detector.detect(gray)
+
+            with self.result_lock:
+                self.result = (self._boxes(faces), self._boxes(eyes), gray, frame_index, timestamp)
+                self.detection_count += 1
+                self.latency = time.perf_counter() - timestamp
+
+    def _submit(self, gray, frame_index):
+        try:
+            self.requests.get_nowait()
+            self.skipped_frames += 1
+        except queue.Empty:
+            pass
+
+        self.requests.put_nowait((gray, frame_index, time.perf_counter()))
+
+    def update(self, frame, frame_index=None):
+        if self.detections is not None and frame_index is not None and frame_index == self.detections.frame_index:
+            return self.detections
+
+        if self.thread is None:
+            self.start()
+
+        gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        self._submit(gray, frame_index)
+
+        with self.result_lock:
+            result = self.result
+
+        detected = result is not None and result is not self.applied_result
+
+        if detected:
+            faces, eyes, result_gray, _, self.detection_time = result
+            self.applied_result = result
+
+            if self.motion_compensation and result_gray.shape == gray.shape:
+                faces = self._track(result_gray, gray, faces)
+                eyes = self._track(result_gray, gray, eyes)
+
+            self.faces, self.eyes = faces, eyes
+
+        elif self.motion_compensation and self.prev_gray is not None and self.prev_gray.shape == gray.shape:
+            self.faces = self._track(self.prev_gray, gray, self.faces)
+            self.eyes = self._track(self.prev_gray, gray, self.eyes)
+
+        self.prev_gray = gray
+
+        self.detections = FaceDetections(self.faces, self.eyes, frame_index, detected, self.detection_time)
+        return self.detections
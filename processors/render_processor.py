@@ -1,13 +1,250 @@
 import cv2 as cv
 import numpy as np
+import subprocess
+import tempfile
+import threading
+import queue
+import time
+import os
 from utils.console_logger import ConsoleLogger
 
 logger = ConsoleLogger()
 
+# marks the end of the encoder queue, None can't be used since a broken effect may hand it over
+END_OF_STREAM = object()
+
+class FFmpegPipe:
+
+    """
+    VideoWriter look-alike that streams raw BGR frames to an ffmpeg subprocess
+    over stdin. The source audio track, when given, is muxed in the same pass.
+
+    ffmpeg's stderr goes to a temporary file, a pipe nobody reads while frames
+    are written would fill up and block ffmpeg, and with it write().
+    """
+
+    def __init__(self, output_path, fps, frame_size, codec='libx264', preset='veryfast', crf=18, threads=0, audio_source=None):
+        width, height = frame_size
+
+        cmd = [
+            'ffmpeg',
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'bgr24',
+            '-s', f"{width}x{height}",
+            '-r', str(fps),
+            '-i', '-',
+        ]
+
+        if audio_source is not None:
+            cmd += ['-i', audio_source, '-map', '0:v:0', '-map', '1:a:0?', '-c:a', 'aac', '-shortest']
+
+        cmd += [
+            '-c:v', codec,
+            '-preset', preset,
+            '-crf', str(crf),
+            '-threads', str(threads),
+            '-pix_fmt', 'yuv420p',
+            '-y',
+            output_path
+        ]
+
+        self.stderr = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=self.stderr)
+
+    def isOpened(self):
+        return self.process.poll() is None
+
+    def write(self, frame):
+        try:
+            self.process.stdin.write(memoryview(np.ascontiguousarray(frame)))
+        except BrokenPipeError:
+            self.process.wait()
+            raise RuntimeError(f"ffmpeg exited with code {self.process.returncode}: {self._error_output()}") from None
+
+    def _error_output(self):
+        self.stderr.seek(0)
+        return self.stderr.read().decode(errors='ignore').strip()
+
+    def release(self):
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+        self.process.wait()
+
+        if self.process.returncode != 0:
+            logger.error(f"ffmpeg exited with code {self.process.returncode}: {self._error_output()}")
+
+        self.stderr.close()
+
 class RenderProcessor:
 
-    def __init__(self):
-        self.frames = []
+    """
+    Incremental video writer, frames are encoded as soon as they are handed
+    over so a render never has to hold the whole clip in memory.
+
+        renderProcessor.open(output_path, fps, (width, height))
+        renderProcessor.write(frame)
+        renderProcessor.close()
+
+    With async_write=True the encoding happens on a background thread fed by a
+    bounded queue, write() only blocks when the encoder is queue_size frames
+    behind. Frames handed to write() must not be modified afterwards.
+
+    backend='ffmpeg' pipes the frames to an ffmpeg process instead of cv.VideoWriter,
+    with the codec, preset, crf and threads options, and muxes the audio of the
+    audio_source given to open(). Falls back to cv.VideoWriter without ffmpeg.
+    """
+
+    def __init__(self, fourcc='avc1', async_write=False, queue_size=8,
+                 backend='opencv', codec='libx264', preset='veryfast', crf=18, threads=0):
+        self.fourcc = fourcc
+        self.async_write = async_write
+        self.queue_size = queue_size
+
+        self.backend = backend
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+
+        self.writer = None
+        self.output_path = None
+        self.frames_written = 0
+
+        self.frames = None
+        self.encoder_thread = None
+        self.encoder_error = None
+
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.encode_time = 0.0
+        self.blocked_time = 0.0
+        self.process_time = 0.0
+        self.last_write = None
+
+    def open(self, output_path, fps, frame_size, audio_source=None):
+        if self.writer is not None:
+            self.close()
+
+        width, height = frame_size
+        self.writer = self._open_writer(output_path, fps, (width, height), audio_source)
+
+        if not self.writer.isOpened():
+            encoder = self.codec if self.backend == 'ffmpeg' else self.fourcc
+            logger.error(f"❌ Couldn't open a '{encoder}' video writer for {output_path}!")
+            self.writer = None
+            return False
+
+        self.output_path = output_path
+        self.frames_written = 0
+        self.encoder_error = None
+        self._reset_stats()
+
+        if self.async_write:
+            self.frames = queue.Queue(maxsize=self.queue_size)
+            self.encoder_thread = threading.Thread(target=self._encode_loop, name="RenderEncoder", daemon=True)
+            self.encoder_thread.start()
+
+        logger.info(f"📹 Streaming frames to {output_path}...")
+        return True
+
+    def _open_writer(self, output_path, fps, frame_size, audio_source):
+        if self.backend == 'ffmpeg':
+            try:
+                return FFmpegPipe(output_path, fps, frame_size, self.codec, self.preset,
+                                  self.crf, self.threads, audio_source)
+            except FileNotFoundError:
+                logger.warn("ffmpeg not found, falling back to cv.VideoWriter without audio.")
+
+        fourcc = cv.VideoWriter_fourcc(*self.fourcc)
+        return cv.VideoWriter(output_path, fourcc, fps, frame_size)
+
+    def write(self, frame):
+        if frame is None:
+            logger.warn("⚠️ Skipped an empty frame.")
+            return
+
+        now = time.perf_counter()
+        if self.last_write is not None:
+            self.process_time += now - self.last_write
+
+        if self.async_write:
+            # put() blocks on a full queue, that's the backpressure from a slow encoder
+            self.frames.put(frame)
+            self.blocked_time += time.perf_counter() - now
+        elif self.encoder_error is None:
+            try:
+                self._encode(frame)
+                self.frames_written += 1
+            except Exception as e:
+                # same as the encoder thread, the render goes on and close() reports the failure
+                self.encoder_error = e
+
+        self.last_write = time.perf_counter()
+
+    def _encode(self, frame):
+        start = time.perf_counter()
+        self.writer.write(frame)
+        self.encode_time += time.perf_counter() - start
+
+    def _encode_loop(self):
+        while True:
+            frame = self.frames.get()
+            if frame is END_OF_STREAM:
+                return
+
+            if self.encoder_error is not None:
+                continue
+
+            try:
+                self._encode(frame)
+                self.frames_written += 1
+            except Exception as e:
+                # keep draining the queue so write() never blocks on a dead encoder
+                self.encoder_error = e
+
+    def close(self):
+        if self.encoder_thread is not None:
+            # sentinel after the last frame, the encoder drains the queue before it stops
+            self.frames.put(END_OF_STREAM)
+            self.encoder_thread.join()
+            self.encoder_thread = None
+            self.frames = None
+
+        if self.encoder_error is not None:
+            logger.error(f"❌ Encoding failed after {self.frames_written} frames: {self.encoder_error}")
+
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+        return self.frames_written
+
+    def stats(self):
+        """
+        Where the render time went. process_time is the time spent between two
+        write() calls, so the effect side, encode_time the time inside the
+        encoder. If blocked_time is large the encoder is the bottleneck.
+        """
+
+        frames = max(self.frames_written, 1)
+
+        return {
+            "frames": self.frames_written,
+            "encode_ms": self.encode_time / frames * 1000,
+            "process_ms": self.process_time / frames * 1000,
+            "blocked_ms": self.blocked_time / frames * 1000,
+            "bottleneck": "encoder" if self.encode_time > self.process_time else "processing",
+        }
+
+    def logStats(self):
+        stats = self.stats()
+        logger.info(f"⏱️ Encode {stats['encode_ms']:.1f} ms/frame, processing {stats['process_ms']:.1f} ms/frame, "
+                    f"blocked {stats['blocked_ms']:.1f} ms/frame, bottleneck: {stats['bottleneck']}")
 
     def renderFrames(self, frames, output_path, fps):
         if not frames:
@@ -15,16 +252,81 @@ class RenderProcessor:
             return False
 
         height, width = frames[0].shape[:2]
-        
-        fourcc = cv.VideoWriter_fourcc(*'avc1')
-        out = cv.VideoWriter(output_path, fourcc, fps, (width, height))
-        
+
+        if not self.open(output_path, fps, (width, height)):
+            return False
+
         logger.info(f"📹 Exporting {len(frames)} frames to {output_path}...")
-        
+
         for i, frame in enumerate(frames):
-            out.write(frame)
-            if i % 30 == 0: 
+            self.write(frame)
+            if i % 30 == 0:
                 logger.info(f"📦 Frame {i}/{len(frames)}")
-        
-        out.release()
-        return True
\ No newline at end of file
+
+        self.close()
+        return True
+
+    def concatSegments(self, segment_paths, output_path, fps, audio_source=None):
+        """
+        Joins rendered segments into one file. ffmpeg's concat demuxer copies the
+        encoded streams without touching them, re-encoding is only the fallback
+        for machines without ffmpeg. The audio of audio_source is muxed in while joining.
+        """
+
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as playlist:
+            for path in segment_paths:
+                playlist.write(f"file '{os.path.abspath(path)}'\n")
+
+        try:
+            cmd = [
+                'ffmpeg',
+                '-f', 'concat',
+                '-safe', '0',
+                '-i', playlist.name,
+            ]
+
+            if audio_source is not None:
+                cmd += ['-i', audio_source, '-map', '0:v:0', '-map', '1:a:0?', '-c:a', 'aac', '-shortest']
+
+            cmd += [
+                '-c:v', 'copy',
+                '-y',
+                output_path
+            ]
+
+            subprocess.run(cmd, capture_output=True, check=True)
+
+            logger.success(f"🎬 Joined {len(segment_paths)} segments into {output_path}")
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to join segments: {e}")
+            return False
+        except FileNotFoundError:
+            logger.warn("ffmpeg not found, re-encoding the segments instead of copying them.")
+            return self._reencodeSegments(segment_paths, output_path, fps)
+        finally:
+            os.remove(playlist.name)
+
+    def _reencodeSegments(self, segment_paths, output_path, fps):
+        opened = False
+
+        for path in segment_paths:
+            capture = cv.VideoCapture(path)
+
+            while True:
+                ret, frame = capture.read()
+                if not ret:
+                    break
+
+                if not opened:
+                    height, width = frame.shape[:2]
+                    if not self.open(output_path, fps, (width, height)):
+                        capture.release()
+                        return False
+                    opened = True
+
+                self.write(frame)
+
+            capture.release()
+
+        return self.close() > 0
@@ -21,6 +21,23 @@ class Configure():
             'build_dir': 'build',
             'webcam' : 0,
             'use_gpu' : False
+        },
+        'analysis': {
+            'scale': 1,
+            'edge_metric': 'canny',
+            'variance_metric': 'direct'
+        },
+        'render': {
+            'backend': 'ffmpeg',
+            'codec': 'libx264',
+            'preset': 'veryfast',
+            'crf': 18,
+            'threads': 0
+        },
+        'audio': {
+            'features': True,
+            'fft_size': 2048,
+            'average_seconds': 2.0
         }
     }
         try:
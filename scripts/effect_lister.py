@@ -1,7 +1,11 @@
-from modules.module_manager import ModuleManager
+from modules.registry import moduleRegistry
 
 def listEffects(args):
-    moduleManager = ModuleManager()
+    # the modules are imported for their registrations but never instantiated
+    for module_name in moduleRegistry.names():
+        effects = moduleRegistry.get(module_name).effects
 
-    for effect, functions in moduleManager.effects_functions.items():
-        print(f"{effect} - {functions}\n")
\ No newline at end of file
+        print(f"{module_name} - {list(effects)}")
+        for info in effects.values():
+            print(f"    {info.name:<32} cost: {info.cost:<7} kind: {info.kind:<10} stateful: {str(info.stateful):<6} colorspaces: {' -> '.join(info.colorspaces)}")
+        print()
\ No newline at end of file
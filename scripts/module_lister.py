@@ -1,7 +1,6 @@
-from modules.module_manager import ModuleManager
+from modules.registry import moduleRegistry
 
 def listModules(args):
-    moduleManager = ModuleManager()
-
-    for effect, functions in moduleManager.effects_functions.items():
-        print(f"{effect}")
\ No newline at end of file
+    # names only, nothing gets imported or instantiated
+    for module_name in moduleRegistry.names():
+        print(f"{module_name}")
\ No newline at end of file
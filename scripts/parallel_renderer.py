@@ -0,0 +1,222 @@
+import cv2 as cv
+import numpy as np
+import argparse
+import random
+import tempfile
+import shutil
+import time
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from colorama import Fore, Back, Style, init
+
+from modules.module_manager import ModuleManager
+
+from scripts.configure import Configure
+
+from processors.render_processor import RenderProcessor
+from processors.audio_processor import AudioProcessor
+
+from utils.console_logger import ConsoleLogger
+
+init(autoreset=True)
+logger = ConsoleLogger()
+
+def seedSegment(seed, start):
+    """
+    Seeds every RNG the effects draw from, so a segment renders the same for a
+    given seed no matter which worker picks it up.
+    """
+
+    if seed is None:
+        return
+
+    random.seed(seed * 1000003 + start)
+    np.random.seed((seed * 1000003 + start) % 2**32)
+    cv.setRNGSeed((seed * 1000003 + start) % 2**31)
+
+def renderSegment(job):
+    """
+    Worker entry point, renders frames [start, end) of the video into its own file.
+    The warm-up frames before start only feed the calibration so the threshold
+    has converged by the first written frame.
+
+    Returns (index, output_path, frames written), output_path is None when the
+    segment couldn't be rendered.
+    """
+
+    seedSegment(job["seed"], job["start"])
+
+    # the sidecar is memory mapped, every worker shares the same pages
+    audioproc = AudioProcessor()
+    if job["audio_track"]:
+        audioproc.open_feature_track(job["audio_track"])
+
+    moduleManager = ModuleManager(job["analysis_options"])
+    moduleManager.set_modules(job["modules"])
+
+    # effect time comes from the absolute frame index, segments continue each other's animations
+    moduleManager.use_frame_clock(job["fps"])
+
+    effect_args = argparse.Namespace(effects=job["effects"], float_pipeline=job["float_pipeline"],
+                                     frame_pool=job["frame_pool"])
+
+    capture = cv.VideoCapture(job["video_path"])
+    fps = capture.get(cv.CAP_PROP_FPS)
+    width = int(capture.get(cv.CAP_PROP_FRAME_WIDTH))
+    height = int(capture.get(cv.CAP_PROP_FRAME_HEIGHT))
+
+    warm_start = max(0, job["start"] - job["warmup"])
+    capture.set(cv.CAP_PROP_POS_FRAMES, warm_start)
+
+    renderProcessor = RenderProcessor(async_write=True, **job["render_options"])
+    if not renderProcessor.open(job["output_path"], fps, (width, height)):
+        capture.release()
+        return job["index"], None, 0
+
+    for frame_index in range(warm_start, job["end"]):
+        ret, frame = capture.read()
+        if not ret:
+            break
+
+        # same as the serial renderer, a frame that fails is logged and skipped instead of ending the segment
+        try:
+            analysis = moduleManager.analyze_frame(frame)
+            moduleManager.add_frame(frame, analysis, frame_index)
+
+            if frame_index < job["start"]:
+                continue
+
+            audioproc.seek_frame(frame_index)
+            processed_frame = moduleManager.process_frame(frame, analysis, effect_args)
+        except Exception as error:
+            exc_type, exc_value, exc_traceback = sys.exc_info()
+            line_number = exc_traceback.tb_lineno
+            filename = exc_traceback.tb_frame.f_code.co_filename
+
+            logger.error(f"{error} in file {os.path.basename(filename)} : line number {line_number}")
+            continue
+
+        renderProcessor.write(processed_frame)
+
+    capture.release()
+    written = renderProcessor.close()
+
+    return job["index"], job["output_path"] if written else None, written
+
+def planSegments(total_frames, segment_size):
+    return [(start, min(start + segment_size, total_frames)) for start in range(0, total_frames, segment_size)]
+
+def parallelRenderer(args):
+
+    # ------------------- Initialize managers from here -------------------
+
+    configure = Configure()
+    config = configure.load_config()
+    ASSETS_PATH = config["assets"]["assets_videos"]
+
+    # ------------------- Initialize I/O from here -------------------
+
+    FILENAME = "video_" + str(datetime.now().strftime("%Y_%m_%d_%H_%M_%S")) + ".mp4"
+
+    entries = os.listdir(ASSETS_PATH)
+    files = [entry for entry in entries if os.path.isfile(os.path.join(ASSETS_PATH, entry))]
+    logger.info("Files to be processed in assets folder : " + str(files))
+
+    VIDEO_NAME_IO = input(str(Fore.BLUE + "Enter video name to process : "))
+
+    if(VIDEO_NAME_IO + ".mp4" not in files):
+        logger.error(f"Couldn't find the associated file '{VIDEO_NAME_IO}'. Please check the name, or configure proper assets path.")
+        return False
+
+    VIDEO_PATH = ASSETS_PATH + VIDEO_NAME_IO + ".mp4"
+    logger.success(f"File found. Processing: {VIDEO_PATH}")
+
+    if not args.modules:
+        logger.error("No module specified for the parallel render!")
+        return False
+
+    capture = cv.VideoCapture(VIDEO_PATH)
+    fps_cv = capture.get(cv.CAP_PROP_FPS)
+    total_frames = min(int(capture.get(cv.CAP_PROP_FRAME_COUNT)), int(fps_cv * 60))
+    capture.release()
+
+    # analyzed here once, the workers only map the sidecar
+    audio_options = config.get("audio") or {}
+    audio_track = None
+    if audio_options.get("features", True):
+        audio_track = AudioProcessor().load_feature_track(VIDEO_PATH, fps_cv, fft_size=audio_options.get("fft_size", 2048),
+                                                          average_seconds=audio_options.get("average_seconds", 2.0))
+
+    # ------------------- Split the video into segments from here -------------------
+
+    segment_dir = tempfile.mkdtemp(prefix="pychedelic_segments_")
+    segments = planSegments(total_frames, args.segment_size)
+
+    jobs = [{
+        "index": index,
+        "video_path": VIDEO_PATH,
+        "output_path": os.path.join(segment_dir, f"segment_{index:05d}.mp4"),
+        "start": start,
+        "end": end,
+        "warmup": args.warmup,
+        "fps": fps_cv,
+        "modules": args.modules,
+        "effects": args.effects,
+        "float_pipeline": args.float_pipeline,
+        "frame_pool": args.frame_pool,
+        "audio_track": audio_track,
+        "seed": args.seed,
+        "analysis_options": config.get("analysis"),
+        "render_options": config.get("render") or {},
+    } for index, (start, end) in enumerate(segments)]
+
+    logger.info(f"⚡ Rendering {total_frames} frames as {len(jobs)} segments on {args.workers} workers...")
+
+    start_time = time.time()
+    segment_paths = [None] * len(jobs)
+    frames_written = 0
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(renderSegment, job): job["index"] for job in jobs}
+
+            for future in as_completed(futures):
+                index = futures[future]
+
+                try:
+                    _, output_path, written = future.result()
+                except Exception as error:
+                    # a crashed worker fails its segment, the others still finish
+                    logger.error(f"❌ Segment {index + 1}/{len(jobs)} crashed: {error}")
+                    continue
+
+                segment_paths[index] = output_path
+                frames_written += written
+
+                if output_path is None:
+                    logger.error(f"❌ Segment {index + 1}/{len(jobs)} failed to render!")
+                else:
+                    logger.info(f"📦 Segment {index + 1}/{len(jobs)} done ({written} frames)")
+
+        # a missing segment would leave a hole in the video, nothing gets joined
+        if None in segment_paths:
+            logger.error("❌ Render aborted, not every segment was rendered!")
+            return False
+
+        total_time = time.time() - start_time
+        logger.info(f"✅ Processed {frames_written} frames in {total_time:.2f}s ({frames_written/total_time:.1f} fps)")
+
+        renderProcessor = RenderProcessor(**(config.get("render") or {}))
+        exported = renderProcessor.concatSegments(segment_paths, "build/" + FILENAME, fps_cv, audio_source=VIDEO_PATH)
+    finally:
+        # segments are only intermediate files, they go whatever happened
+        shutil.rmtree(segment_dir, ignore_errors=True)
+
+    if not exported:
+        logger.error("❌ Failed to join the rendered segments!")
+        return False
+
+    logger.success(f"🎉 Done! Open {FILENAME} to see your masterpiece!")
+    return True
@@ -7,34 +7,34 @@ from colorama import Fore, Back, Style, init
 from modules.module_manager import ModuleManager
 
 from processors.audio_processor import AudioProcessor
+from processors.capture_processor import FrameGrabber, FrameDisplay
 
 from scripts.configure import Configure
 
 from utils.console_logger import ConsoleLogger
 
-audioproc = AudioProcessor()
 init(autoreset=True)
 
-def is_window_open(window_name, audio_dump):
+def is_window_open(window_name):
     try:
         status = cv.getWindowProperty(window_name, cv.WND_PROP_VISIBLE)
         return status > 0
     except:
-        audioproc.delete_temp_audio(audio_dump)
         return False
 
 def realtimeFilter(args):
     # ------------------- Initialize managers / file configurations from here -------------------
 
-    moduleManager = ModuleManager()
     configure = Configure()
     config = configure.load_config()
+    moduleManager = ModuleManager(config.get("analysis"))
     
     ASSETS_PATH = config["assets"]["assets_videos"]
 
     # ------------------- Initialize utils from here -------------------
 
     logger = ConsoleLogger()
+    audioproc = AudioProcessor()
 
     # ------------------- Initialize I/O from here -------------------
 
@@ -53,7 +53,16 @@ def realtimeFilter(args):
         logger.success(f"File found. Processing: {VIDEO_PATH}")
 
     audio_dump = audioproc.dump_tempfile(VIDEO_PATH)
+    audio_stream = False
+
+    if audio_dump:
+        # bands and centroid follow the playback through a streaming STFT, a few hops per frame
+        audioproc.load_audio(audio_dump)
+        audioproc.start_stream()
+        audio_stream = True
+
     audioproc.play_audio(audio_dump)
+    audio_start = time.perf_counter()
 
     capture = cv.VideoCapture(VIDEO_PATH)
 
@@ -63,40 +72,52 @@ def realtimeFilter(args):
 
     width = int(capture.get(cv.CAP_PROP_FRAME_WIDTH))
     height = int(capture.get(cv.CAP_PROP_FRAME_HEIGHT))
+    fps_cv = capture.get(cv.CAP_PROP_FPS)
 
     # <--------------------- moduleManager setting effect from here --------------------->
 
     if hasattr(args, "modules"):
-        moduleManager.set_module(args.modules[0])
+        moduleManager.set_modules(args.modules)
     else:
         print("Undefined argument.")
         return -1
 
+    # live playback favours frame rate over the smoother cubic resampling
+    if "ColorChaos" in moduleManager.module_chain:
+        moduleManager.get_module("ColorChaos").sine_interpolation = cv.INTER_LINEAR
+
+    # face detection runs next to the loop instead of blocking it
+    if "FacialArtifacts" in moduleManager.module_chain:
+        moduleManager.get_module("FacialArtifacts").use_async_detection()
+
     cv.namedWindow('Video Feed', cv.WINDOW_NORMAL)
     cv.resizeWindow('Video Feed', width, height)
 
+    # decoding runs on its own thread, display is paced to the source fps
+    grabber = FrameGrabber(capture, mode='queue', loop=True).start()
+    display = FrameDisplay("Video Feed", fps=fps_cv)
+
     # <--------------------- Script loop from here --------------------->
 
     while True:
-        ret, frame = capture.read()
+        ret, frame, _ = grabber.read()
 
         if not ret:
             logger.info("Stream ended or failed to read frame.")
-            if capture.get(cv.CAP_PROP_POS_FRAMES) > 0:
-                capture.set(cv.CAP_PROP_POS_FRAMES, 0)
-                continue
-            else:
-                break
+            break
 
         active_module = moduleManager.get_active_module()
 
-        complexity = active_module.calculate_complexity(frame)
-        active_module.add_frame(frame)
-        processed_frame = moduleManager.process_frame(frame, complexity, args)
+        if audio_stream:
+            audioproc.advance_to(time.perf_counter() - audio_start)
+
+        analysis = moduleManager.analyze_frame(frame)
+        complexity = analysis.complexity
+        moduleManager.add_frame(frame, analysis)
+        processed_frame = moduleManager.process_frame(frame, analysis, args)
 
         elapsed_time = time.time() - active_module.start_time
-        fps_cv = capture.get(cv.CAP_PROP_FPS)
-        fps = len(active_module.frames) // elapsed_time if elapsed_time > 0 else 0
+        fps = active_module.frame_count // elapsed_time if elapsed_time > 0 else 0
 
         # <--------------------- Debugging text from here --------------------->
 
@@ -123,15 +144,22 @@ def realtimeFilter(args):
 
             cv.putText(processed_frame, f"EFFECT: {moduleManager.module_history[-1].name}", (10, 350),
                 cv.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+            cv.putText(processed_frame, f"DROPPED : {grabber.dropped_frames}  LATE : {display.late_frames}", (10, 400),
+                cv.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
 
-        if is_window_open("Video Feed", audio_dump):
-            cv.imshow("Video Feed", processed_frame)
+            if audio_stream:
+                bands = "  ".join(f"{band.upper()} : {round(value, 2)}" for band, value in audioproc.frequency_bands.items())
+                cv.putText(processed_frame, f"{bands}  CENTROID : {round(audioproc.spectral_centroid)} HZ", (10, 450),
+                    cv.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+
+        if is_window_open("Video Feed"):
+            display.show(processed_frame)
         else :
             if args.debug:
                 logger.terminate("Terminated the video process.")
             break
 
-        key = cv.waitKey(10) & 0xFF
+        key = display.wait_key()
         if key == ord('q'):
             if args.debug:
                 logger.terminate("Q key detected!")
@@ -143,6 +171,13 @@ def realtimeFilter(args):
             args.debug = not args.debug
             continue
 
+    grabber.stop()
+    if "FacialArtifacts" in moduleManager.module_chain:
+        moduleManager.get_module("FacialArtifacts").stop_detection()
+    capture.release()
     cv.destroyAllWindows()
 
+    logger.info(f"Shown {display.frames_shown} frames, {grabber.dropped_frames} dropped, {display.late_frames} late.")
+    moduleManager.logStageTimes()
+
     audioproc.delete_temp_audio(audio_dump)
\ No newline at end of file
@@ -9,29 +9,28 @@ from modules.module_manager import ModuleManager
 
 from scripts.configure import Configure
 
-from processors.audio_processor import AudioProcessor
-
 from utils.console_logger import ConsoleLogger
 
-audioproc = AudioProcessor()
 init(autoreset=True)
 
 # ------------------- Importing functions from here -------------------
 
 from processors.render_processor import RenderProcessor
+from processors.audio_processor import AudioProcessor
 
 def videoRenderer(args):
     
     # ------------------- Initialize managers from here -------------------
 
-    moduleManager = ModuleManager()
     configure = Configure()
-    config = configure.load_config()    
+    config = configure.load_config()
+    moduleManager = ModuleManager(config.get("analysis"))
     ASSETS_PATH = config["assets"]["assets_videos"]
 
     # ------------------- Initialize processors from here -------------------
 
-    renderProcessor = RenderProcessor()
+    renderProcessor = RenderProcessor(async_write=True, **(config.get("render") or {}))
+    audioproc = AudioProcessor()
 
     # ------------------- Initialize utils from here -------------------
 
@@ -57,11 +56,28 @@ def videoRenderer(args):
     capture = cv.VideoCapture(ASSETS_PATH + VIDEO_NAME_IO + ".mp4")
 
     if hasattr(args, "modules"):
-        moduleManager.set_module(args.modules[0])
+        moduleManager.set_modules(args.modules)
     else:
         logger.warn("No effects specified, using 'None' effect.")
         moduleManager.module_history.append("None")
 
+    fps_cv = capture.get(cv.CAP_PROP_FPS)
+    width = int(capture.get(cv.CAP_PROP_FRAME_WIDTH))
+
+    # effect time follows the frames, a render looks the same however fast it runs
+    moduleManager.use_frame_clock(fps_cv)
+    height = int(capture.get(cv.CAP_PROP_FRAME_HEIGHT))
+
+    if not renderProcessor.open("build/" + FILENAME, fps_cv, (width, height), audio_source=VIDEO_PATH):
+        capture.release()
+        return False
+
+    # band energies, centroid and onsets per frame, analyzed once per clip and memory mapped after that
+    audio_options = config.get("audio") or {}
+    if audio_options.get("features", True):
+        audioproc.load_feature_track(VIDEO_PATH, fps_cv, fft_size=audio_options.get("fft_size", 2048),
+                                     average_seconds=audio_options.get("average_seconds", 2.0))
+
     logger.info("⚡ Processing frames at MAXIMUM SPEED (no display)...")
 
     frame_count = 0
@@ -69,7 +85,6 @@ def videoRenderer(args):
     while True:
         isTrue, frame = capture.read()  
 
-        fps_cv = capture.get(cv.CAP_PROP_FPS)
         max_frames = int (fps_cv * 60)
 
         if not isTrue or frame_count >= max_frames: 
@@ -86,18 +101,20 @@ def videoRenderer(args):
             active_module = moduleManager.get_active_module()
             elapsed_time = time.time() - active_module.start_time
 
-            complexity = active_module.calculate_complexity(frame)
-            active_module.add_frame(frame)
+            audioproc.seek_frame(frame_count - 1)
+
+            analysis = moduleManager.analyze_frame(frame)
+            complexity = analysis.complexity
+            moduleManager.add_frame(frame, analysis, frame_count - 1)
 
-            processed_frame = moduleManager.process_frame(frame, complexity, args)
-            active_module.processed_frames.append(processed_frame)
+            processed_frame = moduleManager.process_frame(frame, analysis, args)
         except Exception as error:
             exc_type, exc_value, exc_traceback = sys.exc_info()
             line_number = exc_traceback.tb_lineno
             filename = exc_traceback.tb_frame.f_code.co_filename
 
             logger.error(f"{error} in file {os.path.basename(filename)} : line number {line_number}")
-            
+            continue
 
         # <--------------------- Debugging text from here --------------------->
         
@@ -123,13 +140,21 @@ def videoRenderer(args):
             cv.putText(processed_frame, f"EFFECT: {moduleManager.module_history[-1].name}", (50, 350), 
                 cv.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)  
 
+            if audioproc.feature_track is not None:
+                bands = "  ".join(f"{band.upper()} : {round(value, 2)}" for band, value in audioproc.frequency_bands.items())
+                cv.putText(processed_frame, f"{bands}  ONSET : {round(audioproc.onset_strength, 2)}", (50, 400),
+                    cv.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+
+        renderProcessor.write(processed_frame)
+
     capture.release()
+    frames_written = renderProcessor.close()
+    renderProcessor.logStats()
+    moduleManager.logStageTimes()
 
-    if active_module.processed_frames:
+    if frames_written:
         total_time = time.time() - active_module.start_time
-        logger.info(f"✅ Processed {len(active_module.processed_frames)} frames in {total_time:.2f}s")
-        logger.info(f"📹 Exporting at {len(active_module.processed_frames)/total_time:.1f} fps...")
-        renderProcessor.renderFrames(active_module.processed_frames, "build/" + FILENAME, fps_cv)
+        logger.info(f"✅ Processed and exported {frames_written} frames in {total_time:.2f}s ({frames_written/total_time:.1f} fps)")
         logger.success("🎬 Video exported: " + FILENAME)
     else:
         logger.error("❌ No frames processed!")
@@ -9,6 +9,7 @@ from modules.module_manager import ModuleManager
 from utils.console_logger import ConsoleLogger
 
 from processors.render_processor import RenderProcessor
+from processors.capture_processor import FrameGrabber, FrameDisplay
 
 def is_window_open(window_name):
     try:
@@ -28,27 +29,41 @@ def webcamFilter(args):
     # <--------------------- moduleManager setting effect from here --------------------->
 
     if hasattr(args, "modules"):
-        moduleManager.set_module(args.modules[0])
+        moduleManager.set_modules(args.modules)
     else:
         print(Fore.RED + Style.BRIGHT + "Undefined argument.")
         return False
     
+    # live playback favours frame rate over the smoother cubic resampling
+    if "ColorChaos" in moduleManager.module_chain:
+        moduleManager.get_module("ColorChaos").sine_interpolation = cv.INTER_LINEAR
+
+    # face detection runs next to the loop instead of blocking it
+    if "FacialArtifacts" in moduleManager.module_chain:
+        moduleManager.get_module("FacialArtifacts").use_async_detection()
+
+    fps_cv = capture.get(cv.CAP_PROP_FPS)
+
+    # the camera keeps producing frames on its own, only the freshest one is kept
+    grabber = FrameGrabber(capture, mode='latest').start()
+    display = FrameDisplay("Video Feed")
+
     cv.namedWindow('Video Feed', cv.WINDOW_NORMAL)
     while True:
-        ret, frame = capture.read()
+        ret, frame, _ = grabber.read()
 
         if not ret:
             break
 
         active_module = moduleManager.get_active_module()
 
-        complexity = active_module.calculate_complexity(frame)
-        active_module.add_frame(frame)
-        processed_frame = moduleManager.process_frame(frame, complexity, args)
+        analysis = moduleManager.analyze_frame(frame)
+        complexity = analysis.complexity
+        moduleManager.add_frame(frame, analysis)
+        processed_frame = moduleManager.process_frame(frame, analysis, args)
 
         elapsed_time = time.time() - active_module.start_time
-        fps_cv = capture.get(cv.CAP_PROP_FPS)
-        fps = len(active_module.frames) // elapsed_time if elapsed_time > 0 else 0
+        fps = active_module.frame_count // elapsed_time if elapsed_time > 0 else 0
 
         if args.debug:
             logger.info(f"Current {active_module.name} threshold has set to " + Fore.GREEN + Style.BRIGHT + str(active_module.threshold))
@@ -73,14 +88,16 @@ def webcamFilter(args):
 
             cv.putText(processed_frame, f"EFFECT: {moduleManager.module_history[-1].name}", (50, 350), 
                 cv.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 0), 2)
+            cv.putText(processed_frame, f"DROPPED : {grabber.dropped_frames}  LATE : {display.late_frames}", (50, 400),
+                cv.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 0), 2)
         
         if is_window_open("Video Feed"):
-            cv.imshow("Video Feed", cv.flip(processed_frame, 1))
+            display.show(cv.flip(processed_frame, 1))
         else :
             logger.terminate("Terminated the video process.")
             break
 
-        key = cv.waitKey(10) & 0xFF
+        key = display.wait_key()
         if key == ord('q'):
             if args.debug:
                 logger.terminate("Q key detected!")
@@ -93,4 +110,11 @@ def webcamFilter(args):
             args.debug = not args.debug
             continue
 
-    cv.destroyAllWindows()
\ No newline at end of file
+    grabber.stop()
+    if "FacialArtifacts" in moduleManager.module_chain:
+        moduleManager.get_module("FacialArtifacts").stop_detection()
+    capture.release()
+    cv.destroyAllWindows()
+
+    logger.info(f"Shown {display.frames_shown} frames, {grabber.dropped_frames} dropped, {display.late_frames} late.")
+    moduleManager.logStageTimes()
@@ -0,0 +1,114 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.audio_processor import AudioProcessor, SampleRing, feature_track, TRACK_FEATURES
+
+SAMPLE_RATE = 44100
+
+def tone(frequency, seconds, amplitude=0.5):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+def feed_frames(audio, samples, fps=30):
+    """
+    Feeds the samples the way live mode does, one video frame's worth at a time.
+    """
+
+    step = SAMPLE_RATE // fps
+    for start in range(0, len(samples), step):
+        audio.feed(samples[start:start + step])
+
+def test_ring_windows_are_the_latest_samples():
+    ring = SampleRing(10)
+    samples = np.arange(37, dtype=np.float32)
+
+    for chunk in np.array_split(samples, 7):
+        ring.write(chunk)
+
+    assert np.array_equal(ring.window(10), samples[-10:])
+    assert np.array_equal(ring.window(4, end_offset=3), samples[-7:-3])
+
+def test_centroid_follows_a_tone():
+    audio = AudioProcessor(buffer_size=1024)
+    audio.start_stream()
+
+    feed_frames(audio, tone(1000, 0.5))
+    assert abs(audio.spectral_centroid - 1000) < 50
+
+    feed_frames(audio, tone(5000, 0.5))
+    assert abs(audio.spectral_centroid - 5000) < 100
+
+def test_chunk_size_doesnt_change_the_analysis():
+    samples = tone(440, 1.0) + tone(80, 1.0)
+
+    whole = AudioProcessor().start_stream()
+    feed_frames(whole, samples)
+
+    chunked = AudioProcessor().start_stream()
+    for chunk in np.array_split(samples, 97):
+        chunked.feed(chunk)
+
+    assert whole.hops == chunked.hops == len(samples) // 1024 - 1
+    assert np.isclose(whole.spectral_centroid, chunked.spectral_centroid)
+    assert whole.frequency_bands == chunked.frequency_bands
+
+def test_bass_hits_rise_above_their_average():
+    audio = AudioProcessor()
+    audio.audio_data = np.concatenate([tone(60, 2.0, 0.02), tone(60, 0.2, 0.8)]) + tone(2000, 2.2, 0.1)
+
+    for frame_index in range(int(2.2 * 30)):
+        audio.advance_to(frame_index / 30)
+
+    assert audio.frequency_bands["bass"] > 2.0
+    assert audio.skipped_hops == 0
+
+def test_a_stall_only_analyzes_the_latest_hops():
+    audio = AudioProcessor().start_stream(max_hops=4)
+
+    assert audio.feed(tone(440, 2.0)) == 4
+    assert audio.skipped_hops == len(tone(440, 2.0)) // 1024 - 4
+
+def test_feature_track_has_a_row_per_video_frame():
+    audio = np.concatenate([tone(440, 1.0, 0.2), tone(440, 1.0, 0.2) + tone(80, 1.0, 0.8)])
+    track = feature_track(audio, SAMPLE_RATE, 30)
+
+    assert track.shape == (60, len(TRACK_FEATURES))
+    assert track.dtype == np.float32
+
+    # steady tone around its own average, onsets peak where the kick comes in
+    assert np.allclose(track[5:20, TRACK_FEATURES.index("mid")], 1.0, atol=0.05)
+    assert abs(np.argmax(track[:, TRACK_FEATURES.index("onset")]) - 30) <= 1
+    assert track[35, TRACK_FEATURES.index("bass")] > track[25, TRACK_FEATURES.index("bass")]
+
+def test_feature_track_sidecar_is_reused(tmp_path, monkeypatch):
+    from scipy.io import wavfile
+
+    audio = AudioProcessor()
+    extractions = []
+
+    def dump_tempfile(video_path):
+        extractions.append(video_path)
+        path = str(tmp_path / "audio.wav")
+        wavfile.write(path, SAMPLE_RATE, (tone(220, 1.0) * 32767).astype(np.int16))
+        return path
+
+    monkeypatch.setattr(audio, "audio_hash", lambda video_path: "0" * 64)
+    monkeypatch.setattr(audio, "dump_tempfile", dump_tempfile)
+
+    video_path = str(tmp_path / "clip.mp4")
+    first = audio.load_feature_track(video_path, 30)
+    second = audio.load_feature_track(video_path, 30)
+
+    assert first == second and os.path.dirname(first) == str(tmp_path)
+    assert len(extractions) == 1
+    assert isinstance(audio.feature_track, np.memmap)
+
+    # other parameters get their own sidecar
+    assert audio.load_feature_track(video_path, 25) != first
+    assert len(extractions) == 2
+
+    assert audio.seek_frame(1000)
+    assert audio.spectral_centroid == audio.feature_track[-1, TRACK_FEATURES.index("centroid")]
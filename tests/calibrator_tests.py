@@ -0,0 +1,41 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.calibrator import Calibrator
+
+def test_running_threshold_matches_full_history_mean():
+    calibrator = Calibrator(window_size=16)
+    complexities = np.random.default_rng(0).uniform(2, 6, 500)
+    threshold = None
+
+    for i, complexity in enumerate(complexities):
+        count = i + 1
+        if count > 10 and count % 10 == 0 or threshold is None:
+            threshold = np.mean(complexities[:count])
+
+        calibrator.add(complexity)
+        assert np.isclose(calibrator.threshold, threshold)
+
+def test_memory_stays_bounded():
+    calibrator = Calibrator(mode='window', window_size=8)
+
+    for complexity in range(1000):
+        calibrator.add(float(complexity))
+
+    assert calibrator.history.shape == (8,)
+    assert calibrator.latest == 999
+    assert np.array_equal(calibrator.recent(), np.arange(992, 1000))
+    assert np.isclose(calibrator.mean(), np.mean(np.arange(992, 1000)))
+
+def test_ema_follows_level_change():
+    calibrator = Calibrator(mode='ema', ema_alpha=0.5)
+
+    for _ in range(50):
+        calibrator.add(1.0)
+    for _ in range(50):
+        calibrator.add(3.0)
+
+    assert np.isclose(calibrator.mean(), 3.0)
@@ -0,0 +1,64 @@
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.capture_processor import FrameGrabber
+
+class FakeCapture:
+
+    def __init__(self, count, delay=0.0):
+        self.count = count
+        self.delay = delay
+        self.position = 0
+
+    def read(self):
+        if self.position >= self.count:
+            return False, None
+
+        time.sleep(self.delay)
+        frame = np.full((4, 4, 3), self.position, dtype=np.uint8)
+        self.position += 1
+        return True, frame
+
+    def get(self, prop):
+        return self.position
+
+    def set(self, prop, value):
+        self.position = value
+
+def read_all(grabber):
+    values = []
+    while True:
+        ret, frame, _ = grabber.read()
+        if not ret:
+            return values
+        values.append(int(frame[0, 0, 0]))
+
+def test_queue_mode_keeps_every_frame_in_order():
+    grabber = FrameGrabber(FakeCapture(50), mode='queue', queue_size=2).start()
+    values = read_all(grabber)
+    grabber.stop()
+
+    assert values == list(range(50))
+    assert grabber.dropped_frames == 0
+
+def test_latest_mode_drops_stale_frames():
+    grabber = FrameGrabber(FakeCapture(40, delay=0.001), mode='latest').start()
+
+    values = []
+    while True:
+        ret, frame, _ = grabber.read()
+        if not ret:
+            break
+        values.append(int(frame[0, 0, 0]))
+        time.sleep(0.01)
+
+    grabber.stop()
+
+    assert values == sorted(values)
+    assert values[-1] == 39
+    assert grabber.dropped_frames == 40 - len(values)
+    assert grabber.dropped_frames > 0
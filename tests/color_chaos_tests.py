@@ -0,0 +1,64 @@
+import cv2 as cv
+import numpy as np
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.color_chaos import ColorChaos
+
+def reference_channel_shifting(frame):
+    b, g, r = cv.split(frame.copy())
+    h, w = r.shape
+
+    for i in range(h):
+        shift = 1024 + int(np.sin(i * 0.03) * 2)
+        r[i] = np.roll(r[i], shift)
+
+        if i % 3 == 0:
+            b[i] = np.roll(b[i], -3)
+
+    return cv.merge([b, g, r])
+
+def reference_lcd_shift(frame, shift_amount):
+    result_frame = frame.copy()
+    result_frame[:] = result_frame * shift_amount
+    return np.roll(result_frame, shift_amount, axis=1)
+
+def test_channel_shifting_is_bit_identical():
+    color_chaos = ColorChaos()
+    rng = np.random.default_rng(0)
+
+    for h, w in [(480, 640), (721, 1283)]:
+        frame = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+        assert np.array_equal(color_chaos.channel_shifting(frame), reference_channel_shifting(frame))
+
+def test_lcd_shifts_match_wrapping_float_math(monkeypatch):
+    color_chaos = ColorChaos()
+    color_chaos.start_time = 0.0
+    frame = np.random.default_rng(1).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+
+    for now in [0.3, 1.2, 2.0, 4.0, 5.5]:
+        monkeypatch.setattr(time, "time", lambda: now)
+
+        sine_amount = 3 + 8 * np.sin(now)
+        if sine_amount < 0:
+            sine_amount = 5 + 12 * np.sin(now)
+
+        tan_amount = 3 + 8 * np.tan(now)
+        if tan_amount < 0:
+            tan_amount = 5 + 12 * np.tan(now)
+
+        assert np.array_equal(color_chaos.lcd_sine_shift(frame), reference_lcd_shift(frame, sine_amount))
+        assert np.array_equal(color_chaos.lcd_tan_shift(frame), reference_lcd_shift(frame, tan_amount))
+
+def test_lcd_shift_keeps_input_untouched():
+    color_chaos = ColorChaos()
+    frame = np.full((10, 20, 3), 100, dtype=np.uint8)
+    original = frame.copy()
+
+    result = color_chaos.lcd_sine_shift(frame)
+
+    assert result.dtype == np.uint8
+    assert np.array_equal(frame, original)
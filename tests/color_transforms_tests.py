@@ -0,0 +1,131 @@
+import cv2 as cv
+import numpy as np
+import random
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.color_chaos import ColorChaos
+from modules.grunge import Grunge
+from utils.color_transforms import colorTables, bleach_washout_lut, saturation_boost_lut, warm_tint_lut, night_vision_lut, equalize_lut
+
+def reference_hue_shift(frame, shift_amount):
+    hsv = cv.cvtColor(frame.copy(), cv.COLOR_BGR2HSV)
+    hsv[:, :, 0] = ((hsv[:, :, 0].astype(np.int32) * shift_amount) % 180).astype(np.uint8)
+    return cv.cvtColor(hsv, cv.COLOR_HSV2BGR)
+
+def reference_color_blast(frame, intensity, color):
+    return (frame.astype(np.float32) * (1 - intensity) + color * intensity).astype(np.uint8)
+
+def reference_washed_emo_layers(frame):
+    b, g, r = cv.split(frame)
+
+    r = np.clip(r.astype(np.float32) * 0.7, 0, 255)
+
+    b = cv.GaussianBlur(b, (5, 5), 0)
+    b_noise = np.random.normal(0, 15, b.shape).astype(np.float32)
+    b = np.clip(b.astype(np.float32) * 0.9 + b_noise, 0, 255)
+
+    g = np.clip(g.astype(np.float32) * 0.7, 0, 255)
+
+    frame = cv.merge([b.astype(np.uint8), g.astype(np.uint8), r.astype(np.uint8)])
+    return cv.convertScaleAbs(frame, alpha=1.1, beta=10)
+
+def reference_burnify(frame, time_elapsed):
+    low = np.clip(5 * np.sin(time_elapsed * 0.05), 0, 100)
+    high = np.clip(5 * np.cos(time_elapsed * 0.05), 155, 255)
+    return np.where(frame < 128, low, high).astype(np.uint8)
+
+def reference_warm_tint(frame):
+    warm_tint = np.array([0.6, 0.8, 1.0])
+    result = frame.astype(np.float32)
+    result[:,:,0] *= warm_tint[0]
+    result[:,:,1] *= warm_tint[1]
+    result[:,:,2] *= warm_tint[2]
+    return np.clip(result, 0, 255).astype(np.uint8)
+
+def reference_night_vision_channels(gray):
+    night_vision = cv.cvtColor(gray, cv.COLOR_GRAY2BGR)
+    night_vision[:, :, 0] = (night_vision[:, :, 0] * 0.2).astype(np.uint8)
+    night_vision[:, :, 1] = (night_vision[:, :, 1] * 0.8).astype(np.uint8)
+    night_vision[:, :, 2] = 0
+    return night_vision
+
+def random_frame(seed, shape=(120, 160, 3)):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+def test_color_chaos_tables_match_float_math(monkeypatch):
+    color_chaos = ColorChaos()
+    color_chaos.start_time = 0.0
+    frame = random_frame(0)
+
+    for now in [0.0, 0.7, 2.1, 4.4, 9.0]:
+        monkeypatch.setattr(time, "time", lambda: now)
+        shift_amount = int(np.sin(now * 0.5) * 30)
+        assert np.array_equal(color_chaos.hue_shift(frame), reference_hue_shift(frame, shift_amount))
+
+    color_chaos.threshold = 2.0
+    for complexity in [0.5, 3.0, 7.2]:
+        random.seed(3)
+        blasted = color_chaos.color_blast(frame, complexity)
+
+        random.seed(3)
+        color = np.array([random.randint(0, 255) for _ in range(3)], dtype=np.uint8)
+        intensity = min(0.3, complexity / (color_chaos.threshold * 8))
+        assert np.array_equal(blasted, reference_color_blast(frame, intensity, color))
+
+    random.seed(5)
+    swapped = color_chaos.channel_swap(frame)
+    random.seed(5)
+    channels = list(cv.split(frame))
+    random.shuffle(channels)
+    assert np.array_equal(swapped, cv.merge(channels))
+
+def test_grunge_tables_match_float_math(monkeypatch):
+    grunge = Grunge()
+    grunge.start_time = 0.0
+    frame = random_frame(1)
+
+    # blue gets film grain, green and red are pure tables
+    washed = grunge.washed_emo_layers(frame)
+    assert np.array_equal(washed[..., 1:], reference_washed_emo_layers(frame)[..., 1:])
+
+    # bleach washout folded into the washed layers table
+    bleached = cv.cvtColor(grunge._bleach_contrast(cv.cvtColor(frame, cv.COLOR_BGR2LAB)), cv.COLOR_LAB2BGR)
+    np.random.seed(7)
+    fused = grunge.washed_emo_layers(bleached, pre_lut=bleach_washout_lut)
+    np.random.seed(7)
+    chained = grunge.washed_emo_layers(cv.addWeighted(bleached, 0.8, np.full_like(bleached, 25), 0.2, 0))
+    assert np.array_equal(fused, chained)
+
+    for now in [0.0, 10.0, 31.4, 77.0]:
+        monkeypatch.setattr(time, "time", lambda: now)
+        assert np.array_equal(grunge.burnify(frame), reference_burnify(frame, now))
+
+    assert np.array_equal(cv.LUT(frame, colorTables.get(warm_tint_lut)), reference_warm_tint(frame))
+
+    hsv = frame.copy()
+    hsv[:, :, 1] = np.clip(hsv[:, :, 1] * 1.3, 0, 255)
+    assert np.array_equal(cv.LUT(frame, colorTables.get(saturation_boost_lut, 1.3)), hsv)
+
+def test_night_vision_channel_table():
+    gray = random_frame(2, (120, 160))
+    night_vision = cv.LUT(cv.cvtColor(gray, cv.COLOR_GRAY2BGR), colorTables.get(night_vision_lut))
+    assert np.array_equal(night_vision, reference_night_vision_channels(gray))
+
+def test_equalize_table_matches_equalize_hist():
+    rng = np.random.default_rng(4)
+    frames = [
+        rng.integers(0, 256, (120, 160, 3), dtype=np.uint8),
+        rng.integers(40, 90, (97, 131, 3), dtype=np.uint8),
+        np.full((32, 48, 3), 77, dtype=np.uint8),
+    ]
+
+    for frame in frames:
+        for channel in range(3):
+            expected = frame.copy()
+            expected[:, :, channel] = cv.equalizeHist(np.ascontiguousarray(frame[:, :, channel]))
+
+            assert np.array_equal(cv.LUT(frame, equalize_lut(frame, channel)), expected)
@@ -0,0 +1,141 @@
+import cv2 as cv
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.colorspace import ColorFrame, ConversionProfile, colorspace, staged, floating, lookup, quantize, chain_stages, run_chain
+
+class Stages:
+
+    @colorspace('HSV')
+    def _desaturate(self, hsv):
+        hsv[:, :, 1] //= 2
+        return hsv
+
+    @colorspace('HSV')
+    def _darken(self, hsv):
+        hsv[:, :, 2] //= 2
+        return hsv
+
+    @staged('_desaturate')
+    def desaturate(self, frame):
+        """"""
+
+    @staged('_darken')
+    def darken(self, frame):
+        """"""
+
+def test_consecutive_hsv_effects_share_one_round_trip():
+    stages = Stages()
+    frame = np.random.default_rng(0).integers(0, 256, (32, 48, 3), dtype=np.uint8)
+
+    profile = ConversionProfile()
+    result = run_chain(frame, [stages.desaturate, stages.darken], profile=profile)
+
+    assert profile.conversions == 2
+
+    hsv = cv.cvtColor(frame, cv.COLOR_BGR2HSV)
+    hsv[:, :, 1] //= 2
+    hsv[:, :, 2] //= 2
+    assert np.array_equal(result, cv.cvtColor(hsv, cv.COLOR_HSV2BGR))
+
+def test_staged_effect_alone_round_trips_to_bgr():
+    stages = Stages()
+    frame = np.random.default_rng(1).integers(0, 256, (32, 48, 3), dtype=np.uint8)
+
+    hsv = cv.cvtColor(frame, cv.COLOR_BGR2HSV)
+    hsv[:, :, 1] //= 2
+    assert np.array_equal(stages.desaturate(frame), cv.cvtColor(hsv, cv.COLOR_HSV2BGR))
+
+def test_missing_pairs_go_through_bgr():
+    profile = ConversionProfile()
+    colorFrame = ColorFrame(np.zeros((4, 4, 3), dtype=np.uint8), 'HSV', profile)
+
+    colorFrame.to('LAB')
+
+    assert colorFrame.space == 'LAB'
+    assert profile.pairs[('HSV', 'BGR')] == 1
+    assert profile.pairs[('BGR', 'LAB')] == 1
+
+class FloatStages:
+
+    @floating
+    def brighten(self, frame):
+        if frame.dtype != np.float32:
+            return quantize(self.brighten(frame.astype(np.float32)))
+
+        frame *= 1.5
+        return frame
+
+    @floating
+    def darken(self, frame):
+        if frame.dtype != np.float32:
+            return quantize(self.darken(frame.astype(np.float32)))
+
+        frame *= 0.5
+        return frame
+
+def test_float_pipeline_quantizes_once():
+    stages = FloatStages()
+    frame = np.random.default_rng(2).integers(0, 256, (32, 48, 3), dtype=np.uint8)
+
+    profile = ConversionProfile()
+    result = run_chain(frame, [stages.brighten, stages.darken], profile=profile, keep_float=True)
+
+    assert profile.pairs == {('uint8', 'float32'): 1, ('float32', 'uint8'): 1}
+
+    # no saturation between the stages, bright pixels come back instead of staying clipped
+    assert result.dtype == np.uint8
+    assert np.array_equal(result, (frame.astype(np.float32) * 1.5 * 0.5).astype(np.uint8))
+
+def test_floating_stages_stay_uint8_without_float_pipeline():
+    stages = FloatStages()
+    frame = np.random.default_rng(3).integers(0, 256, (32, 48, 3), dtype=np.uint8)
+
+    profile = ConversionProfile()
+    result = run_chain(frame, [stages.brighten, stages.darken], profile=profile)
+
+    assert profile.conversions == 0
+    assert np.array_equal(result, stages.darken(stages.brighten(frame.copy())))
+
+class Lookups:
+
+    def __init__(self):
+        self.tables = []
+
+    @lookup
+    def invert(self):
+        self.tables.append('invert')
+        return (255 - np.arange(256)).astype(np.uint8)
+
+    @lookup
+    def halve(self):
+        self.tables.append('halve')
+        return (np.arange(256) // 2).astype(np.uint8)
+
+    @colorspace('HSV')
+    @lookup
+    def hsv_halve(self):
+        return (np.arange(256) // 2).astype(np.uint8)
+
+def test_consecutive_lookups_run_as_one_table():
+    lookups = Lookups()
+    frame = np.random.default_rng(5).integers(0, 256, (32, 48, 3), dtype=np.uint8)
+
+    stages = chain_stages([lookups.invert, lookups.halve, lookups.hsv_halve])
+
+    assert [stage.__name__ for stage in stages] == ["invert+halve", "hsv_halve"]
+    assert np.array_equal(run_chain(frame, [lookups.invert, lookups.halve]), (255 - frame) // 2)
+
+    # tables are asked for every frame, in chain order
+    assert lookups.tables == ['invert', 'halve']
+
+def test_lookup_stage_alone_is_a_plain_lut():
+    lookups = Lookups()
+    frame = np.random.default_rng(6).integers(0, 256, (32, 48, 3), dtype=np.uint8)
+
+    dst = np.empty_like(frame)
+    assert lookups.halve(frame, dst=dst) is dst
+    assert np.array_equal(dst, frame // 2)
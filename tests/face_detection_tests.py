@@ -0,0 +1,59 @@
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.face_detection import FaceDetector
+
+class RecordingCascade:
+
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.calls = []
+
+    def detectMultiScale(self, image, scale_factor, min_neighbors, minSize):
+        self.calls.append((image.shape, minSize))
+        return np.array(self.boxes, dtype=np.int32).reshape(-1, 4)
+
+def test_faces_are_found_downscaled_and_mapped_back():
+    detector = FaceDetector(scale=0.5, min_face=0.1)
+    detector.face_cascade = RecordingCascade([(10, 20, 30, 30)])
+
+    faces = detector.detect_face(np.zeros((480, 640, 3), dtype=np.uint8))
+
+    assert detector.face_cascade.calls == [((240, 320), (24, 24))]
+    assert faces.tolist() == [[20, 40, 60, 60]]
+
+def test_eyes_are_searched_inside_faces_only():
+    detector = FaceDetector(roi_width=160)
+    detector.eye_cascade = RecordingCascade([(5, 10, 20, 20)])
+
+    faces = np.array([[100, 50, 80, 80], [300, 200, 320, 320]])
+    eyes = detector.detect_eyes(np.zeros((720, 1280, 3), dtype=np.uint8), faces)
+
+    shapes = [shape for shape, _ in detector.eye_cascade.calls]
+    assert shapes == [(48, 80), (96, 160)]
+
+    # the second face is searched at half size, so its boxes are doubled
+    assert eyes.tolist() == [[105, 60, 20, 20], [310, 220, 40, 40]]
+
+def test_no_faces_means_no_eye_search():
+    detector = FaceDetector()
+    detector.eye_cascade = RecordingCascade([(0, 0, 10, 10)])
+
+    eyes = detector.detect_eyes(np.zeros((120, 160, 3), dtype=np.uint8), np.empty((0, 4), dtype=np.int32))
+
+    assert len(eyes) == 0
+    assert detector.eye_cascade.calls == []
+
+def test_copy_keeps_settings_but_not_cascades():
+    detector = FaceDetector(scale=0.25, equalize=False, min_face=0.2, roi_width=96)
+    detector.face_cascade = RecordingCascade([])
+
+    copy = detector.copy()
+    copy.face_cascade = RecordingCascade([(10, 20, 30, 30)])
+
+    assert (copy.scale, copy.equalize, copy.min_face, copy.roi_width) == (0.25, False, 0.2, 96)
+    assert copy.face_cascade is not detector.face_cascade
+    assert len(detector.detect_face(np.zeros((480, 640, 3), dtype=np.uint8))) == 0
@@ -0,0 +1,97 @@
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.face_tracker import FaceTracker, AsyncFaceTracker
+
+class FakeDetector:
+
+    def __init__(self, box, delay=0.0):
+        self.box = box
+        self.delay = delay
+        self.calls = 0
+
+    def detect(self, frame):
+        time.sleep(self.delay)
+        self.calls += 1
+        return [self.box], []
+
+def textured_frame(x, y, background=40):
+    frame = np.full((120, 160, 3), background, dtype=np.uint8)
+    patch = np.random.default_rng(3).integers(0, 255, (30, 30, 3), dtype=np.uint8)
+    frame[y:y+30, x:x+30] = patch
+    return frame
+
+def test_detector_runs_once_per_interval():
+    detector = FakeDetector((40, 40, 30, 30))
+    tracker = FaceTracker(detector, detect_interval=5)
+
+    for index in range(10):
+        tracker.update(textured_frame(40, 40), index)
+
+    assert detector.calls == 2
+
+def test_same_frame_index_shares_detections():
+    detector = FakeDetector((40, 40, 30, 30))
+    tracker = FaceTracker(detector)
+
+    first = tracker.update(textured_frame(40, 40), 0)
+    second = tracker.update(textured_frame(40, 40), 0)
+
+    assert first is second
+    assert detector.calls == 1
+
+def test_boxes_follow_motion_between_detections():
+    detector = FakeDetector((40, 40, 30, 30))
+    tracker = FaceTracker(detector, detect_interval=100)
+
+    for step in range(6):
+        detections = tracker.update(textured_frame(40 + 2 * step, 40 + step), step)
+
+    x, y = detections.faces[0][:2]
+    assert detector.calls == 1
+    assert abs(x - 50) <= 1 and abs(y - 45) <= 1
+
+def test_scene_change_forces_detection():
+    detector = FakeDetector((40, 40, 30, 30))
+    tracker = FaceTracker(detector, detect_interval=100)
+
+    tracker.update(textured_frame(40, 40), 0)
+    tracker.update(textured_frame(40, 40), 1)
+    detections = tracker.update(textured_frame(40, 40, background=200), 2)
+
+    assert detections.detected
+    assert detector.calls == 2
+
+def test_async_update_does_not_wait_for_the_detector():
+    detector = FakeDetector((40, 40, 30, 30), delay=0.2)
+    tracker = AsyncFaceTracker(detector)
+
+    try:
+        start = time.perf_counter()
+        detections = tracker.update(textured_frame(40, 40), 0)
+
+        assert time.perf_counter() - start < 0.1
+        assert len(detections.faces) == 0
+    finally:
+        tracker.stop()
+
+def test_async_boxes_are_motion_compensated():
+    detector = FakeDetector((40, 40, 30, 30), delay=0.05)
+    tracker = AsyncFaceTracker(detector)
+
+    try:
+        tracker.update(textured_frame(40, 40), 0)
+        time.sleep(0.2)
+
+        # the worker found the box on frame 0, the patch has moved since
+        detections = tracker.update(textured_frame(44, 42), 1)
+    finally:
+        tracker.stop()
+
+    assert detections.detected
+    x, y = detections.faces[0][:2]
+    assert abs(x - 44) <= 1 and abs(y - 42) <= 1
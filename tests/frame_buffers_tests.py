@@ -0,0 +1,103 @@
+import sys
+import os
+import types
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.frame_buffers import FramePool, AllocationCounter
+from modules.module_manager import ModuleManager
+
+def noisy_frame(seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+
+def test_spare_never_aliases_the_pixels():
+    pool = FramePool()
+    frame = noisy_frame()
+
+    first = pool.spare(frame)
+    second = pool.spare(first)
+
+    assert first.shape == frame.shape and first.dtype == frame.dtype
+    assert not np.shares_memory(first, second)
+    assert pool.spare(second) is first
+
+    assert pool.owns(first) and pool.owns(second[1:])
+    assert not pool.owns(frame)
+
+def test_pool_keeps_the_most_recent_shapes():
+    pool = FramePool(max_entries=2)
+
+    for width in [8, 16, 32]:
+        pool.pair((4, width, 3))
+
+    assert len(pool.buffers) == 2
+    assert ((4, 8, 3), np.dtype(np.uint8).str) not in pool.buffers
+
+def process_effects(moduleManager, frame, effects, pooled=False):
+    return moduleManager.process_frame(frame, moduleManager.analyze_frame(frame),
+                                       types.SimpleNamespace(effects=effects, frame_pool=pooled))
+
+def test_pooled_chain_matches_the_allocating_one():
+    effects = ["kaleidoscope", "channel_shifting", "vhs_barrel_distortion", "vhs_gritty"]
+    frame = noisy_frame()
+
+    pooled = ModuleManager()
+    allocating = ModuleManager()
+
+    for moduleManager in (pooled, allocating):
+        moduleManager.set_modules(["ColorChaos", "VHS"])
+
+    expected = process_effects(allocating, frame, effects)
+    result = process_effects(pooled, frame, effects, pooled=True)
+
+    assert np.array_equal(result, expected)
+    assert not pooled.frame_pool.owns(result)
+    assert not np.shares_memory(result, frame)
+
+    # without --frame-pool the chain allocates as it always did
+    assert not allocating.frame_pool.buffers
+
+def test_conversions_between_stages_stay_in_the_pool():
+    effects = ["grunge_bleach_bypass", "emo_bloom_effect", "burnify"]
+    frame = np.random.default_rng(1).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+
+    pooled = ModuleManager()
+    allocating = ModuleManager()
+
+    for moduleManager in (pooled, allocating):
+        moduleManager.set_modules(["Grunge"])
+        moduleManager.use_frame_clock(30)
+
+    expected = process_effects(allocating, frame.copy(), effects)
+    process_effects(pooled, frame.copy(), effects, pooled=True)
+
+    allocations = pooled.count_allocations()
+    try:
+        result = process_effects(pooled, frame.copy(), effects, pooled=True)
+    finally:
+        allocations.stop()
+
+    assert np.array_equal(result, expected)
+
+    # LAB, BGR and HSV round trips all land in pool buffers, only the blur's small levels and the output allocate
+    *stages, (last_stage, _) = allocations.stats().items()
+    assert last_stage == "Grunge.burnify"
+
+    for stage_name, allocated in stages:
+        if stage_name != "Grunge._emo_bloom":
+            assert allocated < 0.05 * frame.nbytes, stage_name
+
+def test_allocation_counter_sees_a_frame_allocation():
+    counter = AllocationCounter().start()
+
+    try:
+        baseline = counter.begin_stage()
+        frame = np.ones((100, 100, 3), dtype=np.uint8)
+        counter.end_stage("ones", baseline)
+        counter.end_frame()
+    finally:
+        counter.stop()
+
+    assert counter.per_frame() >= frame.nbytes
+    assert counter.stats()["ones"] == counter.per_frame()
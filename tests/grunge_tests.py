@@ -0,0 +1,91 @@
+import cv2 as cv
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.grunge import Grunge
+from utils.filters import pyramid_blur
+from utils.warp_maps import warpMaps
+
+def natural_frame(h, w, seed=0):
+    """
+    Smooth color blobs with fine texture and hard edged shapes, closer to video than uniform noise.
+    """
+
+    rng = np.random.default_rng(seed)
+    frame = cv.resize(rng.integers(0, 256, (h // 32, w // 32, 3), dtype=np.uint8), (w, h), interpolation=cv.INTER_CUBIC)
+    frame = cv.add(frame, rng.integers(0, 40, frame.shape, dtype=np.uint8))
+
+    cv.circle(frame, (w // 2, h // 2), h // 5, (255, 255, 255), -1)
+    cv.rectangle(frame, (w // 10, h // 10), (w // 4, h // 3), (0, 0, 0), -1)
+
+    return frame
+
+def reference_dreamify_without_noise(frame, intensity):
+    h, w = frame.shape[:2]
+
+    warm_tint = np.array([0.6, 0.8, 1.0])
+    result = frame.astype(np.float32)
+    for i in range(3):
+        result[:,:,i] *= warm_tint[i]
+    result = np.clip(result, 0, 255).astype(np.uint8)
+
+    result = cv.GaussianBlur(result, (intensity, intensity), 3)
+
+    X, Y = np.ogrid[:h, :w]
+    center_x, center_y = h/2, w/2
+    radius = np.sqrt(center_x**2 + center_y**2)
+    dist = np.sqrt((X - center_x)**2 + (Y - center_y)**2)
+    vignette = np.clip(0.6 + 0.4 * (1 - (dist / radius)**2), 0.4, 1)
+
+    for i in range(3):
+        result[:,:,i] = (result[:,:,i] * vignette).astype(np.uint8)
+
+    return result
+
+def test_pyramid_bloom_matches_full_resolution_blur():
+    for h, w in [(480, 640), (1080, 1920)]:
+        frame = natural_frame(h, w)
+        difference = np.abs(pyramid_blur(frame, 35).astype(int) - cv.GaussianBlur(frame, (35, 35), 0).astype(int))
+
+        assert difference.mean() < 0.5
+        assert np.percentile(difference, 99) <= 2
+
+def test_emo_bloom_keeps_its_look():
+    grunge = Grunge()
+    frame = natural_frame(720, 1280)
+
+    bloom = cv.addWeighted(frame, 0.7, cv.GaussianBlur(frame, (35, 35), 0), 0.4, 0)
+    hsv = cv.cvtColor(bloom, cv.COLOR_BGR2HSV)
+    hsv[:, :, 1] = np.clip(hsv[:, :, 1] * 1.3, 0, 255)
+    reference = cv.cvtColor(hsv, cv.COLOR_HSV2BGR)
+
+    difference = np.abs(grunge.emo_bloom_effect(frame).astype(int) - reference.astype(int))
+    assert difference.mean() < 1.0
+
+def test_dreamify_grain_and_vignette_stay_in_tolerance():
+    grunge = Grunge()
+    frame = natural_frame(720, 1280)
+
+    for intensity in [3, 7]:
+        np.random.seed(intensity)
+        grain = grunge.dreamify(frame, intensity).astype(np.float32) - reference_dreamify_without_noise(frame, intensity)
+
+        # away from the saturated ends the grain is zero mean noise of std intensity
+        assert abs(grain.mean()) < 0.5
+        assert abs(grain.std() - intensity) < 0.15 * intensity
+
+def test_dreamify_grain_follows_the_seed():
+    grunge = Grunge()
+    frame = natural_frame(240, 320)
+
+    renders = []
+    for _ in range(2):
+        # a fresh process builds its own grain field
+        warpMaps.clear()
+        np.random.seed(11)
+        renders.append(grunge.dreamify(frame, 5))
+
+    assert np.array_equal(renders[0], renders[1])
@@ -0,0 +1,123 @@
+import sys
+import os
+import types
+import random
+import numpy as np
+import cv2 as cv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.module_manager import ModuleManager
+
+def noisy_frame(seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+
+def test_every_module_of_the_chain_runs_in_order():
+    moduleManager = ModuleManager()
+    assert moduleManager.set_modules(["VHS", "Grunge"])
+
+    calls = []
+    for name in ["VHS", "Grunge"]:
+        module = moduleManager.get_module(name)
+        module.process_current_frame = lambda frame, complexity, name=name: calls.append((name, frame)) or frame + 1
+
+    frame = noisy_frame()
+    result = moduleManager.process_frame(frame, moduleManager.analyze_frame(frame), types.SimpleNamespace(effects=None))
+
+    assert [name for name, _ in calls] == ["VHS", "Grunge"]
+
+    # no copy at the boundaries, the first stage gets the caller's frame
+    assert calls[0][1] is frame
+    assert np.array_equal(result, frame + 2)
+    assert list(moduleManager.stage_stats()) == ["VHS", "Grunge"]
+
+def test_analysis_is_shared_by_the_chain():
+    moduleManager = ModuleManager()
+    moduleManager.set_modules(["VHS", "ColorChaos", "VHS"])
+
+    frame = noisy_frame()
+    analysis = moduleManager.analyze_frame(frame)
+    moduleManager.add_frame(frame, analysis)
+
+    assert moduleManager.get_module("VHS").analysis is analysis
+    assert moduleManager.get_module("ColorChaos").analysis is analysis
+    assert moduleManager.get_module("VHS").frame_count == 1
+
+def test_effects_are_taken_from_the_module_registering_them():
+    moduleManager = ModuleManager()
+    moduleManager.set_modules(["VHS", "Grunge"])
+
+    stages = moduleManager.resolve_chain(["grunge_bleach_bypass", "vhs_scan_lines"])
+
+    assert [name for name, _ in stages] == ["Grunge._bleach_contrast", "Grunge._bleach_washout", "VHS.vhs_scan_lines"]
+
+def test_lookup_stages_fuse_across_effects():
+    moduleManager = ModuleManager()
+    moduleManager.set_modules(["Grunge"])
+    grunge = moduleManager.get_module("Grunge")
+    grunge.effect_time = lambda: 12.0
+
+    stages = moduleManager.resolve_chain(["grunge_bleach_bypass", "burnify"])
+    assert [name for name, _ in stages] == ["Grunge._bleach_contrast", "Grunge._bleach_washout+Grunge.burnify"]
+
+    frame = noisy_frame(3)
+    reference = grunge.burnify(grunge.grunge_bleach_bypass(frame.copy()))
+
+    moduleManager.toggled = True
+    result = moduleManager.process_frame(frame, moduleManager.analyze_frame(frame),
+                                         types.SimpleNamespace(effects=["grunge_bleach_bypass", "burnify"]))
+
+    assert np.array_equal(result, reference)
+
+def test_single_channel_lookup_fuses_with_a_following_color_lookup():
+    effects = ["burnify", "color_blast"]
+    frame = noisy_frame(4)
+
+    fused = ModuleManager()
+    separate = ModuleManager()
+    for moduleManager in (fused, separate):
+        moduleManager.set_modules(["Grunge", "ColorChaos"])
+        moduleManager.use_frame_clock(30)
+        moduleManager.add_frame(frame, moduleManager.analyze_frame(frame), 0)
+
+    stages = fused.resolve_chain(effects)
+    assert [name for name, _ in stages] == ["Grunge.burnify+ColorChaos.color_blast"]
+
+    random.seed(5)
+    burned = separate.get_module("Grunge").burnify(frame.copy())
+    reference = separate.get_module("ColorChaos").color_blast(burned)
+
+    random.seed(5)
+    result = fused.process_frame(frame.copy(), fused.analyze_frame(frame), types.SimpleNamespace(effects=effects))
+
+    assert np.array_equal(result, reference)
+
+def test_tracker_only_reuses_the_edges_of_the_analyzed_frame(monkeypatch):
+    moduleManager = ModuleManager()
+    moduleManager.set_modules(["VHS", "Tracker"])
+    tracker = moduleManager.get_module("Tracker")
+
+    frame = noisy_frame(5)
+    moduleManager.add_frame(frame, moduleManager.analyze_frame(frame))
+    warped = moduleManager.get_module("VHS").vhs_barrel_distortion(frame, 0.3)
+
+    random.seed(1)
+    result = tracker._complex_frame_effect(warped, 1.0)
+
+    # without an analysis the edges come from the frame the tracker got
+    analysis, tracker.analysis = tracker.analysis, None
+    random.seed(1)
+    assert np.array_equal(result, tracker._complex_frame_effect(warped, 1.0))
+
+    # the analyzed frame itself needs no Canny of its own
+    tracker.analysis = analysis
+    assert analysis.edges is not None
+    monkeypatch.setattr(cv, "Canny", None)
+    tracker._complex_frame_effect(frame, 1.0)
+
+def test_unknown_module_leaves_the_chain_unchanged():
+    moduleManager = ModuleManager()
+    moduleManager.set_modules(["VHS"])
+
+    assert not moduleManager.set_modules(["VHS", "Missing"])
+    assert moduleManager.module_chain == ["VHS"]
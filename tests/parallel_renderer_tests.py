@@ -0,0 +1,92 @@
+import sys
+import os
+import cv2 as cv
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.parallel_renderer import planSegments, renderSegment
+from modules.module_manager import ModuleManager
+
+def write_clip(path, frames=24, size=(64, 48)):
+    writer = cv.VideoWriter(path, cv.VideoWriter_fourcc(*'mp4v'), 30, size)
+    rng = np.random.default_rng(3)
+    for i in range(frames):
+        frame = rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+        cv.circle(frame, (8 + i * 2, 24), 10, (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+def read_frames(path):
+    capture = cv.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+def segment_job(video_path, output_path, start, end, seed=7):
+    return {
+        "index": 0,
+        "video_path": video_path,
+        "output_path": output_path,
+        "start": start,
+        "end": end,
+        "warmup": 4,
+        "fps": 30.0,
+        "modules": ["ColorChaos"],
+        "effects": None,
+        "float_pipeline": False,
+        "frame_pool": False,
+        "audio_track": None,
+        "seed": seed,
+        "analysis_options": None,
+        "render_options": {"fourcc": "mp4v", "backend": "opencv"},
+    }
+
+def test_segments_cover_every_frame_once():
+    assert planSegments(95, 30) == [(0, 30), (30, 60), (60, 90), (90, 95)]
+    assert planSegments(60, 30) == [(0, 30), (30, 60)]
+    assert planSegments(10, 30) == [(0, 10)]
+    assert planSegments(0, 30) == []
+
+def test_same_seed_renders_the_same_segment(tmp_path):
+    video_path = str(tmp_path / "clip.mp4")
+    write_clip(video_path)
+
+    renders = []
+    for name in ("first.mp4", "second.mp4"):
+        _, output_path, written = renderSegment(segment_job(video_path, str(tmp_path / name), 8, 20))
+        assert written == 12
+        renders.append(read_frames(output_path))
+
+    assert len(renders[0]) == len(renders[1]) == 12
+    for first, second in zip(*renders):
+        assert np.array_equal(first, second)
+
+def test_failed_segment_has_no_output(tmp_path):
+    video_path = str(tmp_path / "clip.mp4")
+    write_clip(video_path)
+
+    job = segment_job(video_path, str(tmp_path / "missing" / "segment.mp4"), 0, 12)
+    assert renderSegment(job) == (0, None, 0)
+
+def test_failing_frame_is_skipped_not_the_segment(tmp_path, monkeypatch):
+    video_path = str(tmp_path / "clip.mp4")
+    write_clip(video_path)
+
+    process_frame = ModuleManager.process_frame
+    def failing_on_the_third(self, frame, analysis, args):
+        if self.clock.frame_index == 2:
+            raise ValueError("broken frame")
+        return process_frame(self, frame, analysis, args)
+
+    monkeypatch.setattr(ModuleManager, "process_frame", failing_on_the_third)
+
+    _, output_path, written = renderSegment(segment_job(video_path, str(tmp_path / "skipped.mp4"), 0, 12))
+
+    assert written == 11
+    assert len(read_frames(output_path)) == 11
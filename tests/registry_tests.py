@@ -0,0 +1,61 @@
+import sys
+import os
+import types
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.registry import moduleRegistry, EffectInfo
+from modules.module_manager import ModuleManager
+
+def test_listing_does_not_instantiate_modules():
+    info = moduleRegistry.get("Grunge")
+    created = []
+
+    original = info.module_class.__init__
+    info.module_class.__init__ = lambda self: created.append(self)
+    try:
+        effects = moduleRegistry.get("Grunge").effects
+    finally:
+        info.module_class.__init__ = original
+
+    assert "dreamify" in effects
+    assert created == []
+
+def test_staged_effects_report_their_colorspaces():
+    info = moduleRegistry.effect_info("Grunge", "grunge_bleach_bypass")
+
+    assert info.colorspaces == ('LAB', 'BGR')
+    assert moduleRegistry.effect_info("VHS", "vhs_gritty").colorspaces == ('HSV', 'BGR')
+    assert moduleRegistry.effect_info("ColorChaos", "channel_swap").stateful is False
+
+def test_helpers_are_not_registered_as_effects():
+    effects = moduleRegistry.get("VHS").effects
+
+    assert "apply_vhs_complex" not in effects
+    assert "add_frame" not in effects
+    assert "_gritty_grade" not in effects
+
+def test_unknown_cost_class_is_rejected():
+    try:
+        EffectInfo("broken", "huge", False, "pixel")
+    except ValueError:
+        return
+
+    assert False, "expected a ValueError"
+
+def test_effect_chain_is_resolved_once():
+    moduleManager = ModuleManager()
+    moduleManager.set_module("VHS")
+
+    first = moduleManager.resolve_chain(["vhs_scan_lines", "vhs_gritty", "missing_effect"])
+    second = moduleManager.resolve_chain(["vhs_scan_lines", "vhs_gritty", "missing_effect"])
+
+    assert first is second
+    assert [name for name, _ in first] == ["VHS.vhs_scan_lines", "VHS._gritty_grade", "VHS._gritty_tint"]
+
+    frame = np.random.default_rng(0).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+    args = types.SimpleNamespace(effects=["vhs_scan_lines", "vhs_gritty", "missing_effect"])
+    result = moduleManager.process_frame(frame, moduleManager.analyze_frame(frame), args)
+
+    assert result.shape == frame.shape
@@ -0,0 +1,80 @@
+import sys
+import os
+import shutil
+import pytest
+import cv2 as cv
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.render_processor import RenderProcessor, FFmpegPipe
+
+def count_frames(path):
+    capture = cv.VideoCapture(path)
+    count = 0
+    while capture.read()[0]:
+        count += 1
+    capture.release()
+    return count
+
+def test_async_writer_flushes_every_frame(tmp_path):
+    output_path = str(tmp_path / "async.mp4")
+    renderProcessor = RenderProcessor(fourcc='mp4v', async_write=True, queue_size=2)
+
+    assert renderProcessor.open(output_path, 30, (64, 48))
+    for i in range(40):
+        renderProcessor.write(np.full((48, 64, 3), i * 6, dtype=np.uint8))
+
+    assert renderProcessor.close() == 40
+    assert count_frames(output_path) == 40
+
+    stats = renderProcessor.stats()
+    assert stats["frames"] == 40
+    assert stats["bottleneck"] in ("encoder", "processing")
+
+def test_async_writer_survives_an_empty_frame(tmp_path):
+    output_path = str(tmp_path / "empty_frame.mp4")
+    renderProcessor = RenderProcessor(fourcc='mp4v', async_write=True, queue_size=1)
+
+    assert renderProcessor.open(output_path, 30, (64, 48))
+    renderProcessor.write(None)
+    for i in range(5):
+        renderProcessor.write(np.zeros((48, 64, 3), dtype=np.uint8))
+
+    assert renderProcessor.close() == 5
+
+class FailingWriter:
+
+    def __init__(self):
+        self.calls = 0
+
+    def write(self, frame):
+        self.calls += 1
+        raise RuntimeError("ffmpeg exited with code 1")
+
+    def release(self):
+        pass
+
+def test_sync_writer_stops_after_an_encoder_failure():
+    renderProcessor = RenderProcessor()
+    renderProcessor.writer = writer = FailingWriter()
+
+    for i in range(3):
+        renderProcessor.write(np.zeros((48, 64, 3), dtype=np.uint8))
+
+    assert writer.calls == 1
+    assert isinstance(renderProcessor.encoder_error, RuntimeError)
+    assert renderProcessor.close() == 0
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="needs ffmpeg")
+def test_ffmpeg_exit_is_reported_on_write(tmp_path):
+    pipe = FFmpegPipe(str(tmp_path / "killed.mp4"), 30, (64, 48))
+
+    # an ffmpeg that died mid render
+    pipe.process.kill()
+    pipe.process.wait()
+
+    with pytest.raises(RuntimeError, match="ffmpeg exited with code"):
+        pipe.write(np.zeros((48, 64, 3), dtype=np.uint8))
+
+    pipe.release()
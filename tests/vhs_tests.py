@@ -0,0 +1,54 @@
+import cv2 as cv
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.vhs import VHS
+
+def reference_color_bleeding(frame):
+    b, g, r = cv.split(frame)
+    h, w = r.shape
+
+    for i in range(h):
+        shift = 8 + int(np.sin(i * 0.01) * 4)
+        r[i] = np.roll(r[i], shift)
+
+        if shift > 0:
+            r[i, :shift] = r[i, shift]
+
+        if i % 3 == 0:
+            shift_b = -6 + int(np.cos(i * 0.02) * 3)
+            b[i] = np.roll(b[i], shift_b)
+
+        if i % 4 == 0:
+            shift_g = 2 + int(np.sin(i * 0.01) * 2)
+            g[i] = np.roll(g[i], shift_g)
+
+    return cv.merge([b, g, r])
+
+def test_color_bleeding_is_bit_identical():
+    vhs = VHS()
+    rng = np.random.default_rng(0)
+
+    for h, w in [(480, 640), (721, 1283), (1080, 1920)]:
+        frame = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+        assert np.array_equal(vhs.vhs_color_bleeding(frame), reference_color_bleeding(frame))
+
+def reference_scan_lines(frame):
+    dark_lines = frame[::3, :] * 0.2
+    dark_lines[:, :, 0] = dark_lines[:, :, 0] * 1.5
+    frame[::3, :] = dark_lines
+    return frame
+
+def test_scan_lines_match_in_uint8_and_float32():
+    vhs = VHS()
+    frame = np.random.default_rng(1).integers(0, 256, (90, 160, 3), dtype=np.uint8)
+
+    expected = reference_scan_lines(frame.copy())
+    assert np.array_equal(vhs.vhs_scan_lines(frame.copy()), expected)
+
+    floats = vhs.vhs_scan_lines(frame.astype(np.float32))
+    assert floats.dtype == np.float32
+    assert np.abs(floats.astype(np.uint8).astype(int) - expected).max() <= 1
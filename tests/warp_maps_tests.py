@@ -0,0 +1,124 @@
+import cv2 as cv
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.vhs import VHS
+from modules.night_vision import NightVision
+from modules.chromatic_aberration import ChromaticAberration
+from modules.color_chaos import ColorChaos
+
+# OpenCV 4 runs a float map INTER_LINEAR remap on the same 1/32 pixel grid as the
+# cached fixed point maps, other versions may interpolate the float coordinates,
+# which can move a sample by up to one grid step: 255 / 32 levels on a full range edge
+SUBPIXEL_TOLERANCE = 0 if cv.__version__.startswith('4.') else 8
+
+SIZES = [(480, 640), (241, 333)]
+
+def noisy_frame(h, w, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+def assert_remap_matches(result, reference):
+    assert np.abs(result.astype(int) - reference.astype(int)).max() <= SUBPIXEL_TOLERANCE
+
+def reference_barrel(frame, intensity):
+    h, w = frame.shape[:2]
+    j, i = np.meshgrid(np.arange(w), np.arange(h))
+
+    x = ( j - w/2 ) / (w/2)
+    y = ( i - h/2 ) / (h/2)
+
+    r = np.sqrt(x*x + y*y)
+    distortion = 1.0 + intensity * r**2
+
+    map_x = (x * distortion * (w/2)) + w/2
+    map_y = (y * distortion * (h/2)) + h/2
+
+    return cv.remap(frame, map_x.astype(np.float32), map_y.astype(np.float32), cv.INTER_LINEAR)
+
+def reference_chromatic_aberration(frame, intensity):
+    h, w = frame.shape[:2]
+    j, i = np.meshgrid(np.arange(w), np.arange(h))
+    x = (j - w/2) / (w/2)
+    y = (i - h/2) / (h/2)
+
+    r = np.sqrt(x**2 + y**2)
+    safe_r = np.maximum(r, 0.001)
+    radial_x = x / safe_r
+    radial_y = y / safe_r
+
+    channels = []
+    for channel, strength in zip(cv.split(frame), (2.0, 0.3, -1.5)):
+        shift = intensity * strength * r**2
+
+        map_x = ((x + shift * radial_x) * (w/2)) + w/2
+        map_y = ((y + shift * radial_y) * (h/2)) + h/2
+
+        channels.append(cv.remap(channel, map_x.astype(np.float32), map_y.astype(np.float32), cv.INTER_LINEAR))
+
+    return cv.merge(channels)
+
+def reference_kaleidoscope(frame, num_segments):
+    h, w = frame.shape[:2]
+    center_x, center_y = w // 2, h // 2
+    radius = min(center_x, center_y)
+
+    y, x = np.ogrid[:h, :w]
+
+    dx = x - center_x
+    dy = y - center_y
+    r = np.sqrt(dx**2 + dy**2)
+    theta = np.arctan2(dy, dx) * 180 / np.pi
+    theta = (theta + 360) % 360
+
+    circle_mask = r <= radius
+
+    angle_step = 360.0 / num_segments
+    normalized_theta = theta % angle_step
+
+    source_theta = np.where(normalized_theta <= angle_step / 2, normalized_theta, angle_step - normalized_theta)
+    source_theta = source_theta + (theta // angle_step) * angle_step
+
+    source_theta_rad = source_theta * np.pi / 180
+    source_x = np.clip((r * np.cos(source_theta_rad) + center_x).astype(int), 0, w-1)
+    source_y = np.clip((r * np.sin(source_theta_rad) + center_y).astype(int), 0, h-1)
+
+    result = np.zeros_like(frame)
+    result[circle_mask] = frame[source_y[circle_mask], source_x[circle_mask]]
+
+    return result
+
+def test_barrel_distortion_matches_per_frame_maps():
+    vhs = VHS()
+    night_vision = NightVision()
+
+    for h, w in SIZES:
+        frame = noisy_frame(h, w)
+
+        for intensity in [0.1, 0.35]:
+            reference = reference_barrel(frame, intensity)
+
+            assert_remap_matches(vhs.vhs_barrel_distortion(frame, intensity), reference)
+            assert_remap_matches(night_vision.night_vision_barrel_distortion(frame, intensity), reference)
+
+def test_chromatic_aberration_matches_per_frame_maps():
+    chromatic_aberration = ChromaticAberration()
+
+    for h, w in SIZES:
+        frame = noisy_frame(h, w, 1)
+
+        for intensity in [0.05, 0.2]:
+            assert_remap_matches(chromatic_aberration._complex_frame_effect(frame, None, intensity),
+                                 reference_chromatic_aberration(frame, intensity))
+
+def test_kaleidoscope_is_identical_to_the_gather():
+    color_chaos = ColorChaos()
+
+    for h, w in SIZES:
+        frame = noisy_frame(h, w, 2)
+
+        # nearest neighbour maps hold whole pixels, no interpolation on any version
+        for num_segments in [4, 6, 8]:
+            assert np.array_equal(color_chaos.kaleidoscope(frame, num_segments), reference_kaleidoscope(frame, num_segments))
@@ -0,0 +1,234 @@
+import cv2 as cv
+import numpy as np
+from collections import OrderedDict
+
+class ColorTableCache:
+
+    """
+    LRU cache of lookup tables and color matrices.
+
+    Pure per-pixel color maps only depend on a handful of parameters, so their
+    tables are built once per (builder, params) key and every frame after that
+    is a single cv.LUT / cv.transform pass.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.tables = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, builder, *params):
+        key = (builder.__name__, params)
+
+        if key in self.tables:
+            self.hits += 1
+            self.tables.move_to_end(key)
+            return self.tables[key]
+
+        self.misses += 1
+        table = builder(*params)
+        self.tables[key] = table
+
+        if len(self.tables) > self.max_entries:
+            self.tables.popitem(last=False)
+
+        return table
+
+    def clear(self):
+        self.tables.clear()
+        self.hits = 0
+        self.misses = 0
+
+colorTables = ColorTableCache(max_entries=64)
+
+def level_ramp(channels=3):
+    """
+    1x256 image holding every uint8 level once per channel.
+    """
+
+    levels = np.arange(256, dtype=np.uint8).reshape(1, 256, 1)
+    return np.repeat(levels, channels, axis=2) if channels > 1 else levels[..., 0].copy()
+
+def lut_from(function, channels=3):
+    """
+    Tabulates a per-channel pointwise function by running it on the level ramp.
+    The table is exact for anything that treats every channel value on its own,
+    rounding and wrapping included, since it's the same expression on the same dtypes.
+    """
+
+    return np.ascontiguousarray(np.asarray(function(level_ramp(channels))).astype(np.uint8))
+
+def channel_table(lut, channel):
+    return np.ascontiguousarray(lut[..., channel])
+
+def compose_luts(*luts):
+    """
+    Single table doing luts[0], then luts[1], ... Single channel tables apply
+    to every channel, they're widened when a per channel table follows.
+    """
+
+    result = luts[0]
+    for lut in luts[1:]:
+        if result.ndim == 2 and lut.ndim == 3:
+            result = np.repeat(result[:, :, np.newaxis], lut.shape[2], axis=2)
+
+        result = cv.LUT(result, lut)
+
+    return result
+
+def permutation_matrix(order):
+    """
+    3x3 matrix picking output channel i from input channel order[i], for cv.transform.
+    """
+
+    matrix = np.zeros((3, 3), dtype=np.float32)
+    matrix[np.arange(3), list(order)] = 1.0
+
+    return matrix
+
+def hue_shift_lut(shift_amount):
+    """
+    HSV table of ColorChaos.hue_shift, the hue is scaled by shift_amount and
+    wraps at 180, saturation and value are left untouched.
+    """
+
+    def shift(levels):
+        levels[:, :, 0] = (levels[:, :, 0].astype(np.int32) * shift_amount) % 180
+        return levels
+
+    return lut_from(shift)
+
+def saturation_boost_lut(factor):
+    """
+    HSV table of the saturation boost in Grunge.emo_bloom_effect.
+    """
+
+    def boost(levels):
+        levels[:, :, 1] = np.clip(levels[:, :, 1] * factor, 0, 255)
+        return levels
+
+    return lut_from(boost)
+
+def bleach_washout_lut():
+    """
+    The 80/20 blend towards gray 25 at the end of Grunge.grunge_bleach_bypass.
+    """
+
+    return lut_from(lambda levels: cv.addWeighted(levels, 0.8, np.full_like(levels, 25), 0.2, 0))
+
+def warm_tint_lut():
+    """
+    Warm tint of Grunge.dreamify, less blue and a bit less green.
+    """
+
+    warm_tint = np.array([0.6, 0.8, 1.0])
+
+    def tint(levels):
+        levels = levels.astype(np.float32)
+        levels[:, :, 0] *= warm_tint[0]
+        levels[:, :, 1] *= warm_tint[1]
+        levels[:, :, 2] *= warm_tint[2]
+        return np.clip(levels, 0, 255)
+
+    return lut_from(tint)
+
+def washed_emo_lut(pre_builder=None):
+    """
+    Channel scales of Grunge.washed_emo_layers composed with its final contrast
+    lift. Blue is blurred and noised in between, so its table is the lift alone.
+
+    pre_builder is the table of a color stage right before, folded into green and red.
+    """
+
+    def scale(levels):
+        levels[:, :, 1:] = np.clip(levels[:, :, 1:].astype(np.float32) * 0.7, 0, 255).astype(np.uint8)
+        return cv.convertScaleAbs(levels, alpha=1.1, beta=10)
+
+    table = lut_from(scale)
+
+    if pre_builder is not None:
+        lift = table[..., 0].copy()
+        table = compose_luts(pre_builder(), table)
+        table[..., 0] = lift
+
+    return table
+
+def gritty_grade_lut():
+    """
+    HSV table of VHS._gritty_grade, saturation down to 70%, value stretched and crushed.
+    """
+
+    def grade(levels):
+        h, s, v = cv.split(levels)
+        return cv.merge([h, cv.multiply(s, 0.7), cv.convertScaleAbs(v, alpha=1.9, beta=-70)])
+
+    return lut_from(grade)
+
+def gritty_tint_lut():
+    """
+    Red down 10%, green up 10%, the tint of VHS._gritty_tint.
+    """
+
+    def tint(levels):
+        b, g, r = cv.split(levels)
+        return cv.merge([b, cv.multiply(g, 1.1), cv.multiply(r, 0.9)])
+
+    return lut_from(tint)
+
+def burn_threshold_lut(low, high):
+    """
+    Single channel threshold of Grunge.burnify, levels under 128 go to low, the rest to high.
+    """
+
+    return lut_from(lambda levels: np.where(levels < 128, low, high), channels=1)
+
+def scan_line_lut(gain, blue_gain):
+    """
+    Scan line darkening, every channel scaled by gain and blue once more by blue_gain, saturated.
+    """
+
+    def darken(levels):
+        levels = levels.astype(np.float32) * gain
+        levels[:, :, 0] *= blue_gain
+        return np.clip(levels, 0, 255)
+
+    return lut_from(darken)
+
+def night_vision_lut():
+    """
+    Green phosphor channel scales of NightVision.night_vision_overlay.
+    """
+
+    def phosphor(levels):
+        levels[:, :, 0] = (levels[:, :, 0] * 0.2).astype(np.uint8)
+        levels[:, :, 1] = (levels[:, :, 1] * 0.8).astype(np.uint8)
+        levels[:, :, 2] = 0
+        return levels
+
+    return lut_from(phosphor)
+
+def equalize_lut(frame, channel):
+    """
+    Table doing cv.equalizeHist on one channel of frame and leaving the others
+    as they are, so the channel is equalized in place without copying it out
+    and back. Follows OpenCV's float math, the result is the same.
+    """
+
+    hist = cv.calcHist([frame], [channel], None, [256], [0, 256]).ravel().astype(np.int64)
+    first = int(np.flatnonzero(hist)[0])
+    total = frame.shape[0] * frame.shape[1]
+
+    levels = np.zeros(256, dtype=np.uint8)
+    if hist[first] == total:
+        # a flat channel keeps its level
+        levels[first] = first
+    else:
+        scale = np.float32(255) / np.float32(total - hist[first])
+        levels[first + 1:] = np.clip(np.rint(np.cumsum(hist[first + 1:]).astype(np.float32) * scale), 0, 255)
+
+    table = level_ramp(frame.shape[2])
+    table[0, :, channel] = levels
+
+    return table
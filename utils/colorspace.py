@@ -0,0 +1,271 @@
+import cv2 as cv
+import numpy as np
+import functools
+from collections import Counter
+
+from utils.color_transforms import compose_luts
+
+CONVERSIONS = {
+    ('BGR', 'HSV') : cv.COLOR_BGR2HSV,
+    ('HSV', 'BGR') : cv.COLOR_HSV2BGR,
+    ('BGR', 'LAB') : cv.COLOR_BGR2LAB,
+    ('LAB', 'BGR') : cv.COLOR_LAB2BGR,
+    ('BGR', 'GRAY') : cv.COLOR_BGR2GRAY,
+    ('GRAY', 'BGR') : cv.COLOR_GRAY2BGR,
+}
+
+class ConversionProfile:
+
+    """
+    Counts the cvtColor calls made on behalf of ColorFrames, per (from, to) pair.
+    Conversions between uint8 and float32 pixels count as ('uint8', 'float32') and back.
+    """
+
+    def __init__(self):
+        self.pairs = Counter()
+
+    def record(self, source, target):
+        self.pairs[(source, target)] += 1
+
+    @property
+    def conversions(self):
+        return sum(self.pairs.values())
+
+    def reset(self):
+        self.pairs.clear()
+
+conversionProfile = ConversionProfile()
+
+def colorspace(space):
+    """
+    Declares the colorspace an effect stage reads and returns its pixels in.
+    Stages without a declaration are BGR.
+    """
+
+    def mark(function):
+        function.colorspace = space
+        return function
+
+    return mark
+
+def quantize(pixels, dst=None):
+    """
+    float32 pixels back to uint8, saturated and truncated like the float math of the effects always was.
+    Clips the float pixels in place.
+    """
+
+    np.clip(pixels, 0, 255, out=pixels)
+
+    if dst is None:
+        return pixels.astype(np.uint8)
+
+    np.copyto(dst, pixels, casting='unsafe')
+    return dst
+
+def floating(function):
+    """
+    Declares a BGR stage that also does its math on float32 pixels. Given
+    float32 pixels on the 0-255 scale it returns float32 pixels, which may leave
+    that range, given uint8 it returns uint8 as any other stage.
+
+    A ColorFrame keeping floats hands float32 pixels from one floating stage to
+    the next and only quantizes when another stage or the caller needs uint8.
+    """
+
+    function.floating = True
+    return function
+
+def staged(*stage_names):
+    """
+    Builds a BGR in, BGR out effect out of colorspace stages of the same class.
+    The decorated body is never run, chain runners read stage_names instead so
+    consecutive stages sharing a colorspace skip the round-trip through BGR.
+    """
+
+    def build(function):
+        @functools.wraps(function)
+        def effect(self, frame):
+            return run_chain(frame, [getattr(self, name) for name in stage_names])
+
+        effect.stage_names = stage_names
+        return effect
+
+    return build
+
+def lookup(function):
+    """
+    Declares a stage that is nothing but a cv.LUT of its pixels. The decorated
+    function gets the stage's extra arguments and returns the table for this
+    frame, chain_stages composes the tables of consecutive lookup stages sharing
+    a colorspace so the run costs a single pass.
+    """
+
+    @functools.wraps(function)
+    def stage(self, pixels, *args, dst=None, **kwargs):
+        return cv.LUT(pixels, function(self, *args, **kwargs), dst=dst)
+
+    stage.table = function
+    stage.accepts_dst = True
+    return stage
+
+class FusedLookup:
+
+    """
+    Consecutive lookup stages of one colorspace as a single stage. The tables are
+    asked for in chain order every frame, so time varying ones stay current, and
+    composed into one.
+    """
+
+    accepts_dst = True
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.colorspace = getattr(stages[0], 'colorspace', 'BGR')
+        self.__name__ = '+'.join(stage.__name__ for stage in stages)
+
+    def table(self):
+        return compose_luts(*[stage.table(stage.__self__) for stage in self.stages])
+
+    def __call__(self, pixels, dst=None):
+        return cv.LUT(pixels, self.table(), dst=dst)
+
+class ColorFrame:
+
+    """
+    Frame pixels together with the colorspace they are currently in.
+    Conversions only happen when a stage asks for another colorspace.
+
+    That only saves anything when consecutive stages share a colorspace. The
+    Grunge and VHS masters have no such stages and convert as often as before,
+    the savings are in --effects chains like hue_shift > vhs_gritty.
+
+    With keep_float floating stages get float32 pixels and their output stays
+    float32 until a stage or the caller asks for uint8, so a run of floating
+    stages costs one conversion in and one quantization out, and no rounding
+    in between. Without it every stage gets uint8.
+    """
+
+    def __init__(self, pixels, space='BGR', profile=None, keep_float=False):
+        self.pixels = pixels
+        self.space = space
+        self.profile = profile if profile is not None else conversionProfile
+        self.keep_float = keep_float
+
+    def to(self, space, pool=None):
+        if self.pixels.dtype == np.float32:
+            self.quantize(pool)
+
+        if space == self.space:
+            return self.pixels
+
+        if (self.space, space) not in CONVERSIONS:
+            # no direct conversion, go through BGR
+            self.to('BGR', pool)
+            return self.to(space, pool)
+
+        # gray has another shape, only the 3 channel conversions go through the pool
+        dst = pool.spare(self.pixels) if pool is not None and 'GRAY' not in (self.space, space) else None
+
+        self.pixels = cv.cvtColor(self.pixels, CONVERSIONS[(self.space, space)], dst=dst)
+        self.profile.record(self.space, space)
+        self.space = space
+
+        return self.pixels
+
+    def to_float(self, pool=None):
+        """
+        BGR float32 pixels, converted from uint8 unless they already are.
+        """
+
+        if self.pixels.dtype != np.float32:
+            pixels = self.to('BGR')
+
+            if pool is None:
+                self.pixels = pixels.astype(np.float32)
+            else:
+                self.pixels = pool.spare(pixels, np.float32)
+                np.copyto(self.pixels, pixels)
+
+            self.profile.record('uint8', 'float32')
+
+        return self.pixels
+
+    def quantize(self, pool=None):
+        self.pixels = quantize(self.pixels, pool.spare(self.pixels, np.uint8) if pool is not None else None)
+        self.profile.record('float32', 'uint8')
+
+    def apply(self, stage, pool=None, allocate_output=False):
+        """
+        With a FramePool, conversions and stages accepting dst write into pool
+        buffers instead of allocating. allocate_output is for the last stage of
+        a chain, whose result leaves the pool: a BGR stage allocates its output,
+        any other stage stays in the pool and the conversion back to BGR allocates.
+        """
+
+        if self.keep_float and getattr(stage, 'floating', False):
+            self.pixels = stage(self.to_float(pool))
+            self.space = 'BGR'
+            return
+
+        space = getattr(stage, 'colorspace', 'BGR')
+        source = self.to(space, pool)
+
+        if pool is not None and getattr(stage, 'accepts_dst', False) and not (allocate_output and space == 'BGR'):
+            pixels = stage(source, dst=pool.spare(source))
+        else:
+            pixels = stage(source)
+
+        self.pixels = pixels
+        self.space = space
+
+def expand_stages(effects):
+    """
+    Expands staged effects into their stages, other effects are a single BGR stage.
+    """
+
+    stages = []
+    for effect in effects:
+        stage_names = getattr(effect, 'stage_names', None)
+
+        if stage_names:
+            stages.extend(getattr(effect.__self__, name) for name in stage_names)
+        else:
+            stages.append(effect)
+
+    return stages
+
+def is_lookup(stage):
+    return isinstance(stage, FusedLookup) or (hasattr(stage, '__self__') and hasattr(stage, 'table'))
+
+def fuse_lookups(stages):
+    """
+    Replaces every run of lookup stages sharing a colorspace with a FusedLookup.
+    """
+
+    fused = []
+    for stage in stages:
+        previous = fused[-1] if fused else None
+
+        if previous is not None and is_lookup(previous) and is_lookup(stage) \
+                and getattr(previous, 'colorspace', 'BGR') == getattr(stage, 'colorspace', 'BGR'):
+            members = previous.stages if isinstance(previous, FusedLookup) else [previous]
+            fused[-1] = FusedLookup(members + [stage])
+        else:
+            fused.append(stage)
+
+    return fused
+
+def chain_stages(effects):
+    """
+    The stages of an effect chain, staged effects expanded and consecutive lookup stages fused.
+    """
+
+    return fuse_lookups(expand_stages(effects))
+
+def run_chain(frame, effects, profile=None, keep_float=False):
+    colorFrame = ColorFrame(frame, profile=profile, keep_float=keep_float)
+
+    for stage in chain_stages(effects):
+        colorFrame.apply(stage)
+
+    return colorFrame.to('BGR')
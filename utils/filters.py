@@ -0,0 +1,116 @@
+import cv2 as cv
+import numpy as np
+import math
+
+# grain fields are this many pixels larger than the frame, the per frame window moves inside them
+GRAIN_PAD = 64
+GRAIN_SCALE = 16
+GRAIN_SEED = 1337
+
+def gaussian_sigma(ksize):
+    """
+    Sigma OpenCV derives for a GaussianBlur called with sigma 0.
+    """
+
+    return 0.3 * ((ksize - 1) * 0.5 - 1) + 0.8
+
+def residual_variance(sigma, factor):
+    """
+    Blur variance left for the small level, in full resolution pixels. The
+    area downsampling is a factor wide box, the linear upsampling a tent.
+    """
+
+    return sigma**2 - (factor**2 - 1) / 12 - factor**2 / 6
+
+def pyramid_factor(sigma, min_sigma=1.0):
+    factor = 1
+    while residual_variance(sigma, factor * 2) >= (min_sigma * factor * 2) ** 2:
+        factor *= 2
+
+    return factor
+
+def pyramid_blur(frame, ksize, sigma=0, dst=None):
+    """
+    Large Gaussian blur through a downsample -> blur -> upsample pyramid.
+
+    The frame is halved with INTER_AREA until the kernel would get too small,
+    blurred there with sigma scaled down by the pyramid factor, and stretched
+    back with INTER_LINEAR, into dst when given. Small kernels fall through to
+    a plain GaussianBlur.
+    """
+
+    sigma = sigma or gaussian_sigma(ksize)
+    factor = pyramid_factor(sigma)
+
+    if factor == 1:
+        return cv.GaussianBlur(frame, (ksize, ksize), sigma, dst=dst)
+
+    h, w = frame.shape[:2]
+
+    small = frame
+    for _ in range(int(math.log2(factor))):
+        small = cv.resize(small, (max(1, small.shape[1] // 2), max(1, small.shape[0] // 2)),
+                          interpolation=cv.INTER_AREA)
+
+    small = cv.GaussianBlur(small, (0, 0), math.sqrt(residual_variance(sigma, factor)) / factor)
+
+    return cv.resize(small, (w, h), dst=dst, interpolation=cv.INTER_LINEAR)
+
+def vignette_mask(height, width):
+    """
+    Radial falloff of Grunge.dreamify, 1.0 in the center down to 0.4, as a
+    3 channel uint8 mask for cv.multiply with scale 1/255.
+    """
+
+    X = np.arange(height, dtype=np.float32)[:, np.newaxis]
+    Y = np.arange(width, dtype=np.float32)[np.newaxis, :]
+    center_x, center_y = height/2, width/2
+    radius = np.sqrt(center_x**2 + center_y**2)
+    dist = np.sqrt((X - center_x)**2 + (Y - center_y)**2)
+
+    vignette = np.clip(0.6 + 0.4 * (1 - (dist / radius)**2), 0.4, 1)
+    vignette = np.round(vignette * 255).astype(np.uint8)
+
+    return cv.merge([vignette, vignette, vignette])
+
+def gaussian_falloff(height, width):
+    """
+    Separable gaussian with a sigma of a third of the frame, 1.0 in the center,
+    as a float32 mask of NightVision's overlay.
+    """
+
+    kernel_x = cv.getGaussianKernel(width, width/3, cv.CV_32F)
+    kernel_y = cv.getGaussianKernel(height, height/3, cv.CV_32F)
+    kernel = kernel_y * kernel_x.T
+
+    return kernel / kernel.max()
+
+def grain_field(height, width, channels, seed=GRAIN_SEED):
+    """
+    Gaussian noise with a standard deviation of GRAIN_SCALE, stored as int8 and
+    GRAIN_PAD pixels larger than the frame in both directions.
+
+    Drawn from its own seeded generator, the field is cached per process and
+    reused across segments, so it must not depend on which job built it first.
+    """
+
+    shape = (height + GRAIN_PAD, width + GRAIN_PAD) + ((channels,) if channels > 1 else ())
+    noise = np.random.default_rng(seed).standard_normal(shape, dtype=np.float32) * GRAIN_SCALE
+
+    return np.clip(np.round(noise), -127, 127).astype(np.int8)
+
+def film_grain(frame, field, strength, gain=1.0):
+    """
+    frame * gain plus noise of the given standard deviation, saturated to uint8.
+
+    The noise is a window of a pre-generated field at a random offset, so no
+    per frame random draw over the whole frame. The offsets come from the global
+    np.random and only span [0, GRAIN_PAD) in each direction, so the grain cycles
+    through the same GRAIN_PAD x GRAIN_PAD set of windows. The -0.5 turns the
+    rounding of addWeighted into the truncation of the float math it replaces.
+    """
+
+    h, w = frame.shape[:2]
+    y, x = np.random.randint(0, GRAIN_PAD, 2)
+
+    return cv.addWeighted(frame, gain, field[y:y+h, x:x+w], strength / GRAIN_SCALE, -0.5, dtype=cv.CV_8U)
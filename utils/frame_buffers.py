@@ -0,0 +1,108 @@
+import numpy as np
+import tracemalloc
+from collections import OrderedDict
+
+def accepts_dst(function):
+    """
+    Marks an effect or stage taking a dst keyword: a preallocated array of the
+    input's shape and dtype, never aliasing it, that the result is written into
+    and returned. Without dst the effect allocates its output as usual.
+    """
+
+    function.accepts_dst = True
+    return function
+
+class FramePool:
+
+    """
+    Two preallocated buffers per (shape, dtype), so a chain of dst aware stages
+    ping-pongs between them instead of allocating a frame per stage.
+
+    The buffers are overwritten by the next frame, anything leaving the chain
+    has to be copied out (see owns).
+    """
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self.buffers = OrderedDict()
+
+    def pair(self, shape, dtype=np.uint8):
+        key = (tuple(shape), np.dtype(dtype).str)
+
+        if key not in self.buffers:
+            self.buffers[key] = (np.empty(shape, dtype), np.empty(shape, dtype))
+
+            if len(self.buffers) > self.max_entries:
+                self.buffers.popitem(last=False)
+
+        self.buffers.move_to_end(key)
+        return self.buffers[key]
+
+    def spare(self, pixels, dtype=None):
+        """
+        Buffer of the pixels' shape, and dtype unless another one is given, that doesn't hold the pixels.
+        """
+
+        first, second = self.pair(pixels.shape, pixels.dtype if dtype is None else dtype)
+        return second if np.shares_memory(first, pixels) else first
+
+    def owns(self, array):
+        return any(np.shares_memory(buffer, array) for pair in self.buffers.values() for buffer in pair)
+
+    def clear(self):
+        self.buffers.clear()
+
+class AllocationCounter:
+
+    """
+    Bytes numpy and OpenCV allocate per frame, both hand out numpy arrays which
+    report to tracemalloc.
+
+    Every stage counts the peak of traced memory above what was live when it
+    started, its output included. Summed over the stages of a frame that's a
+    lower bound of the garbage the frame created, exact for stages allocating a
+    single array. Tracing slows everything down, it's meant for profiling runs.
+    """
+
+    def __init__(self):
+        self.stage_bytes = {}
+        self.frame_bytes = 0
+
+        self.frames = 0
+        self.total_bytes = 0
+        self.max_frame_bytes = 0
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        return self
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def begin_stage(self):
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    def end_stage(self, stage_name, baseline):
+        allocated = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+
+        self.stage_bytes[stage_name] = self.stage_bytes.get(stage_name, 0) + allocated
+        self.frame_bytes += allocated
+
+    def end_frame(self):
+        self.frames += 1
+        self.total_bytes += self.frame_bytes
+        self.max_frame_bytes = max(self.max_frame_bytes, self.frame_bytes)
+        self.frame_bytes = 0
+
+    def per_frame(self):
+        return self.total_bytes / self.frames if self.frames else 0.0
+
+    def stats(self):
+        """
+        Bytes per frame of every stage.
+        """
+
+        return {stage_name: total / self.frames for stage_name, total in self.stage_bytes.items()} if self.frames else {}
@@ -0,0 +1,188 @@
+import cv2 as cv
+import numpy as np
+from collections import OrderedDict
+
+class WarpMapCache:
+
+    """
+    LRU cache of cv.remap coordinate maps.
+
+    Geometry warps only depend on the frame size and a few parameters, so the
+    maps are built once per (height, width, effect, params) key and stored in
+    OpenCV's fixed-point CV_16SC2 format, which is what cv.remap runs fastest on.
+    Other per resolution buffers (vignette masks, grain fields) share the cache.
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self.maps = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, builder, height, width, *params):
+        key = (height, width, builder.__name__, params)
+
+        if key in self.maps:
+            self.hits += 1
+            self.maps.move_to_end(key)
+            return self.maps[key]
+
+        self.misses += 1
+        maps = builder(height, width, *params)
+        self.maps[key] = maps
+
+        if len(self.maps) > self.max_entries:
+            self.maps.popitem(last=False)
+
+        return maps
+
+    def clear(self):
+        self.maps.clear()
+        self.hits = 0
+        self.misses = 0
+
+warpMaps = WarpMapCache(max_entries=32)
+
+def to_fixed_point(map_x, map_y, nearest=False):
+    return cv.convertMaps(map_x.astype(np.float32, copy=False), map_y.astype(np.float32, copy=False), cv.CV_16SC2,
+                          nninterpolation=nearest)
+
+def normalized_grid(height, width):
+    # float64 like the per frame maps these replace, the fixed point conversion then lands on the same 1/32 pixel steps
+    j, i = np.meshgrid(np.arange(width), np.arange(height))
+
+    x = (j - width/2) / (width/2)
+    y = (i - height/2) / (height/2)
+
+    return x, y
+
+def barrel_maps(height, width, intensity):
+    x, y = normalized_grid(height, width)
+
+    r = np.sqrt(x*x + y*y)
+    distortion = 1.0 + intensity * r**2
+
+    map_x = (x * distortion * (width/2)) + width/2
+    map_y = (y * distortion * (height/2)) + height/2
+
+    return to_fixed_point(map_x, map_y)
+
+def chromatic_aberration_maps(height, width, intensity):
+    """
+    Returns one fixed-point map pair per B, G, R channel.
+    """
+
+    x, y = normalized_grid(height, width)
+    r = np.sqrt(x**2 + y**2)
+
+    safe_r = np.maximum(r, 0.001)
+    radial_x = x / safe_r
+    radial_y = y / safe_r
+
+    channel_maps = []
+    for strength in (2.0, 0.3, -1.5):
+        shift = intensity * strength * r**2
+
+        map_x = ((x + shift * radial_x) * (width/2)) + width/2
+        map_y = ((y + shift * radial_y) * (height/2)) + height/2
+
+        channel_maps.append(to_fixed_point(map_x, map_y))
+
+    return channel_maps
+
+def kaleidoscope_maps(height, width, num_segments):
+    """
+    Nearest neighbour maps, pixels outside of the mirrored circle point to -1
+    so a BORDER_CONSTANT remap blacks them out.
+    """
+
+    center_x, center_y = width // 2, height // 2
+    radius = min(center_x, center_y)
+
+    # float64 on purpose, source pixels are truncated and float32 angles move ~10% of them by one pixel
+    y, x = np.ogrid[:height, :width]
+
+    dx = x - center_x
+    dy = y - center_y
+    r = np.sqrt(dx**2 + dy**2)
+    theta = np.arctan2(dy, dx) * 180 / np.pi
+    theta = (theta + 360) % 360
+
+    angle_step = 360.0 / num_segments
+    normalized_theta = theta % angle_step
+
+    source_theta = np.where(normalized_theta <= angle_step / 2,
+                        normalized_theta,
+                        angle_step - normalized_theta)
+
+    source_theta = source_theta + (theta // angle_step) * angle_step
+
+    source_theta_rad = source_theta * np.pi / 180
+    source_x = np.clip((r * np.cos(source_theta_rad) + center_x).astype(int), 0, width-1)
+    source_y = np.clip((r * np.sin(source_theta_rad) + center_y).astype(int), 0, height-1)
+
+    outside = r > radius
+    source_x[outside] = -1
+    source_y[outside] = -1
+
+    return to_fixed_point(source_x, source_y, nearest=True)
+
+def shift_runs(height, shift_of_row, step=1):
+    """
+    Collapses per-row shifts into (first_row, end_row, shift) runs of rows
+    sharing the same shift, every step-th row starting from 0.
+    """
+
+    runs = []
+    start, current = None, None
+
+    for i in range(0, height, step):
+        shift = shift_of_row(i)
+        if shift != current:
+            if current is not None:
+                runs.append((start, i, current))
+            start, current = i, shift
+
+    if current is not None:
+        runs.append((start, height, current))
+
+    return runs
+
+def color_bleeding_shifts(height, width):
+    """
+    Row shift tables of the VHS color bleeding for the R, B and G channels.
+    Shifts are evaluated with the exact scalar expressions of the original
+    per-row loop, once per resolution.
+    """
+
+    r_runs = shift_runs(height, lambda i: 8 + int(np.sin(i * 0.01) * 4))
+    b_runs = shift_runs(height, lambda i: -6 + int(np.cos(i * 0.02) * 3), step=3)
+    g_runs = shift_runs(height, lambda i: 2 + int(np.sin(i * 0.01) * 2), step=4)
+
+    return r_runs, b_runs, g_runs
+
+def channel_shifting_shifts(height, width):
+    """
+    Row shift tables of ColorChaos.channel_shifting for the R and B channels.
+    """
+
+    r_runs = shift_runs(height, lambda i: 1024 + int(np.sin(i * 0.03) * 2))
+    b_runs = [(0, height, -3)]
+
+    return r_runs, b_runs
+
+def roll_rows(dst, src, rows, channel, shift):
+    """
+    np.roll of the selected rows of one channel along the width, written into dst.
+    """
+
+    w = src.shape[1]
+    shift %= w
+
+    if shift == 0:
+        dst[rows, :, channel] = src[rows, :, channel]
+        return
+
+    dst[rows, shift:, channel] = src[rows, :w-shift, channel]
+    dst[rows, :shift, channel] = src[rows, w-shift:, channel]